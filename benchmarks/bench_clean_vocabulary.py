@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+假名读音清理热路径的微基准测试
+在大规模合成读音数据上对比：原先每次现编正则的实现、带缓存的 clean_vocabulary_entry、
+以及批量接口 clean_vocabulary_entries
+
+用法: python benchmarks/bench_clean_vocabulary.py [读音条数]
+"""
+
+import csv
+import gc
+import glob
+import os
+import random
+import re
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from clean_vocabulary import _clean_vocabulary_entry, clean_vocabulary_entries, clean_vocabulary_entry
+
+def legacy_clean_vocabulary_entry(kana_reading):
+    """clean_vocabulary.py 原有实现（每次调用都按字符串模式匹配，无缓存）"""
+    cleaned = re.sub(r'^…+', '', kana_reading)
+
+    if '（' in cleaned and '）' in cleaned:
+        main_part = re.sub(r'（.*?）', '', cleaned)
+        bracket_content = re.search(r'（(.*?)）', cleaned)
+
+        if bracket_content:
+            bracket_part = bracket_content.group(1)
+            bracket_part = re.sub(r'^…+', '', bracket_part)
+            return [main_part.strip(), bracket_part.strip()]
+
+    return [cleaned.strip()]
+
+def build_corpus(size, seed=42):
+    """用课程中的假名加上省略号、括号变体，生成含大量重复读音的合成语料"""
+    pattern = os.path.join(ROOT_DIR, 'web', 'data', 'vocabulary', 'lesson_*_vocabulary.csv')
+    readings = []
+    for path in sorted(glob.glob(pattern)):
+        with open(path, 'r', encoding='utf-8') as f:
+            readings.extend(row['假名'] for row in csv.DictReader(f) if row.get('假名'))
+
+    rng = random.Random(seed)
+    variants = []
+    for reading in readings:
+        variants.append(reading)
+        variants.append('…' + reading)
+        variants.append(f"…{reading}（…{rng.choice(readings)}）")
+    return [rng.choice(variants) for _ in range(size)]
+
+def timed(label, func, baseline=None):
+    """执行一次并打印耗时（与 timeit 一样，计时期间关闭垃圾回收）"""
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+    finally:
+        gc.enable()
+    speedup = f" ({baseline / elapsed:.1f}x)" if baseline else ""
+    print(f"  {label:<28} {elapsed * 1000:9.1f} ms{speedup}")
+    return result, elapsed
+
+def run_benchmark(size=1000000):
+    corpus = build_corpus(size)
+    print(f"合成读音: {len(corpus)} 条，其中不同读音 {len(set(corpus))} 条")
+
+    expected, legacy_time = timed("原实现", lambda: [legacy_clean_vocabulary_entry(k) for k in corpus])
+
+    _clean_vocabulary_entry.cache_clear()
+    cold, _ = timed("clean_vocabulary_entry (冷)", lambda: [clean_vocabulary_entry(k) for k in corpus], legacy_time)
+    warm, _ = timed("clean_vocabulary_entry (热)", lambda: [clean_vocabulary_entry(k) for k in corpus], legacy_time)
+    batch, _ = timed("clean_vocabulary_entries", lambda: clean_vocabulary_entries(corpus), legacy_time)
+
+    print(f"  缓存命中: {_clean_vocabulary_entry.cache_info()}")
+
+    consistent = expected == cold == warm == batch
+    print(f"结果一致: {'✅' if consistent else '❌'}")
+    return consistent
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    sys.exit(0 if run_benchmark(size) else 1)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+假名转罗马音的基准测试和一致性检查
+- 在大规模合成假名列上计时：逐个 convert、批量 convert_many、整列 convert_series
+  （后两者都是每个不同的值查一次前缀树，convert_series 只多了 pandas 的去重和映射，并非向量化运算，耗时与 convert_many 相当）
+- 用课程词汇中的假名作为共同语料，把 Python 转出的罗马音交给 web/romaji-converter.js 转回假名，
+  统计能原样还原的比例（需要 node，没有时跳过）
+
+用法: python benchmarks/bench_kana_romaji.py [字符串条数]
+"""
+
+import csv
+import gc
+import glob
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WEB_DIR = os.path.join(ROOT_DIR, 'web')
+sys.path.insert(0, WEB_DIR)
+
+import pandas as pd
+
+from kana_romaji import load_converter, load_kana_table
+
+HIRAGANA_RANGE = (0x3041, 0x309F)
+
+def lesson_kana():
+    """课程词汇中的假名（共同语料）"""
+    pattern = os.path.join(WEB_DIR, 'data', 'vocabulary', 'lesson_*_vocabulary.csv')
+    readings = []
+    for path in sorted(glob.glob(pattern)):
+        with open(path, 'r', encoding='utf-8') as f:
+            readings.extend(row['假名'] for row in csv.DictReader(f) if row.get('假名'))
+    return readings
+
+def build_corpus(size, seed=42):
+    """一半取自课程假名，一半是随机拼接的假名串（几乎不重复）"""
+    rng = random.Random(seed)
+    readings = lesson_kana()
+    kana = list(load_kana_table()) + ['っ', 'ー']
+    corpus = []
+    for i in range(size):
+        if i % 2:
+            corpus.append(rng.choice(readings))
+        else:
+            corpus.append(''.join(rng.choice(kana) for _ in range(rng.randint(2, 6))))
+    return corpus
+
+def timed(label, func):
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+    finally:
+        gc.enable()
+    print(f"  {label:<24} {elapsed * 1000:9.1f} ms")
+    return result
+
+def compare_with_js(converter):
+    """Python 罗马音 -> romaji-converter.js -> 假名，能否还原（只比较纯平假名的词）；有词无法还原时返回 False"""
+    node = shutil.which('node')
+    if not node:
+        print("未找到 node，跳过与 romaji-converter.js 的对照")
+        return True
+
+    words = sorted({
+        reading for reading in lesson_kana()
+        if reading and all(HIRAGANA_RANGE[0] <= ord(char) <= HIRAGANA_RANGE[1] for char in reading)
+    })
+    romaji = converter.convert_many(words)
+    script = (
+        "const RomajiConverter = require(process.argv[1]);"
+        "const converter = new RomajiConverter();"
+        "const input = JSON.parse(require('fs').readFileSync(0, 'utf8'));"
+        "process.stdout.write(JSON.stringify(input.map(r => converter.convert(r, 'hiragana'))));"
+    )
+    output = subprocess.run(
+        [node, '-e', script, os.path.join(WEB_DIR, 'romaji-converter.js')],
+        input=json.dumps(romaji), capture_output=True, text=True, check=True
+    ).stdout
+    back = json.loads(output)
+
+    mismatches = [(word, r, b) for word, r, b in zip(words, romaji, back) if word != b]
+    print(f"与 romaji-converter.js 对照: {len(words) - len(mismatches)}/{len(words)} 个平假名词可原样还原")
+    for word, r, b in mismatches[:10]:
+        print(f"  {word} -> {r} -> {b}")
+    if len(mismatches) > 10:
+        print(f"  ...（另有 {len(mismatches) - 10} 个）")
+    return not mismatches
+
+def run_benchmark(size=1000000):
+    converter = load_converter()
+    corpus = build_corpus(size)
+    print(f"合成假名: {len(corpus)} 条，其中不同字符串 {len(set(corpus))} 条")
+
+    single = timed("convert (逐个)", lambda: [converter.convert(text) for text in corpus])
+    batch = timed("convert_many", lambda: converter.convert_many(corpus))
+    column = timed("convert_series", lambda: converter.convert_series(pd.Series(corpus)).tolist())
+
+    consistent = single == batch == column
+    print(f"结果一致: {'✅' if consistent else '❌'}")
+    js_consistent = compare_with_js(converter)
+    print(f"与 romaji-converter.js 一致: {'✅' if js_consistent else '❌'}")
+    return consistent and js_consistent
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    sys.exit(0 if run_benchmark(size) else 1)
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+词汇处理流程的基准测试
+用课程 CSV 生成 1×、10×、100× 规模的合成数据（课程 CSV 和与 minanonihongo_words.xls 同结构的 DataFrame），
+对以下环节计时，并与本机保存的 JSON 基线比较，耗时超出容差即视为性能回退：
+- process_words / merge_vocabulary 的 categorize_word_type
+- reclassify_vocabulary.get_detailed_category
+- precise_reclassify.precise_reclassify（整目录重新分类并写回）
+- clean_vocabulary 的 clean_vocabulary_entry 和 process_vocabulary_file
+- process_words.extract_lessons_data
+- demo.get_options
+
+用法:
+  python benchmarks/bench_pipeline.py                     运行并与基线比较
+  python benchmarks/bench_pipeline.py --save-baseline     运行并把结果保存为新基线
+  python benchmarks/bench_pipeline.py --scales 1 10 --only get_options --repeat 5
+
+绝对耗时只在同一台机器上可比，基线按“主机名-CPU 架构-Python 版本”分文件保存在
+benchmarks/baselines/ 下（不纳入版本库）；本机没有基线时只输出结果，不做比较
+"""
+
+import argparse
+import contextlib
+import csv
+import gc
+import glob
+import io
+import json
+import os
+import platform
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WEB_DIR = os.path.join(ROOT_DIR, 'web')
+sys.path.insert(0, WEB_DIR)
+sys.path.insert(0, ROOT_DIR)
+
+import pandas as pd
+
+from kana_romaji import load_converter
+from lesson_index import LESSON_MARKER_PREFIX
+from vocabulary_corpus import VOCABULARY_FIELDNAMES
+
+BASELINE_DIR = os.path.join(ROOT_DIR, 'benchmarks', 'baselines')
+DEFAULT_SCALES = [1, 10, 100]
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 0.25
+# 每隔多少个单词混入一个带省略号和括号的读音（clean_vocabulary 要处理的情况）
+DIRTY_EVERY = 10
+
+def load_lesson_rows():
+    """课程 CSV 中的全部单词: [(课程编号, 行), ...]"""
+    entries = []
+    pattern = os.path.join(WEB_DIR, 'data', 'vocabulary', 'lesson_*_vocabulary.csv')
+    for path in sorted(glob.glob(pattern)):
+        lesson_num = int(os.path.basename(path).split('_')[1])
+        with open(path, 'r', encoding='utf-8') as f:
+            entries.extend((lesson_num, row) for row in csv.DictReader(f))
+    return entries
+
+class SyntheticData:
+    """某一规模的合成数据：每课的单词重复 scale 份，课程数不变"""
+
+    def __init__(self, entries, scale):
+        self.scale = scale
+        self.lessons = {}
+        for lesson_num, row in entries:
+            self.lessons.setdefault(lesson_num, []).append(row)
+        for lesson_num, rows in self.lessons.items():
+            self.lessons[lesson_num] = rows * scale
+        self.entries = [(lesson_num, row) for lesson_num, rows in self.lessons.items() for row in rows]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def words(self):
+        """(汉字, 假名, 释义) 三元组"""
+        return [(row.get('汉字', ''), row.get('假名', ''), row.get('释义', '')) for _, row in self.entries]
+
+    def dirty_readings(self):
+        """混入 …ふん（…ぷん）形式的读音"""
+        readings = []
+        for i, (_, row) in enumerate(self.entries):
+            kana = row.get('假名', '')
+            if i % DIRTY_EVERY == 0:
+                kana = f"…{kana}（…{self.entries[i - 1][1].get('假名', '')}）"
+            readings.append(kana)
+        return readings
+
+    def write_lessons(self, data_dir, dirty=False):
+        """按网页端格式写出课程 CSV（dirty=True 时假名列混入需要清理的读音）"""
+        os.makedirs(data_dir, exist_ok=True)
+        readings = iter(self.dirty_readings()) if dirty else None
+        for lesson_num, rows in self.lessons.items():
+            path = os.path.join(data_dir, f'lesson_{lesson_num:02d}_vocabulary.csv')
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=VOCABULARY_FIELDNAMES, extrasaction='ignore')
+                writer.writeheader()
+                for row in rows:
+                    if readings is not None:
+                        row = dict(row, 假名=next(readings))
+                    writer.writerow(row)
+
+    def workbook_frame(self):
+        """与 minanonihongo_words.xls 同结构的 DataFrame：每课前一行“大家日语_XX”分割线，约一半单词缺罗马音"""
+        converter = load_converter()
+        records = [('说明', None, None, None, None)]
+        for lesson_num, rows in self.lessons.items():
+            records.append((f'{LESSON_MARKER_PREFIX}{lesson_num:02d}', None, None, None, None))
+            for i, row in enumerate(rows):
+                kana = row.get('假名', '')
+                romaji = converter.convert(kana, ' ') if i % 2 else None
+                records.append((row.get('汉字') or kana, kana, row.get('释义'), romaji, '0'))
+        return pd.DataFrame(records, columns=['kanji', 'kana', 'meaning', 'romaji', 'accent'])
+
+@contextlib.contextmanager
+def quiet():
+    """屏蔽被测函数的进度输出"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+@contextlib.contextmanager
+def working_directory(path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+# ---- 各个被测环节：prepare(data, workdir) 返回 (每次计时前的准备函数, 被测函数, 处理条数) ----
+
+def case_process_words_categorize(data, workdir):
+    from process_words import categorize_word_type
+    words = data.words()
+    return None, lambda: [categorize_word_type(*word) for word in words], len(words)
+
+def case_merge_vocabulary_categorize(data, workdir):
+    from merge_vocabulary import categorize_word_type
+    words = data.words()
+    return None, lambda: [categorize_word_type(*word) for word in words], len(words)
+
+def case_get_detailed_category(data, workdir):
+    from reclassify_vocabulary import get_detailed_category
+    rows = [
+        (lesson_num, row.get('假名', ''), row.get('汉字', ''), row.get('释义', ''), row.get('词性', ''))
+        for lesson_num, row in data.entries
+    ]
+    return None, lambda: [get_detailed_category(*row) for row in rows], len(rows)
+
+def case_precise_reclassify(data, workdir):
+    from precise_reclassify import precise_reclassify
+    data_dir = os.path.join(workdir, 'data', 'vocabulary')
+
+    def setup():
+        # 每次都从未分类过的文件开始（删掉增量清单）
+        shutil.rmtree(data_dir, ignore_errors=True)
+        data.write_lessons(data_dir)
+
+    def run():
+        with working_directory(workdir), quiet():
+            precise_reclassify()
+
+    return setup, run, len(data)
+
+def case_clean_vocabulary_entry(data, workdir):
+    from clean_vocabulary import _clean_vocabulary_entry, clean_vocabulary_entry
+    readings = data.dirty_readings()
+    return _clean_vocabulary_entry.cache_clear, lambda: [clean_vocabulary_entry(kana) for kana in readings], len(readings)
+
+def case_process_vocabulary_file(data, workdir):
+    from clean_vocabulary import _clean_vocabulary_entry, process_vocabulary_file
+    data_dir = os.path.join(workdir, 'clean')
+
+    def setup():
+        shutil.rmtree(data_dir, ignore_errors=True)
+        data.write_lessons(data_dir, dirty=True)
+        _clean_vocabulary_entry.cache_clear()
+
+    def run():
+        with quiet():
+            for path in sorted(glob.glob(os.path.join(data_dir, 'lesson_*_vocabulary.csv'))):
+                process_vocabulary_file(path)
+
+    return setup, run, len(data)
+
+def case_extract_lessons_data(data, workdir):
+    from process_words import extract_lessons_data
+    frame = data.workbook_frame()
+
+    def run():
+        with quiet():
+            extract_lessons_data(frame)
+
+    return None, run, len(data)
+
+def case_get_options(data, workdir):
+    # demo.py 导入时读取当前目录下的 config.txt 和 kana_data.csv
+    with working_directory(ROOT_DIR), quiet():
+        import demo
+    answers = list(demo.kana_map.items())
+    questions = [answers[i % len(answers)] for i in range(len(data))]
+    option_count = demo.config['option_count']
+    return None, lambda: [demo.get_options(romaji, option_count, kana) for kana, romaji in questions], len(questions)
+
+CASES = {
+    'process_words.categorize_word_type': case_process_words_categorize,
+    'merge_vocabulary.categorize_word_type': case_merge_vocabulary_categorize,
+    'get_detailed_category': case_get_detailed_category,
+    'precise_reclassify': case_precise_reclassify,
+    'clean_vocabulary_entry': case_clean_vocabulary_entry,
+    'process_vocabulary_file': case_process_vocabulary_file,
+    'extract_lessons_data': case_extract_lessons_data,
+    'get_options': case_get_options,
+}
+
+def time_case(prepare, data, repeat):
+    """执行 repeat 次，返回每次的耗时（秒）和处理条数；准备工作不计时，计时期间关闭垃圾回收"""
+    with tempfile.TemporaryDirectory(prefix='bench_pipeline_') as workdir:
+        setup, func, items = prepare(data, workdir)
+        timings = []
+        for _ in range(repeat):
+            if setup:
+                setup()
+            gc.collect()
+            gc.disable()
+            try:
+                start = time.perf_counter()
+                func()
+                timings.append(time.perf_counter() - start)
+            finally:
+                gc.enable()
+    return timings, items
+
+def run_benchmarks(case_names, scales, repeat):
+    """返回 {环节: {规模: {best, median, items}}}"""
+    entries = load_lesson_rows()
+    results = {name: {} for name in case_names}
+    for scale in scales:
+        data = SyntheticData(entries, scale)
+        print(f"\n规模 {scale}×: {len(data)} 个单词")
+        for name in case_names:
+            timings, items = time_case(CASES[name], data, repeat)
+            best = min(timings)
+            results[name][str(scale)] = {
+                'best': round(best, 6),
+                'median': round(statistics.median(timings), 6),
+                'items': items
+            }
+            print(f"  {name:<40} {best * 1000:10.1f} ms  ({best / items * 1e6:7.2f} µs/条)")
+    return results
+
+def machine_id():
+    """区分基线的机器标识：主机名-CPU 架构-Python 主次版本"""
+    python = '.'.join(platform.python_version_tuple()[:2])
+    raw = f"{platform.node() or 'unknown'}-{platform.machine() or 'unknown'}-py{python}"
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', raw)
+
+def default_baseline_path():
+    return os.path.join(BASELINE_DIR, f'pipeline.{machine_id()}.json')
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_baseline(path, results):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    baseline = {
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'machine_id': machine_id(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+
+def compare_with_baseline(results, baseline, tolerance):
+    """与基线比较最快一次的耗时，返回回退的 [(环节, 规模, 基线, 当前)]"""
+    regressions = []
+    recorded = baseline.get('machine_id')
+    if recorded and recorded != machine_id():
+        print(f"\n⚠️ 基线记录于 {recorded}，本机为 {machine_id()}，绝对耗时不可比，结果仅供参考")
+    print(f"\n与基线（{baseline.get('created', '未知时间')}，Python {baseline.get('python', '?')}）比较，容差 {tolerance:.0%}:")
+    for name, by_scale in results.items():
+        for scale, result in by_scale.items():
+            previous = baseline.get('results', {}).get(name, {}).get(scale)
+            if not previous:
+                print(f"  {name} {scale}×: 基线中没有记录")
+                continue
+            ratio = result['best'] / previous['best'] if previous['best'] else float('inf')
+            regressed = ratio > 1 + tolerance
+            mark = '❌' if regressed else '✅'
+            print(f"  {mark} {name:<40} {scale:>4}×  {previous['best'] * 1000:10.1f} ms -> "
+                  f"{result['best'] * 1000:10.1f} ms ({ratio:.2f}x)")
+            if regressed:
+                regressions.append((name, scale, previous['best'], result['best']))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="词汇处理流程基准测试")
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES, help="合成数据相对现有语料的倍数")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="每个环节重复次数（取最快一次）")
+    parser.add_argument('--only', nargs='+', choices=sorted(CASES), help="只运行指定环节")
+    parser.add_argument('--baseline', help="基线 JSON 文件（默认按本机标识放在 benchmarks/baselines/ 下）")
+    parser.add_argument('--save-baseline', action='store_true', help="把本次结果保存为新基线")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help="允许比基线慢的比例")
+    args = parser.parse_args(argv)
+
+    baseline_path = args.baseline or default_baseline_path()
+    case_names = args.only or list(CASES)
+    results = run_benchmarks(case_names, args.scales, args.repeat)
+
+    if args.save_baseline:
+        baseline = load_baseline(baseline_path) or {}
+        merged = baseline.get('results', {})
+        for name, by_scale in results.items():
+            merged.setdefault(name, {}).update(by_scale)
+        save_baseline(baseline_path, merged)
+        print(f"\n基线已保存到 {baseline_path}")
+        return 0
+
+    baseline = load_baseline(baseline_path)
+    if baseline is None:
+        print(f"\n本机（{machine_id()}）还没有基线 {baseline_path}，用 --save-baseline 生成后再比较")
+        return 0
+    regressions = compare_with_baseline(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} 项比基线慢了 {args.tolerance:.0%} 以上")
+        return 1
+    print("\n没有发现性能回退")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
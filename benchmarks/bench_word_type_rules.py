@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+词性规则引擎基准测试
+对比 word_type_rules 规则引擎与原先 process_words.py / merge_vocabulary.py 中的 if/elif 实现：
+先逐条核对结果一致，再比较单条调用与 classify_many() 批量调用的耗时
+
+用法: python benchmarks/bench_word_type_rules.py [倍数]
+"""
+
+import csv
+import glob
+import os
+import sys
+import timeit
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WEB_DIR = os.path.join(ROOT_DIR, 'web')
+sys.path.insert(0, WEB_DIR)
+
+from word_type_rules import load_word_type_classifier
+
+def _notna(value):
+    """代替 pd.notna，基准测试不依赖 pandas"""
+    return value is not None and not (isinstance(value, float) and value != value)
+
+def legacy_process_words_categorize(kanji, kana, meaning):
+    """process_words.py 原有的 if/elif 实现"""
+    kanji_str = str(kanji) if _notna(kanji) else ""
+    kana_str = str(kana) if _notna(kana) else ""
+    meaning_str = str(meaning) if _notna(meaning) else ""
+    
+    # 动词类型判断
+    if (kana_str.endswith('う') or kana_str.endswith('く') or 
+        kana_str.endswith('ぐ') or kana_str.endswith('す') or 
+        kana_str.endswith('つ') or kana_str.endswith('ぬ') or 
+        kana_str.endswith('ぶ') or kana_str.endswith('む') or 
+        kana_str.endswith('る')):
+        
+        # 一型动词（五段动词）
+        if (kana_str.endswith('う') or kana_str.endswith('く') or 
+            kana_str.endswith('ぐ') or kana_str.endswith('す') or 
+            kana_str.endswith('つ') or kana_str.endswith('ぬ') or 
+            kana_str.endswith('ぶ') or kana_str.endswith('む')):
+            return "动词(1型)"
+        
+        # 二型动词（一段动词）
+        elif kana_str.endswith('る'):
+            # 检查る前面是否是い或え
+            if len(kana_str) >= 2:
+                pre_char = kana_str[-2]
+                if pre_char in 'いえきけしせちてにねひへみめりれ':
+                    return "动词(2型)"
+            return "动词(1型)"
+    
+    # 三型动词（不规则动词）
+    if kana_str in ['する', 'くる', 'こくる'] or kana_str.endswith('する'):
+        return "动词(3型)"
+    
+    # 形容词判断
+    if kana_str.endswith('い') and not kana_str.endswith('る'):
+        return "い形容词"
+    
+    if meaning_str and ('的' in meaning_str or '...的' in meaning_str):
+        return "な形容词"
+    
+    # 片假名外来词
+    katakana_chars = 'アイウエオカキクケコサシスセソタチツテトナニヌネノハヒフヘホマミムメモヤユヨラリルレロワヲンガギグゲゴザジズゼゾダヂヅデドバビブベボパピプペポャュョッ'
+    if any(char in katakana_chars for char in kana_str):
+        return "外来词"
+    
+    # 寒暄语
+    if any(greet in meaning_str.lower() for greet in ['早上好', '您好', '再见', '谢谢', '对不起', '请', '欢迎', '打扰', '失礼']):
+        return "寒暄语"
+    
+    # 数词
+    if any(num in kana_str for num in ['いち', 'に', 'さん', 'よん', 'ご', 'ろく', 'なな', 'はち', 'きゅう', 'じゅう']):
+        return "数词"
+    
+    # 时间词
+    if any(time in meaning_str for time in ['时', '分', '点', '年', '月', '日', '星期', '今天', '明天', '昨天']):
+        return "时间词"
+    
+    # 方位词
+    if any(dir in meaning_str for dir in ['上', '下', '左', '右', '前', '后', '里', '外', '东', '西', '南', '北']):
+        return "方位词"
+    
+    # 专有名词（国家、地名等）
+    if any(place in meaning_str for place in ['国', '市', '县', '省', '京', '州']):
+        return "专有名词"
+    
+    return "名词"
+
+def legacy_merge_vocabulary_categorize(kanji, kana, meaning):
+    """merge_vocabulary.py 原有的 if/elif 实现"""
+    kanji_str = str(kanji) if _notna(kanji) else ""
+    kana_str = str(kana) if _notna(kana) else ""
+    meaning_str = str(meaning) if _notna(meaning) else ""
+    
+    # 动词类型判断
+    if kana_str.endswith('る'):
+        # 检查是否为二型动词（一段动词）
+        if len(kana_str) >= 2:
+            pre_char = kana_str[-2]
+            # い段和え段 + る 通常是二型动词
+            if pre_char in 'いえきけしせちてにねひへみめりれびべぎげじぜぢでびべぴぺ':
+                return "动词(2型)"
+        return "动词(1型)"
+    elif (kana_str.endswith('う') or kana_str.endswith('く') or 
+          kana_str.endswith('ぐ') or kana_str.endswith('す') or 
+          kana_str.endswith('つ') or kana_str.endswith('ぬ') or 
+          kana_str.endswith('ぶ') or kana_str.endswith('む')):
+        return "动词(1型)"
+    
+    # 三型动词（不规则动词）
+    if (kana_str == 'する' or kana_str == 'くる' or 
+        kana_str.endswith('する') or '来' in kanji_str):
+        return "动词(3型)"
+    
+    # 形容词判断
+    if kana_str.endswith('い') and not kana_str.endswith('る'):
+        # 排除一些特殊情况
+        if not any(word in meaning_str for word in ['的', '...的', '某种']):
+            return "い形容词"
+    
+    # な形容词（通常在意思中有"的"或者是形容状态的词）
+    if (meaning_str and ('的' in meaning_str or '...的' in meaning_str) and 
+        not kana_str.endswith('い')):
+        return "な形容词"
+    
+    # 片假名外来词
+    katakana_chars = 'アイウエオカキクケコサシスセソタチツテトナニヌネノハヒフヘホマミムメモヤユヨラリルレロワヲンガギグゲゴザジズゼゾダヂヅデドバビブベボパピプペポャュョッー'
+    if any(char in katakana_chars for char in kana_str):
+        return "外来词"
+    
+    # 寒暄语
+    greetings = ['早上好', '您好', '再见', '谢谢', '对不起', '请', '欢迎', '打扰', '失礼', 
+                '初次见面', '请多关照', '不客气', 'excuse me', '冒昧', '问候']
+    if any(greet in meaning_str for greet in greetings):
+        return "寒暄语"
+    
+    # 数词
+    numbers = ['いち', 'に', 'さん', 'よん', 'ご', 'ろく', 'なな', 'はち', 'きゅう', 'じゅう']
+    if any(num in kana_str for num in numbers) or any(c.isdigit() for c in kanji_str):
+        return "数词"
+    
+    # 时间词
+    time_words = ['时', '分', '点', '年', '月', '日', '星期', '今天', '明天', '昨天', '现在', '上午', '下午']
+    if any(time in meaning_str for time in time_words):
+        return "时间词"
+    
+    # 方位词
+    direction_words = ['上', '下', '左', '右', '前', '后', '里', '外', '东', '西', '南', '北', '中', '旁边']
+    if any(dir_word in meaning_str for dir_word in direction_words):
+        return "方位词"
+    
+    # 专有名词（国家、地名、人名等）
+    proper_nouns = ['国', '市', '县', '省', '京', '州', '大学', '银行', '医院', '公司', '车站']
+    if any(place in meaning_str for place in proper_nouns):
+        return "专有名词"
+    
+    # 代词
+    if any(pronoun in meaning_str for pronoun in ['我', '你', '他', '她', '这', '那', '哪', '什么', '谁']):
+        return "代词"
+    
+    # 连体词
+    if kana_str in ['この', 'その', 'あの', 'どの']:
+        return "连体词"
+    
+    # 副词
+    if any(adv in meaning_str for adv in ['很', '非常', '特别', '稍微', '一点', '完全', '绝对']):
+        return "副词"
+    
+    return "名词"
+
+def load_sample_words(scale=1):
+    """从课程 CSV 取 (汉字, 假名, 释义)，按倍数复制并混入缺失值"""
+    words = []
+    pattern = os.path.join(WEB_DIR, 'data', 'vocabulary', 'lesson_*_vocabulary.csv')
+    for path in sorted(glob.glob(pattern)):
+        with open(path, 'r', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                words.append((row.get('汉字', ''), row.get('假名', ''), row.get('释义', '')))
+    words.append((float('nan'), 'する', None))
+    words.append(('来る', float('nan'), '来'))
+    return words * scale
+
+def run_benchmark(scale=1, repeat=5):
+    """核对一致性并输出耗时"""
+    words = load_sample_words(scale)
+    print(f"样本词数: {len(words)}")
+
+    for ruleset_name, legacy in [('process_words', legacy_process_words_categorize),
+                                 ('merge_vocabulary', legacy_merge_vocabulary_categorize)]:
+        classifier = load_word_type_classifier(ruleset_name)
+
+        mismatches = [
+            word for word in words
+            if legacy(*word) != classifier.classify(*word)
+        ]
+        if mismatches:
+            print(f"❌ {ruleset_name}: {len(mismatches)} 个词结果不一致，例如 {mismatches[0]}")
+            return False
+
+        legacy_time = min(timeit.repeat(lambda: [legacy(*word) for word in words], number=1, repeat=repeat))
+        single_time = min(timeit.repeat(lambda: [classifier.classify(*word) for word in words], number=1, repeat=repeat))
+        batch_time = min(timeit.repeat(lambda: classifier.classify_many(words), number=1, repeat=repeat))
+
+        print(f"\n规则集 {ruleset_name}: 结果一致 ✅")
+        print(f"  原 if/elif 实现:   {legacy_time * 1000:8.2f} ms")
+        print(f"  规则引擎 classify: {single_time * 1000:8.2f} ms ({legacy_time / single_time:.1f}x)")
+        print(f"  classify_many:     {batch_time * 1000:8.2f} ms ({legacy_time / batch_time:.1f}x)")
+
+    return True
+
+if __name__ == "__main__":
+    scale = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    sys.exit(0 if run_benchmark(scale) else 1)
@@ -6,55 +6,78 @@
 """
 
 import pandas as pd
+import argparse
+import glob
+import io
 import os
 import re
-import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
 from datetime import datetime
+from functools import lru_cache
 
-def clean_vocabulary_entry(kana_reading):
-    """
-    清理带有括号和省略号的假名读音
-    例如: ...ふん（...ぷん） -> 创建两个可能的答案: ふん, ぷん
-    """
+# web 下的公共模块：阶段性能分析（stage_profiler）、原子写入（lesson_writer）、文件锁（lesson_lock）
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'web'))
+from lesson_lock import write_lock
+from lesson_writer import atomic_write
+from stage_profiler import profiled, stage
+
+# 默认清理的词汇文件目录
+DEFAULT_VOCAB_DIRS = [
+    r'e:\work\2025_8_24ReciteKing\data\vocabulary',
+    r'e:\work\2025_8_24ReciteKing\web\data\vocabulary'
+]
+
+LESSON_FILE_RE = re.compile(r'lesson_(\d+)_vocabulary\.csv$')
+
+# 假名读音清理用到的正则，在导入时编译一次
+LEADING_ELLIPSIS_RE = re.compile(r'^…+')
+BRACKET_RE = re.compile(r'（.*?）')
+BRACKET_CONTENT_RE = re.compile(r'（(.*?)）')
+
+# 不同读音的数量有限，缓存上限足够覆盖多套教材
+ENTRY_CACHE_SIZE = 65536
+
+@lru_cache(maxsize=ENTRY_CACHE_SIZE)
+def _clean_vocabulary_entry(kana_reading):
+    """clean_vocabulary_entry 的缓存实现，返回不可变的元组"""
     # 移除开头的省略号
-    cleaned = re.sub(r'^…+', '', kana_reading)
+    cleaned = LEADING_ELLIPSIS_RE.sub('', kana_reading)
     
     # 处理带括号的情况，如: ふん（ぷん）
     if '（' in cleaned and '）' in cleaned:
         # 提取括号外和括号内的内容
-        main_part = re.sub(r'（.*?）', '', cleaned)
-        bracket_content = re.search(r'（(.*?)）', cleaned)
+        main_part = BRACKET_RE.sub('', cleaned)
+        bracket_content = BRACKET_CONTENT_RE.search(cleaned)
         
         if bracket_content:
             bracket_part = bracket_content.group(1)
             # 移除括号内容开头的省略号
-            bracket_part = re.sub(r'^…+', '', bracket_part)
+            bracket_part = LEADING_ELLIPSIS_RE.sub('', bracket_part)
             
             # 返回两个可能的答案
-            return [main_part.strip(), bracket_part.strip()]
+            return (main_part.strip(), bracket_part.strip())
     
     # 如果没有括号，只是移除省略号
-    return [cleaned.strip()]
+    return (cleaned.strip(),)
 
-def process_vocabulary_file(file_path):
-    """处理单个词汇文件"""
-    print(f"正在处理文件: {file_path}")
-    
-    # 备份原文件
-    backup_path = file_path + '.backup'
-    shutil.copy2(file_path, backup_path)
-    print(f"已备份原文件到: {backup_path}")
-    
-    # 读取CSV文件
-    try:
-        df = pd.read_csv(file_path, encoding='utf-8')
-    except:
-        try:
-            df = pd.read_csv(file_path, encoding='gbk')
-        except:
-            print(f"无法读取文件: {file_path}")
-            return
-    
+def clean_vocabulary_entry(kana_reading):
+    """
+    清理带有括号和省略号的假名读音
+    例如: ...ふん（...ぷん） -> 创建两个可能的答案: ふん, ぷん
+    相同的读音只计算一次
+    """
+    return list(_clean_vocabulary_entry(kana_reading))
+
+def clean_vocabulary_entries(kana_readings):
+    """批量清理假名读音，返回与输入顺序一致的变体列表；重复读音只查一次缓存"""
+    kana_readings = list(kana_readings)
+    variants = {kana_reading: _clean_vocabulary_entry(kana_reading) for kana_reading in set(kana_readings)}
+    return [list(variants[kana_reading]) for kana_reading in kana_readings]
+
+def collect_changes(df):
+    """逐行检查假名读音列（第3列），返回需要修改的条目"""
     changes_made = []
     
     # 检查每一行的假名读音列（通常是第3列，索引为2）
@@ -71,7 +94,6 @@ def process_vocabulary_file(file_path):
                     # 如果有多个变体，创建一个包含所有可能答案的字符串
                     # 使用特殊分隔符来表示多个可能的答案
                     new_kana = '|'.join(cleaned_variants)
-                    df.iloc[index, 2] = new_kana
                     
                     changes_made.append({
                         'row': index + 1,
@@ -81,7 +103,6 @@ def process_vocabulary_file(file_path):
                     })
                 elif len(cleaned_variants) == 1 and cleaned_variants[0] != original_kana:
                     # 单个变体但有变化
-                    df.iloc[index, 2] = cleaned_variants[0]
                     changes_made.append({
                         'row': index + 1,
                         'original': original_kana,
@@ -89,9 +110,97 @@ def process_vocabulary_file(file_path):
                         'variants': cleaned_variants
                     })
     
+    return changes_made
+
+def collect_changes_vectorized(df):
+    """
+    用 Series.str 批量检查假名读音列，结果与 collect_changes 相同
+    只有含省略号或括号的行才会逐条生成变更记录
+    """
+    if df.shape[1] < 3:
+        return []
+    
+    kana = df.iloc[:, 2].reset_index(drop=True)
+    if not (pd.api.types.is_object_dtype(kana) or pd.api.types.is_string_dtype(kana)):
+        # 数字等非文本列不可能含有省略号或括号
+        return []
+    
+    # 找出包含需要清理的模式的行
+    mask = (kana.str.contains('…', regex=False, na=False) |
+            kana.str.contains('（', regex=False, na=False))
+    if not mask.any():
+        return []
+    
+    original = kana[mask]
+    
+    # 移除开头的省略号
+    cleaned = original.str.replace(LEADING_ELLIPSIS_RE, '', regex=True)
+    
+    # 括号外和括号内的内容，与 clean_vocabulary_entry 的处理一致
+    bracket_part = cleaned.str.extract(BRACKET_CONTENT_RE, expand=False)
+    has_variants = (cleaned.str.contains('（', regex=False) &
+                    cleaned.str.contains('）', regex=False) &
+                    bracket_part.notna())
+    main_part = cleaned.str.replace(BRACKET_RE, '', regex=True).str.strip()
+    bracket_part = bracket_part.str.replace(LEADING_ELLIPSIS_RE, '', regex=True).str.strip()
+    single_part = cleaned.str.strip()
+    
+    new_kana = single_part.where(~has_variants, main_part + '|' + bracket_part)
+    changed = has_variants | (single_part != original)
+    
+    # 只对有变化的行逐条生成变更记录
+    changes_made = []
+    for position, multi, original_kana, cleaned_kana, main, bracket, single in zip(
+            changed.index[changed], has_variants[changed], original[changed], new_kana[changed],
+            main_part[changed], bracket_part[changed], single_part[changed]):
+        changes_made.append({
+            'row': int(position) + 1,
+            'original': original_kana,
+            'cleaned': cleaned_kana,
+            'variants': [main, bracket] if multi else [single]
+        })
+    
+    return changes_made
+
+def process_vocabulary_file(file_path, vectorized=True):
+    """
+    处理单个词汇文件
+    vectorized=True 时用 Series.str 批量查找和清理，否则逐行处理
+    从读取到写回持有该文件的写锁，不会覆盖并行运行的其他写者的修改
+    """
+    with stage(os.path.basename(file_path)), write_lock(file_path):
+        return _process_vocabulary_file(file_path, vectorized)
+
+def _process_vocabulary_file(file_path, vectorized):
+    print(f"正在处理文件: {file_path}")
+    
+    # 读取CSV文件
+    with stage('read'):
+        try:
+            df = pd.read_csv(file_path, encoding='utf-8')
+        except:
+            try:
+                df = pd.read_csv(file_path, encoding='gbk')
+            except:
+                print(f"无法读取文件: {file_path}")
+                return
+    
+    with stage('clean'):
+        if vectorized:
+            changes_made = collect_changes_vectorized(df)
+        else:
+            changes_made = collect_changes(df)
+    
     # 保存清理后的文件
     if changes_made:
-        df.to_csv(file_path, index=False, encoding='utf-8')
+        # 一次性写回所有修改的单元格
+        with stage('write'):
+            positions = [change['row'] - 1 for change in changes_made]
+            df.iloc[positions, 2] = [change['cleaned'] for change in changes_made]
+            
+            # 先写临时文件再整体替换，中途出错原文件保持不变，不需要再另存备份
+            with atomic_write(file_path) as f:
+                df.to_csv(f, index=False)
         print(f"文件已更新: {file_path}")
         
         # 打印变更详情
@@ -101,8 +210,6 @@ def process_vocabulary_file(file_path):
                 print(f"    可接受的答案: {', '.join(change['variants'])}")
     else:
         print(f"文件无需修改: {file_path}")
-        # 删除不必要的备份
-        os.remove(backup_path)
     
     return changes_made
 
@@ -148,36 +255,71 @@ def update_word_typing_js():
     else:
         print("word-typing.js已包含答案验证功能")
 
-def main():
+def find_lesson_files(vocab_dir):
+    """按课程编号顺序列出目录下所有 lesson_XX_vocabulary.csv"""
+    lesson_files = []
+    for file_path in glob.glob(os.path.join(vocab_dir, 'lesson_*_vocabulary.csv')):
+        match = LESSON_FILE_RE.search(os.path.basename(file_path))
+        if match:
+            lesson_files.append((int(match.group(1)), file_path))
+    return [file_path for _, file_path in sorted(lesson_files)]
+
+def _clean_file_job(file_path):
+    """进程池中的清理任务：输出先缓存起来，由主进程按文件顺序打印"""
+    output = io.StringIO()
+    with redirect_stdout(output):
+        changes = process_vocabulary_file(file_path)
+    return changes, output.getvalue()
+
+def clean_files(file_paths, jobs=1):
+    """
+    清理一组文件，按 file_paths 的顺序逐个产出 (变更列表, 缓存的输出)
+    jobs > 1 时用进程池并行处理；逐个处理时输出直接打印，缓存为 None
+    """
+    if jobs <= 1:
+        for file_path in file_paths:
+            yield process_vocabulary_file(file_path), None
+        return
+    
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(_clean_file_job, file_paths)
+
+@profiled('clean_vocabulary')
+def main(argv=None):
     """主函数"""
+    parser = argparse.ArgumentParser(description='清理词汇文件中的括号和省略号')
+    parser.add_argument('vocab_dirs', nargs='*', default=DEFAULT_VOCAB_DIRS,
+                        help='要清理的词汇目录（默认为项目中的两个 vocabulary 目录）')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='并行清理的进程数，0 表示使用全部 CPU（默认 1，逐个处理）')
+    args = parser.parse_args(argv)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    
     print("开始清理词汇文件...")
     print("=" * 60)
     
-    # 定义词汇文件目录
-    vocab_dirs = [
-        r'e:\work\2025_8_24ReciteKing\data\vocabulary',
-        r'e:\work\2025_8_24ReciteKing\web\data\vocabulary'
-    ]
-    
-    all_changes = {}
-    
-    for vocab_dir in vocab_dirs:
+    # 找出所有目录中的lesson_XX_vocabulary.csv文件
+    dir_files = []
+    for vocab_dir in args.vocab_dirs:
         if not os.path.exists(vocab_dir):
             print(f"目录不存在: {vocab_dir}")
             continue
-            
+        dir_files.append((vocab_dir, find_lesson_files(vocab_dir)))
+    
+    all_changes = {}
+    results = clean_files([file_path for _, files in dir_files for file_path in files], jobs)
+    
+    # 按目录和课程顺序汇总结果，保证报告内容与处理顺序无关
+    for vocab_dir, files in dir_files:
         print(f"\n处理目录: {vocab_dir}")
         print("-" * 50)
         
-        # 处理所有lesson_XX_vocabulary.csv文件
-        for i in range(1, 26):  # lesson 1-25
-            filename = f"lesson_{i:02d}_vocabulary.csv"
-            file_path = os.path.join(vocab_dir, filename)
-            
-            if os.path.exists(file_path):
-                changes = process_vocabulary_file(file_path)
-                if changes:
-                    all_changes[file_path] = changes
+        for file_path in files:
+            changes, output = next(results)
+            if output:
+                print(output, end='')
+            if changes:
+                all_changes[file_path] = changes
     
     # 更新JavaScript文件以支持多答案
     update_word_typing_js()
@@ -1,14 +1,17 @@
-import random
-import csv
 import os
 import configparser
 
+from kana_options import KanaOptionPool, load_kana_rows
+from kana_picker import ActiveSet, WeightedActiveSet, score_weight
+
 def load_config(config_file="config.txt"):
     """加载配置文件"""
     config = {
         'enabled_types': ['hiragana', 'katakana', 'dakuten', 'handakuten', 'youon', 'youon_dakuten', 'youon_handakuten', 'chouon'],
         'target_score': 2,
-        'option_count': 4
+        'option_count': 4,
+        'confusable_options': False,
+        'weighted_pick': False
     }
     
     if not os.path.exists(config_file):
@@ -35,6 +38,10 @@ def load_config(config_file="config.txt"):
                     config['target_score'] = int(value)
                 elif key == 'option_count':
                     config['option_count'] = int(value)
+                elif key == 'confusable_options':
+                    config['confusable_options'] = value.lower() == 'true'
+                elif key == 'weighted_pick':
+                    config['weighted_pick'] = value.lower() == 'true'
         
         if enabled_types:
             config['enabled_types'] = enabled_types
@@ -46,53 +53,38 @@ def load_config(config_file="config.txt"):
     return config
 
 def load_kana_data(csv_file="kana_data.csv", enabled_types=None):
-    """从CSV文件加载假名数据"""
-    kana_map = {}
+    """从CSV文件加载假名数据，返回 [(假名, 罗马音, 类型), ...]"""
+    kana_rows = []
     
     # 检查文件是否存在
     if not os.path.exists(csv_file):
         print(f"错误：找不到文件 {csv_file}")
-        return kana_map
-    
-    if enabled_types is None:
-        enabled_types = ['hiragana', 'katakana', 'dakuten', 'handakuten', 'youon', 'youon_dakuten', 'youon_handakuten', 'chouon']
+        return kana_rows
     
     try:
-        with open(csv_file, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                if row['type'] in enabled_types:
-                    kana_map[row['kana']] = row['romaji']
-        print(f"成功加载 {len(kana_map)} 个假名数据")
+        kana_rows = load_kana_rows(csv_file, enabled_types)
+        print(f"成功加载 {len({kana for kana, _, _ in kana_rows})} 个假名数据")
     except Exception as e:
         print(f"读取CSV文件时出错：{e}")
     
-    return kana_map
+    return kana_rows
 
 # 加载配置
 config = load_config()
 
 # 加载假名数据
-kana_map = load_kana_data(enabled_types=config['enabled_types'])
+kana_rows = load_kana_data(enabled_types=config['enabled_types'])
+kana_map = {kana: romaji for kana, romaji, _ in kana_rows}
+
+# 选项池（罗马音去重、按假名类型分组，只整理一次），与 kana_map 共用已读取的数据
+option_pool = KanaOptionPool(kana_rows)
 
 # 存储假名对应的分数
 score_map = {}
 
-def get_options(correct_romaji, option_count=4):
-    """生成随机选项"""
-    options = [correct_romaji]
-    
-    # 获取所有不同的罗马音
-    all_romaji = [romaji for romaji in kana_map.values() if romaji != correct_romaji]
-    
-    # 随机选择干扰项
-    random.shuffle(all_romaji)
-    for i in range(min(option_count - 1, len(all_romaji))):
-        options.append(all_romaji[i])
-    
-    # 打乱选项顺序
-    random.shuffle(options)
-    return options
+def get_options(correct_romaji, option_count=4, kana=None):
+    """生成随机选项（给出假名且启用 confusable_options 时，干扰项优先取同类型假名）"""
+    return option_pool.options(correct_romaji, option_count, kana, config['confusable_options'])
 
 def display_options(options):
     """显示选项"""
@@ -110,14 +102,20 @@ def start_game():
     for kana in kana_map.keys():
         score_map[kana] = 0
     
-    while score_map:
+    # 未达标的假名集合（加权模式下分数越低越容易被抽到）
+    if config['weighted_pick']:
+        active = WeightedActiveSet(score_map, score_weight(0, config['target_score']))
+    else:
+        active = ActiveSet(score_map)
+    
+    while active:
         # 随机选择一个假名
-        kana = random.choice(list(score_map.keys()))
+        kana = active.pick()
         correct_romaji = kana_map[kana]
         
         # 显示题目
         print(f"请为 [{kana}] 选择正确的罗马音：")
-        options = get_options(correct_romaji, config['option_count'])
+        options = get_options(correct_romaji, config['option_count'], kana)
         display_options(options)
         
         # 获取用户输入
@@ -144,6 +142,9 @@ def start_game():
         if score_map[kana] >= config['target_score']:
             print(f"🎉 [{kana}] 达标，不再出现！")
             del score_map[kana]
+            active.remove(kana)
+        elif config['weighted_pick']:
+            active.set_weight(kana, score_weight(score_map[kana], config['target_score']))
         
         print()  # 空行分隔
     
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+假名选择题选项生成器
+罗马音去重后只整理一次，每个干扰项池是同一个数组里的一段连续下标；
+出题时用 random.sample 在下标范围内抽取，每道题的开销只和选项数量有关
+"""
+
+import csv
+import os
+import random
+
+KANA_TYPES = ['hiragana', 'katakana', 'dakuten', 'handakuten', 'youon', 'youon_dakuten', 'youon_handakuten', 'chouon']
+ALL_POOL = 'all'
+
+def load_kana_rows(csv_file="kana_data.csv", enabled_types=None):
+    """读取 kana_data.csv，返回 [(假名, 罗马音, 类型), ...]"""
+    if enabled_types is None:
+        enabled_types = KANA_TYPES
+
+    with open(csv_file, 'r', encoding='utf-8') as file:
+        return [
+            (row['kana'], row['romaji'], row['type'])
+            for row in csv.DictReader(file)
+            if row['type'] in enabled_types
+        ]
+
+class KanaOptionPool:
+    """
+    预先整理好的干扰项池
+    所有池共用一个罗马音数组：开头是全部去重后的罗马音，后面依次是各假名类型（易混淆池）去重后的罗马音
+    """
+
+    def __init__(self, rows):
+        self._romaji = []
+        self._ranges = {}
+        self._positions = {}
+        self._kana_romaji = {}
+        self._kana_type = {}
+
+        by_type = {}
+        for kana, romaji, kana_type in rows:
+            self._kana_romaji[kana] = romaji
+            self._kana_type[kana] = kana_type
+            by_type.setdefault(kana_type, []).append(romaji)
+
+        self._add_pool(ALL_POOL, [romaji for _, romaji, _ in rows])
+        for kana_type, romaji_list in by_type.items():
+            self._add_pool(kana_type, romaji_list)
+
+    @classmethod
+    def from_csv(cls, csv_file="kana_data.csv", enabled_types=None):
+        return cls(load_kana_rows(csv_file, enabled_types))
+
+    @classmethod
+    def from_kana_map(cls, kana_map):
+        """从 {假名: 罗马音} 构建（没有类型信息，只有全部罗马音这一个池）"""
+        return cls((kana, romaji, ALL_POOL) for kana, romaji in kana_map.items())
+
+    def _add_pool(self, name, romaji_list):
+        start = len(self._romaji)
+        positions = {}
+        for romaji in romaji_list:
+            if romaji not in positions:
+                positions[romaji] = len(self._romaji)
+                self._romaji.append(romaji)
+        self._ranges[name] = (start, len(self._romaji))
+        self._positions[name] = positions
+
+    def __len__(self):
+        return self._ranges[ALL_POOL][1]
+
+    def pools(self):
+        """所有池的名称"""
+        return list(self._ranges)
+
+    def pool_romaji(self, name=ALL_POOL):
+        """某个池里去重后的罗马音"""
+        start, end = self._ranges[name]
+        return self._romaji[start:end]
+
+    def romaji(self, kana):
+        return self._kana_romaji[kana]
+
+    def kana_type(self, kana):
+        return self._kana_type.get(kana)
+
+    def _sample(self, name, correct_romaji, count, rng, exclude=()):
+        """在池的下标范围内抽取 count 个不等于正确答案（也不在 exclude 中）的罗马音"""
+        start, end = self._ranges[name]
+        positions = self._positions[name]
+        if exclude:
+            skip = sorted({positions[romaji] for romaji in (correct_romaji, *exclude) if romaji in positions})
+        else:
+            position = positions.get(correct_romaji)
+            skip = [] if position is None else [position]
+        count = min(count, end - start - len(skip))
+        if count <= 0:
+            return []
+
+        # 在去掉 skip 之后的区间上抽样，再把下标平移回原数组
+        picks = rng.sample(range(start, end - len(skip)), count)
+        if skip:
+            for i, position in enumerate(picks):
+                for skipped in skip:
+                    if position >= skipped:
+                        position += 1
+                picks[i] = position
+        return [self._romaji[position] for position in picks]
+
+    def distractors(self, correct_romaji, count, kana=None, confusable=False, rng=random):
+        """
+        抽取 count 个干扰项
+        confusable=True 且给出假名时优先从同类型假名中抽取，同类型不够再从全部罗马音中补足
+        """
+        chosen = []
+        kana_type = self._kana_type.get(kana) if confusable else None
+        if kana_type is not None and kana_type != ALL_POOL:
+            chosen = self._sample(kana_type, correct_romaji, count, rng)
+        if len(chosen) < count:
+            chosen += self._sample(ALL_POOL, correct_romaji, count - len(chosen), rng, exclude=chosen)
+        return chosen
+
+    def options(self, correct_romaji, option_count=4, kana=None, confusable=False, rng=random):
+        """生成一道题的选项（正确答案加干扰项，已打乱顺序）"""
+        options = [correct_romaji]
+        options += self.distractors(correct_romaji, option_count - 1, kana, confusable, rng)
+        rng.shuffle(options)
+        return options
+
+    def iter_quiz(self, item_count, option_count=4, confusable=False, kanas=None, seed=None):
+        """
+        批量生成题目，逐题产出 (假名, 正确罗马音, 选项)
+        题目假名从 kanas（默认全部假名）中随机抽取；给定 seed 时结果可复现
+        """
+        rng = random.Random(seed)
+        kanas = list(kanas if kanas is not None else self._kana_romaji)
+        for _ in range(item_count):
+            kana = rng.choice(kanas)
+            correct_romaji = self._kana_romaji[kana]
+            yield kana, correct_romaji, self.options(correct_romaji, option_count, kana, confusable, rng)
+
+def write_quiz_sheet(output_file, pool, item_count, option_count=4, confusable=False, seed=None):
+    """把批量生成的题目写入 CSV 试卷，返回题目数量"""
+    directory = os.path.dirname(output_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    written = 0
+    with open(output_file, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['kana', 'romaji'] + [f'option_{i}' for i in range(1, option_count + 1)])
+        for kana, correct_romaji, options in pool.iter_quiz(item_count, option_count, confusable, seed=seed):
+            writer.writerow([kana, correct_romaji] + options)
+            written += 1
+    return written
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+假名出题调度
+ActiveSet 用“数组 + 下标字典”保存还没达标的假名，随机抽取和移除都是 O(1)（移除时与末尾元素交换）；
+WeightedActiveSet 额外用树状数组（Fenwick 树）维护权重，分数越低的假名越容易被抽到，抽取和改权重都是 O(log n)
+"""
+
+import random
+
+def score_weight(score, target_score):
+    """加权模式下假名的权重：离达标还差几分，权重就是几（至少为 1）"""
+    return max(1, target_score - score)
+
+class ActiveSet:
+    """还在练习中的假名集合，支持 O(1) 随机抽取和 O(1) 移除"""
+
+    def __init__(self, items=()):
+        self._items = []
+        self._index = {}
+        for item in items:
+            self.add(item)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item):
+        return item in self._index
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def add(self, item):
+        if item in self._index:
+            return
+        self._index[item] = len(self._items)
+        self._items.append(item)
+
+    def remove(self, item):
+        """把末尾元素移到被删元素的位置，再删掉末尾"""
+        position = self._index.pop(item)
+        last = self._items.pop()
+        if position < len(self._items):
+            self._items[position] = last
+            self._index[last] = position
+
+    def pick(self, rng=random):
+        """等概率随机抽取一个假名"""
+        return self._items[int(rng.random() * len(self._items))]
+
+class WeightedActiveSet(ActiveSet):
+    """
+    按权重随机抽取的假名集合
+    权重为正整数，保存在与数组同下标的树状数组中
+    """
+
+    def __init__(self, items=(), weight=1):
+        self._weights = []
+        self._tree = [0]
+        self._total = 0
+        super().__init__()
+        for item in items:
+            self.add(item, weight)
+
+    def _update(self, position, delta):
+        self._total += delta
+        tree = self._tree
+        size = len(tree)
+        i = position + 1
+        while i < size:
+            tree[i] += delta
+            i += i & -i
+
+    def _grow(self):
+        """在末尾追加一个权重为 0 的位置，同时补上树状数组对应节点的区间和"""
+        i = len(self._tree)
+        node = 0
+        child = i - 1
+        lowest = i & -i
+        while child > i - lowest:
+            node += self._tree[child]
+            child -= child & -child
+        self._tree.append(node)
+        self._weights.append(0)
+
+    def add(self, item, weight=1):
+        if item in self._index:
+            self.set_weight(item, weight)
+            return
+        super().add(item)
+        if len(self._weights) < len(self._items):
+            self._grow()
+        self.set_weight(item, weight)
+
+    def weight(self, item):
+        return self._weights[self._index[item]]
+
+    def set_weight(self, item, weight):
+        position = self._index[item]
+        if weight <= 0:
+            raise ValueError(f"权重必须为正整数: {item}={weight}")
+        self._update(position, weight - self._weights[position])
+        self._weights[position] = weight
+
+    def remove(self, item):
+        position = self._index[item]
+        last_position = len(self._items) - 1
+        last_weight = self._weights[last_position]
+
+        # 末尾位置清零，被删位置换成末尾元素的权重
+        self._update(last_position, -last_weight)
+        self._weights[last_position] = 0
+        if position != last_position:
+            self._update(position, last_weight - self._weights[position])
+            self._weights[position] = last_weight
+        super().remove(item)
+
+    def total_weight(self):
+        return self._total
+
+    def pick(self, rng=random):
+        """按权重随机抽取：在树状数组上二分查找前缀和刚好超过随机数的位置"""
+        tree = self._tree
+        size = len(tree)
+        target = int(rng.random() * self._total)
+        position = 0
+        step = 1 << (size - 1).bit_length()
+        while step:
+            node = position + step
+            if node < size and tree[node] <= target:
+                position = node
+                target -= tree[node]
+            step >>= 1
+        return self._items[position]
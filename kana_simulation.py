@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+假名背诵的无界面批量模拟
+让大量虚拟学习者按 demo.py 相同的计分规则（答对 +1，答错 -1 但不低于 0，达到 target_score 移除）做题，
+统计清空全部假名所需的回合数分布，用来调整 config.txt 里的 target_score / option_count 等默认值
+
+用法: python kana_simulation.py [--learners N] [--target-score 2 3] [--option-count 3 4] [--jobs N]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from kana_options import KANA_TYPES, load_kana_rows
+from kana_picker import ActiveSet, WeightedActiveSet, score_weight
+
+DEFAULT_MAX_TURNS = 100000
+CHUNK_SIZE = 250
+
+class AccuracyModel:
+    """
+    虚拟学习者的正确率模型
+    - 每个假名有“会”的概率：按类型取 type_accuracy，没有设置的类型用 base_accuracy
+    - 每个学习者整体水平在 ±ability_spread 内随机浮动
+    - 每练一次，“会”的概率向 1 靠近 learning_rate
+    - 不会的时候在 option_count 个选项里瞎猜
+    """
+
+    def __init__(self, base_accuracy=0.6, type_accuracy=None, learning_rate=0.1, ability_spread=0.1):
+        self.base_accuracy = base_accuracy
+        self.type_accuracy = dict(type_accuracy or {})
+        self.learning_rate = learning_rate
+        self.ability_spread = ability_spread
+
+    def initial_accuracy(self, kana_types, rng):
+        """为一个学习者生成每个假名的初始掌握概率"""
+        offset = rng.uniform(-self.ability_spread, self.ability_spread)
+        return [
+            min(1.0, max(0.0, self.type_accuracy.get(kana_type, self.base_accuracy) + offset))
+            for kana_type in kana_types
+        ]
+
+def simulate_learner(kana_types, model, target_score=2, option_count=4, weighted=False,
+                     rng=random, max_turns=DEFAULT_MAX_TURNS):
+    """
+    模拟一个学习者做完全部假名，返回 (回合数, 是否全部达标)
+    只判断答对答错，不实际生成选项：猜对的概率就是 1 / option_count
+    """
+    known = model.initial_accuracy(kana_types, rng)
+    scores = [0] * len(kana_types)
+    if weighted:
+        active = WeightedActiveSet(range(len(kana_types)), score_weight(0, target_score))
+    else:
+        active = ActiveSet(range(len(kana_types)))
+
+    guess = 1.0 / max(1, option_count)
+    learning_rate = model.learning_rate
+    draw = rng.random
+    pick = active.pick
+
+    turns = 0
+    while active and turns < max_turns:
+        turns += 1
+        kana = pick(rng)
+        p = known[kana]
+        if draw() < p + (1.0 - p) * guess:
+            scores[kana] += 1
+        elif scores[kana]:
+            scores[kana] -= 1
+        known[kana] = p + learning_rate * (1.0 - p)
+
+        if scores[kana] >= target_score:
+            active.remove(kana)
+        elif weighted:
+            active.set_weight(kana, score_weight(scores[kana], target_score))
+
+    return turns, not active
+
+def _simulate_chunk(job):
+    """进程池任务：模拟一批学习者（每个学习者有自己的种子，结果与进程数无关）"""
+    kana_types, model, target_score, option_count, weighted, seeds, max_turns = job
+    return [
+        simulate_learner(kana_types, model, target_score, option_count, weighted, random.Random(seed), max_turns)
+        for seed in seeds
+    ]
+
+class SimulationResult:
+    """一组设置下的回合数分布"""
+
+    def __init__(self, settings, outcomes):
+        self.settings = settings
+        self.turn_counts = sorted(turns for turns, finished in outcomes if finished)
+        self.unfinished = sum(1 for _, finished in outcomes if not finished)
+        self.total_turns = sum(turns for turns, _ in outcomes)
+
+    def __len__(self):
+        return len(self.turn_counts) + self.unfinished
+
+    def percentile(self, fraction):
+        if not self.turn_counts:
+            return None
+        index = min(len(self.turn_counts) - 1, int(fraction * len(self.turn_counts)))
+        return self.turn_counts[index]
+
+    def summary(self):
+        counts = self.turn_counts
+        return {
+            'learners': len(self),
+            'unfinished': self.unfinished,
+            'mean': statistics.fmean(counts) if counts else None,
+            'stdev': statistics.pstdev(counts) if counts else None,
+            'min': counts[0] if counts else None,
+            'p10': self.percentile(0.10),
+            'p50': self.percentile(0.50),
+            'p90': self.percentile(0.90),
+            'p99': self.percentile(0.99),
+            'max': counts[-1] if counts else None
+        }
+
+    def histogram(self, bin_width=50):
+        """{区间起点: 人数}"""
+        bins = {}
+        for turns in self.turn_counts:
+            start = turns // bin_width * bin_width
+            bins[start] = bins.get(start, 0) + 1
+        return bins
+
+def simulate(learners=1000, target_score=2, option_count=4, model=None, kana_types=None,
+             weighted=False, jobs=None, seed=0, max_turns=DEFAULT_MAX_TURNS):
+    """
+    模拟 learners 个学习者，返回 SimulationResult
+    kana_types 为每个假名的类型列表（默认读取 kana_data.csv 的全部假名）；jobs 为进程数，0 表示 CPU 核数，None 或 1 在当前进程运行
+    """
+    model = model or AccuracyModel()
+    if kana_types is None:
+        kana_types = [kana_type for _, _, kana_type in load_kana_rows()]
+
+    master = random.Random(seed)
+    seeds = [master.getrandbits(64) for _ in range(learners)]
+    job_list = [
+        (kana_types, model, target_score, option_count, weighted, seeds[i:i + CHUNK_SIZE], max_turns)
+        for i in range(0, learners, CHUNK_SIZE)
+    ]
+
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    if not jobs or jobs <= 1 or len(job_list) <= 1:
+        chunks = map(_simulate_chunk, job_list)
+        outcomes = [outcome for chunk in chunks for outcome in chunk]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            outcomes = [outcome for chunk in executor.map(_simulate_chunk, job_list) for outcome in chunk]
+
+    settings = {
+        'target_score': target_score,
+        'option_count': option_count,
+        'weighted': weighted,
+        'kana': len(kana_types)
+    }
+    return SimulationResult(settings, outcomes)
+
+def sweep(target_scores, option_counts, **kwargs):
+    """对 target_score × option_count 的每种组合运行模拟，返回 {(target_score, option_count): SimulationResult}"""
+    return {
+        (target_score, option_count): simulate(target_score=target_score, option_count=option_count, **kwargs)
+        for target_score in target_scores
+        for option_count in option_counts
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="假名背诵批量模拟，统计清空全部假名所需的回合数")
+    parser.add_argument('--learners', type=int, default=1000, help="虚拟学习者人数")
+    parser.add_argument('--target-score', type=int, nargs='+', default=[2], help="达标分数（可给多个）")
+    parser.add_argument('--option-count', type=int, nargs='+', default=[4], help="选项数量（可给多个）")
+    parser.add_argument('--types', nargs='+', default=KANA_TYPES, choices=KANA_TYPES, help="参与练习的假名类型")
+    parser.add_argument('--accuracy', type=float, default=0.6, help="初始掌握概率")
+    parser.add_argument('--learning-rate', type=float, default=0.1, help="每练一次掌握概率的提升比例")
+    parser.add_argument('--spread', type=float, default=0.1, help="学习者水平的浮动范围")
+    parser.add_argument('--weighted', action='store_true', help="分数越低的假名越容易被抽到")
+    parser.add_argument('--max-turns', type=int, default=DEFAULT_MAX_TURNS, help="单个学习者的回合上限")
+    parser.add_argument('--seed', type=int, default=0, help="随机种子")
+    parser.add_argument('-j', '--jobs', type=int, default=0, help="并行进程数（0 表示 CPU 核数）")
+    args = parser.parse_args(argv)
+
+    kana_types = [kana_type for _, _, kana_type in load_kana_rows(enabled_types=args.types)]
+    model = AccuracyModel(args.accuracy, learning_rate=args.learning_rate, ability_spread=args.spread)
+    print(f"假名 {len(kana_types)} 个，学习者 {args.learners} 人")
+
+    start = time.perf_counter()
+    results = sweep(
+        args.target_score, args.option_count,
+        learners=args.learners, model=model, kana_types=kana_types, weighted=args.weighted,
+        jobs=args.jobs, seed=args.seed, max_turns=args.max_turns
+    )
+    elapsed = time.perf_counter() - start
+
+    print(f"{'达标分数':>6} {'选项数':>6} {'平均':>9} {'P10':>7} {'P50':>7} {'P90':>7} {'P99':>7} {'未完成':>6}")
+    total_turns = 0
+    for (target_score, option_count), result in results.items():
+        summary = result.summary()
+        total_turns += result.total_turns
+        if summary['mean'] is None:
+            print(f"{target_score:>10} {option_count:>9} {'-':>9} {'-':>7} {'-':>7} {'-':>7} {'-':>7} {summary['unfinished']:>9}")
+            continue
+        print(f"{target_score:>10} {option_count:>9} {summary['mean']:>9.1f} {summary['p10']:>7} "
+              f"{summary['p50']:>7} {summary['p90']:>7} {summary['p99']:>7} {summary['unfinished']:>9}")
+
+    print(f"共模拟 {total_turns} 回合，用时 {elapsed:.2f} 秒")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ReciteKing 统一命令行入口
+各个子命令只在执行时才导入对应的脚本，pandas 等重量级依赖只有 import / clean 才会加载，
+verify、report 等轻量命令启动只需几十毫秒
+
+用法:
+  python reciteking.py import                     从 minanonihongo_words.xls 导入单词到课程 CSV
+  python reciteking.py clean [目录...] [-j N]     清理假名中的括号和省略号
+  python reciteking.py verify [目录]               检查清理结果
+  python reciteking.py classify [detailed|precise|final ...]   重新分类栏目
+  python reciteking.py report [summary|final|categories|analysis]   分类统计报告
+  python reciteking.py drill                      命令行假名背诵
+  python reciteking.py serve [--port 8080]        启动词汇服务器
+"""
+
+import argparse
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+WEB_DIR = os.path.join(ROOT_DIR, 'web')
+
+# 清理和验证默认处理项目中的两个 vocabulary 目录
+VOCAB_DIRS = [
+    os.path.join(ROOT_DIR, 'data', 'vocabulary'),
+    os.path.join(WEB_DIR, 'data', 'vocabulary')
+]
+CLASSIFY_STEPS = ['detailed', 'precise', 'final']
+DEFAULT_CLASSIFY_STEPS = ['precise', 'final']
+REPORT_KINDS = ['summary', 'final', 'categories', 'analysis']
+# serve 透传给 vocabulary_server.py 的参数中表示路径的选项
+SERVE_PATH_OPTIONS = ('--data-dir', '--root', '--mistakes-file', '--mistakes-db')
+
+def _enter(directory):
+    """
+    切换到脚本所在目录（web 下的脚本按相对路径读写 data/vocabulary）
+    用户传入的路径要在调用之前用 os.path.abspath 按原来的当前目录解析好
+    """
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    os.chdir(directory)
+
+def cmd_import(args):
+    _enter(WEB_DIR)
+    from merge_vocabulary import process_excel_data
+    process_excel_data()
+    return 0
+
+def _absolute_serve_paths(extra):
+    """把透传参数中的路径选项（--data-dir x 或 --data-dir=x）换成绝对路径"""
+    result = []
+    expect_path = False
+    for arg in extra:
+        if expect_path:
+            arg = os.path.abspath(arg)
+            expect_path = False
+        elif arg in SERVE_PATH_OPTIONS:
+            expect_path = True
+        else:
+            option, sep, value = arg.partition('=')
+            if sep and option in SERVE_PATH_OPTIONS:
+                arg = f"{option}={os.path.abspath(value)}"
+        result.append(arg)
+    return result
+
+def cmd_clean(args):
+    vocab_dirs = [os.path.abspath(vocab_dir) for vocab_dir in args.vocab_dirs]
+    _enter(ROOT_DIR)
+    import clean_vocabulary
+    clean_vocabulary.main(vocab_dirs + ['--jobs', str(args.jobs)])
+    return 0
+
+def cmd_verify(args):
+    vocab_dir = os.path.abspath(args.vocab_dir)
+    _enter(ROOT_DIR)
+    import verify_cleanup
+    return verify_cleanup.main(vocab_dir)
+
+def cmd_classify(args):
+    steps = args.steps or DEFAULT_CLASSIFY_STEPS
+    unknown = [step for step in steps if step not in CLASSIFY_STEPS]
+    if unknown:
+        print(f"未知的分类步骤: {', '.join(unknown)}（可选 {', '.join(CLASSIFY_STEPS)}）", file=sys.stderr)
+        return 2
+    _enter(WEB_DIR)
+    for step in steps:
+        if step == 'detailed':
+            from reclassify_vocabulary import reclassify_vocabulary
+            reclassify_vocabulary()
+        elif step == 'precise':
+            from precise_reclassify import precise_reclassify
+            precise_reclassify()
+        elif step == 'final':
+            from final_classify import manual_adjustments
+            manual_adjustments()
+    return 0
+
+def cmd_report(args):
+    _enter(WEB_DIR)
+    if args.kind == 'summary':
+        from classification_summary import generate_classification_summary
+        generate_classification_summary()
+    elif args.kind == 'final':
+        from final_classify import generate_final_report, show_category_examples
+        generate_final_report()
+        show_category_examples()
+    elif args.kind == 'categories':
+        from reclassify_vocabulary import generate_category_report
+        generate_category_report()
+    elif args.kind == 'analysis':
+        from analyze_vocabulary import analyze_vocabulary
+        analyze_vocabulary()
+    return 0
+
+def cmd_drill(args):
+    # demo.py 导入时读取当前目录下的 config.txt 和 kana_data.csv
+    _enter(ROOT_DIR)
+    import demo
+    demo.start_game()
+    return 0
+
+def cmd_serve(args):
+    extra = _absolute_serve_paths(args.extra)
+    _enter(WEB_DIR)
+    import vocabulary_server
+    return vocabulary_server.main(extra) or 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='reciteking', description="ReciteKing 词汇数据和练习工具")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = subparsers.add_parser('import', help="从 Excel 工作簿导入单词到课程 CSV")
+    import_parser.set_defaults(handler=cmd_import)
+
+    clean_parser = subparsers.add_parser('clean', help="清理假名中的括号和省略号")
+    clean_parser.add_argument('vocab_dirs', nargs='*', default=VOCAB_DIRS, help="词汇目录（默认项目中的两个 vocabulary 目录）")
+    clean_parser.add_argument('-j', '--jobs', type=int, default=1, help="并行清理的进程数，0 表示使用全部 CPU")
+    clean_parser.set_defaults(handler=cmd_clean)
+
+    verify_parser = subparsers.add_parser('verify', help="检查清理结果")
+    verify_parser.add_argument('vocab_dir', nargs='?', default=VOCAB_DIRS[1], help="词汇目录")
+    verify_parser.set_defaults(handler=cmd_verify)
+
+    classify_parser = subparsers.add_parser('classify', help="重新分类栏目")
+    # nargs='*' 的位置参数与 choices 同时使用时 argparse 会拒绝空列表，步骤名在 cmd_classify 中检查
+    classify_parser.add_argument('steps', nargs='*', metavar='step',
+                                 help="按顺序执行的分类步骤：detailed=reclassify_vocabulary, "
+                                      "precise=precise_reclassify, final=final_classify 手动调整"
+                                      f"（默认 {' '.join(DEFAULT_CLASSIFY_STEPS)}）")
+    classify_parser.set_defaults(handler=cmd_classify)
+
+    report_parser = subparsers.add_parser('report', help="分类统计报告")
+    report_parser.add_argument('kind', nargs='?', choices=REPORT_KINDS, default=REPORT_KINDS[0], help="报告类型")
+    report_parser.set_defaults(handler=cmd_report)
+
+    drill_parser = subparsers.add_parser('drill', help="命令行假名背诵（设置见 config.txt）")
+    drill_parser.set_defaults(handler=cmd_drill)
+
+    # 其余参数原样交给 vocabulary_server.py（见 main）
+    serve_parser = subparsers.add_parser('serve', help="启动词汇服务器（参数同 vocabulary_server.py）",
+                                         add_help=False)
+    serve_parser.set_defaults(handler=cmd_serve, passthrough=True)
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if extra and not getattr(args, 'passthrough', False):
+        parser.error(f"无法识别的参数: {' '.join(extra)}")
+    args.extra = extra
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
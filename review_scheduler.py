@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+间隔重复复习调度（SM-2 算法）
+假名（kana_data.csv）和课程单词（lesson_XX_vocabulary.csv）都作为复习条目，
+每个条目只保存几个数字的复习状态；“接下来要复习的 N 个条目”由按到期时间排序的堆给出
+
+用法: python review_scheduler.py [--state 复习进度.json] [-n 20]
+"""
+
+import argparse
+import csv
+import glob
+import heapq
+import json
+import os
+import sys
+import time
+
+# web 下的原子写入（lesson_writer），保存进度时中途出错不会清空原有的复习进度
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'web'))
+from lesson_writer import atomic_write
+
+KANA_FILE = 'kana_data.csv'
+VOCAB_DIRS = [os.path.join('data', 'vocabulary'), os.path.join('web', 'data', 'vocabulary')]
+STATE_FILE = 'review_state.json'
+STATE_FORMAT = 1
+
+DAY_SECONDS = 86400
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+# 导入错题时每个单词只扣一次难度系数，不论错了多少次
+MISTAKE_EASE_PENALTY = 0.2
+
+# 回答质量（SM-2 的 0-5 分）；练习中答对记 GOOD，答错记 WRONG
+QUALITY_PERFECT = 5
+QUALITY_GOOD = 4
+QUALITY_HARD = 3
+QUALITY_WRONG = 1
+QUALITY_BLACKOUT = 0
+
+class ReviewState:
+    """单个条目的复习状态"""
+
+    __slots__ = ('item_id', 'ease', 'interval', 'reps', 'lapses', 'due', 'last_review', 'imported_mistakes', 'seq')
+
+    def __init__(self, item_id, due, ease=INITIAL_EASE, interval=0.0, reps=0, lapses=0, last_review=None,
+                 imported_mistakes=0):
+        self.item_id = item_id
+        self.ease = ease
+        self.interval = interval
+        self.reps = reps
+        self.lapses = lapses
+        self.due = due
+        self.last_review = last_review
+        # 已从网页端错题记录导入过的错误次数，再次导入时只计新增的部分
+        self.imported_mistakes = imported_mistakes
+        self.seq = 0
+
+    def to_list(self):
+        return [self.item_id, self.ease, self.interval, self.reps, self.lapses, self.due, self.last_review,
+                self.imported_mistakes]
+
+    @classmethod
+    def from_list(cls, values):
+        item_id, ease, interval, reps, lapses, due, last_review = values[:7]
+        # 旧的进度文件没有 imported_mistakes 一项
+        imported_mistakes = values[7] if len(values) > 7 else 0
+        return cls(item_id, due, ease, interval, reps, lapses, last_review, imported_mistakes)
+
+def sm2_update(state, quality, now):
+    """按 SM-2 规则更新条目状态（间隔以天为单位）"""
+    if quality >= QUALITY_HARD:
+        if state.reps == 0:
+            state.interval = 1.0
+        elif state.reps == 1:
+            state.interval = 6.0
+        else:
+            state.interval = round(state.interval * state.ease, 2)
+        state.reps += 1
+    else:
+        state.reps = 0
+        state.interval = 1.0
+        state.lapses += 1
+
+    state.ease = max(MIN_EASE, state.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    state.last_review = now
+    state.due = now + state.interval * DAY_SECONDS
+
+class ReviewScheduler:
+    """
+    复习调度器
+    条目状态按 ID 保存在字典里；堆中存放 (到期时间, 序号, ID)，条目状态变化时直接压入新记录，
+    旧记录在出堆时按序号识别为过期并丢弃
+    """
+
+    def __init__(self):
+        self._states = {}
+        self._heap = []
+        self._counter = 0
+
+    def __len__(self):
+        return len(self._states)
+
+    def __contains__(self, item_id):
+        return item_id in self._states
+
+    def state(self, item_id):
+        return self._states[item_id]
+
+    def _push(self, state):
+        self._counter += 1
+        state.seq = self._counter
+        heapq.heappush(self._heap, (state.due, state.seq, state.item_id))
+
+        # 过期记录太多时重建堆
+        if len(self._heap) > 2 * len(self._states) + 1024:
+            self._heap = [(s.due, s.seq, s.item_id) for s in self._states.values()]
+            heapq.heapify(self._heap)
+
+    def _is_current(self, entry):
+        state = self._states.get(entry[2])
+        return state is not None and state.seq == entry[1]
+
+    def add(self, item_id, now=None):
+        """添加新条目（已存在则忽略），新条目立即到期，按添加顺序排队"""
+        if item_id in self._states:
+            return self._states[item_id]
+        state = ReviewState(item_id, time.time() if now is None else now)
+        self._states[item_id] = state
+        self._push(state)
+        return state
+
+    def add_many(self, item_ids, now=None):
+        """批量添加新条目，返回实际新增的数量"""
+        now = time.time() if now is None else now
+        added = 0
+        for item_id in item_ids:
+            if item_id not in self._states:
+                self.add(item_id, now)
+                added += 1
+        return added
+
+    def remove(self, item_id):
+        self._states.pop(item_id, None)
+
+    def review(self, item_id, quality, now=None):
+        """记录一次复习结果并重新安排到期时间"""
+        state = self._states[item_id]
+        sm2_update(state, quality, time.time() if now is None else now)
+        self._push(state)
+        return state
+
+    def import_mistakes(self, mistakes, now):
+        """见 apply_mistake_counts"""
+        applied = 0
+        for item_id, record in mistakes.items():
+            count = record.get('count', 0) if isinstance(record, dict) else int(record)
+            state = self._states.get(item_id)
+            if state is None or count <= state.imported_mistakes:
+                continue
+            state.lapses += count - state.imported_mistakes
+            state.imported_mistakes = count
+            state.reps = 0
+            state.interval = 1.0
+            state.ease = max(MIN_EASE, state.ease - MISTAKE_EASE_PENALTY)
+            state.due = min(state.due, now)
+            self._push(state)
+            applied += 1
+        return applied
+
+    def record_answer(self, item_id, correct, now=None):
+        """练习中的答对/答错"""
+        return self.review(item_id, QUALITY_GOOD if correct else QUALITY_WRONG, now)
+
+    def next_due(self, count=20, now=None):
+        """到期时间不晚于 now 的前 count 个条目 ID，按到期时间排序"""
+        now = time.time() if now is None else now
+        heap = self._heap
+        picked = []
+        while heap and len(picked) < count:
+            entry = heap[0]
+            if not self._is_current(entry):
+                heapq.heappop(heap)
+                continue
+            if entry[0] > now:
+                break
+            picked.append(heapq.heappop(heap))
+
+        for entry in picked:
+            heapq.heappush(heap, entry)
+        return [entry[2] for entry in picked]
+
+    def due_count(self, now=None):
+        now = time.time() if now is None else now
+        return sum(1 for state in self._states.values() if state.due <= now)
+
+    def next_due_time(self):
+        """最近一个条目的到期时间（没有条目时为 None）"""
+        heap = self._heap
+        while heap and not self._is_current(heap[0]):
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def save(self, path=STATE_FILE):
+        with atomic_write(path, newline=None) as f:
+            json.dump({
+                'format': STATE_FORMAT,
+                'items': [state.to_list() for state in self._states.values()]
+            }, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path=STATE_FILE):
+        """读取复习进度；文件不存在或格式不对时返回空的调度器"""
+        scheduler = cls()
+        if not os.path.exists(path):
+            return scheduler
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"读取复习进度 {path} 时出错: {e}")
+            return scheduler
+        if data.get('format') != STATE_FORMAT:
+            return scheduler
+
+        for values in data['items']:
+            state = ReviewState.from_list(values)
+            scheduler._states[state.item_id] = state
+            scheduler._counter += 1
+            state.seq = scheduler._counter
+        scheduler._heap = [(s.due, s.seq, s.item_id) for s in scheduler._states.values()]
+        heapq.heapify(scheduler._heap)
+        return scheduler
+
+def kana_item_ids(csv_file=KANA_FILE, enabled_types=None):
+    """假名条目 ID：kana:あ"""
+    with open(csv_file, 'r', encoding='utf-8') as f:
+        return [
+            f"kana:{row['kana']}"
+            for row in csv.DictReader(f)
+            if enabled_types is None or row['type'] in enabled_types
+        ]
+
+def word_item_id(row):
+    """单词条目 ID，与 web/mistake-tracker.js 的 getWordId 相同：课程_假名_释义"""
+    return f"{row.get('课程') or '未知'}_{row.get('假名') or row.get('释义')}_{row.get('释义') or ''}"
+
+def vocabulary_item_ids(data_dir=None):
+    """课程单词条目 ID，按课程文件顺序"""
+    if data_dir is None:
+        data_dir = next((d for d in VOCAB_DIRS if os.path.isdir(d)), VOCAB_DIRS[0])
+
+    item_ids = []
+    for path in sorted(glob.glob(os.path.join(data_dir, 'lesson_*_vocabulary.csv'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            item_ids.extend(word_item_id(row) for row in csv.DictReader(f) if row.get('假名') or row.get('释义'))
+    return item_ids
+
+def apply_mistake_counts(scheduler, mistakes, now=None):
+    """
+    导入网页端导出的 wordMistakes（{单词ID: {count: 错误次数, ...}}）
+    有新错误的单词立即到期、从头开始计间隔，难度系数只扣一次 MISTAKE_EASE_PENALTY；
+    每个单词记下已导入的错误次数，重复导入同一份记录不会再次计入。返回有新错误的单词数
+    """
+    return scheduler.import_mistakes(mistakes, time.time() if now is None else now)
+
+def build_scheduler(state_file=STATE_FILE, kana_file=KANA_FILE, data_dir=None):
+    """读取已有复习进度，并补上新增的假名和单词条目；返回 (调度器, 新增条目数)"""
+    scheduler = ReviewScheduler.load(state_file)
+    added = 0
+    if os.path.exists(kana_file):
+        added += scheduler.add_many(kana_item_ids(kana_file))
+    added += scheduler.add_many(vocabulary_item_ids(data_dir))
+    return scheduler, added
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="间隔重复复习调度，列出接下来要复习的条目")
+    parser.add_argument('--state', default=STATE_FILE, help="复习进度文件")
+    parser.add_argument('--data-dir', help="课程词汇目录")
+    parser.add_argument('-n', '--count', type=int, default=20, help="列出的条目数量")
+    args = parser.parse_args(argv)
+
+    scheduler, added = build_scheduler(args.state, data_dir=args.data_dir)
+    print(f"共 {len(scheduler)} 个条目，其中 {scheduler.due_count()} 个已到期")
+    for item_id in scheduler.next_due(args.count):
+        state = scheduler.state(item_id)
+        print(f"  {item_id}  (复习 {state.reps} 次，遗忘 {state.lapses} 次，难度系数 {state.ease:.2f})")
+    # 只是查看时不改写进度文件，有新增条目才保存
+    if added:
+        scheduler.save(args.state)
+        print(f"新增 {added} 个条目，已保存到 {args.state}")
+
+if __name__ == "__main__":
+    sys.exit(main())
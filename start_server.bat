@@ -6,5 +6,5 @@ echo 服务器将在 http://localhost:8080 启动
 echo 按 Ctrl+C 停止服务器
 echo.
 cd /d "%~dp0web"
-python -m http.server 8080
+python vocabulary_server.py --port 8080
 pause
@@ -3,20 +3,36 @@
 """
 词汇清理验证脚本
 验证所有的括号和省略号模式是否已正确清理
+只需逐行读取 CSV，用标准库 csv 即可，不导入 pandas
 """
 
-import pandas as pd
+import csv
 import os
-import re
+import sys
 
-def verify_vocabulary_cleaning():
+# web 下的文件锁（lesson_lock），读取时与写课程文件的脚本互斥
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'web'))
+from lesson_lock import read_lock
+
+# 默认检查的词汇目录
+DEFAULT_VOCAB_DIR = r'e:\work\2025_8_24ReciteKing\web\data\vocabulary'
+
+def read_lesson_rows(file_path):
+    """读取课程 CSV 的数据行（不含表头、跳过空行），无法读取时返回 None"""
+    for encoding in ('utf-8', 'gbk'):
+        try:
+            with read_lock(file_path), open(file_path, 'r', encoding=encoding, newline='') as f:
+                rows = [row for row in csv.reader(f) if row]
+            return rows[1:]
+        except (OSError, UnicodeDecodeError):
+            continue
+    return None
+
+def verify_vocabulary_cleaning(vocab_dir=DEFAULT_VOCAB_DIR):
     """验证词汇清理结果"""
     print("开始验证词汇清理结果...")
     print("=" * 60)
     
-    # 定义需要检查的目录
-    vocab_dir = r'e:\work\2025_8_24ReciteKing\web\data\vocabulary'
-    
     if not os.path.exists(vocab_dir):
         print(f"目录不存在: {vocab_dir}")
         return
@@ -32,19 +48,18 @@ def verify_vocabulary_cleaning():
         if not os.path.exists(file_path):
             continue
         
-        try:
-            df = pd.read_csv(file_path, encoding='utf-8')
-        except:
+        rows = read_lesson_rows(file_path)
+        if rows is None:
             continue
         
         print(f"\n检查文件: {filename}")
         print("-" * 40)
         
-        for index, row in df.iterrows():
+        for index, row in enumerate(rows):
             if len(row) >= 3:
-                kana_reading = str(row.iloc[2])  # 假名读音列
-                kanji_reading = str(row.iloc[3]) if len(row) >= 4 else ""  # 汉字列
-                meaning = str(row.iloc[4]) if len(row) >= 5 else ""  # 释义列
+                kana_reading = row[2]  # 假名读音列
+                kanji_reading = row[3] if len(row) >= 4 else ""  # 汉字列
+                meaning = row[4] if len(row) >= 5 else ""  # 释义列
                 
                 # 检查是否还有未清理的模式
                 if '…' in kana_reading and '（' in kana_reading:
@@ -127,9 +142,12 @@ def verify_vocabulary_cleaning():
     
     return len(issues_found) == 0, len(cleaned_entries)
 
-def main():
+def main(vocab_dir=DEFAULT_VOCAB_DIR):
     """主函数"""
-    success, cleaned_count = verify_vocabulary_cleaning()
+    result = verify_vocabulary_cleaning(vocab_dir)
+    if result is None:
+        return 1
+    success, cleaned_count = result
     
     print(f"\n{'✅ 验证通过' if success else '❌ 验证失败'}")
     print(f"支持多答案的词汇数量: {cleaned_count}")
@@ -142,6 +160,7 @@ def main():
         print("  3. 检查其他多答案词汇的验证效果")
     else:
         print("\n⚠️ 仍有部分词汇需要手动处理，请查看验证报告")
+    return 0 if success else 1
 
 if __name__ == "__main__":
     main()
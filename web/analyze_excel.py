@@ -1,13 +1,13 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import pandas as pd
-import json
+
+from workbook_cache import export_workbook_json, load_workbook
 
 def analyze_excel_file():
     try:
         # 读取 Excel 文件
-        df = pd.read_excel('minanonihongo_words.xls')
+        df = load_workbook()
         
         print("=" * 50)
         print("Excel 文件分析")
@@ -55,8 +55,10 @@ def analyze_excel_file():
         print("=" * 50)
         
         # 导出为 JSON
-        df.to_json('minanonihongo_words.json', force_ascii=False, indent=2, orient='records')
-        print("已导出为 minanonihongo_words.json")
+        if export_workbook_json(df):
+            print("已导出为 minanonihongo_words.json")
+        else:
+            print("工作簿未变化，沿用已有的 minanonihongo_words.json")
         
         return df
         
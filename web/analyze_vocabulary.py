@@ -1,39 +1,27 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import csv
-import os
 from collections import defaultdict
 
+from vocabulary_corpus import load_corpus
+
 def analyze_vocabulary():
     """分析词汇分布"""
     print("《大家的日语》词汇分析报告")
     print("=" * 50)
     
+    corpus = load_corpus()
+    
     # 统计各种类型
-    type_stats = defaultdict(int)
-    lesson_stats = defaultdict(int)
-    lesson_type_stats = defaultdict(lambda: defaultdict(int))
+    type_stats = defaultdict(int, corpus.counts('词性', default='未分类'))
+    lesson_stats = {}
+    lesson_type_stats = {}
     
-    total_words = 0
+    for lesson_num in corpus.lessons():
+        lesson_type_stats[lesson_num] = corpus.counts('词性', lesson=lesson_num, default='未分类')
+        lesson_stats[lesson_num] = len(corpus.lesson_rows(lesson_num))
     
-    # 遍历所有课程文件
-    for lesson_num in range(1, 26):
-        filename = f"data/vocabulary/lesson_{lesson_num:02d}_vocabulary.csv"
-        
-        if os.path.exists(filename):
-            with open(filename, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                lesson_count = 0
-                
-                for row in reader:
-                    word_type = row.get('词性', '未分类')
-                    type_stats[word_type] += 1
-                    lesson_type_stats[lesson_num][word_type] += 1
-                    lesson_count += 1
-                    total_words += 1
-                
-                lesson_stats[lesson_num] = lesson_count
+    total_words = len(corpus)
     
     # 输出总体统计
     print(f"\n总词汇量: {total_words} 个单词")
@@ -53,21 +41,13 @@ def analyze_vocabulary():
     # 外来词分析
     print(f"\n外来词详细统计:")
     foreign_words = []
-    for lesson_num in range(1, 26):
-        filename = f"data/vocabulary/lesson_{lesson_num:02d}_vocabulary.csv"
-        
-        if os.path.exists(filename):
-            with open(filename, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                
-                for row in reader:
-                    if row.get('词性') == '外来词':
-                        foreign_words.append({
-                            'lesson': lesson_num,
-                            'kana': row.get('假名', ''),
-                            'kanji': row.get('汉字', ''),
-                            'meaning': row.get('释义', '')
-                        })
+    for lesson_num, row in corpus.find(word_type='外来词'):
+        foreign_words.append({
+            'lesson': lesson_num,
+            'kana': row.get('假名', ''),
+            'kanji': row.get('汉字', ''),
+            'meaning': row.get('释义', '')
+        })
     
     print(f"  总共找到 {len(foreign_words)} 个外来词")
     for word in foreign_words[:20]:  # 只显示前20个
@@ -86,20 +66,12 @@ def analyze_vocabulary():
     # 寒暄语统计
     print(f"\n寒暄语统计:")
     greetings = []
-    for lesson_num in range(1, 26):
-        filename = f"data/vocabulary/lesson_{lesson_num:02d}_vocabulary.csv"
-        
-        if os.path.exists(filename):
-            with open(filename, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                
-                for row in reader:
-                    if row.get('词性') == '寒暄语':
-                        greetings.append({
-                            'lesson': lesson_num,
-                            'kana': row.get('假名', ''),
-                            'meaning': row.get('释义', '')
-                        })
+    for lesson_num, row in corpus.find(word_type='寒暄语'):
+        greetings.append({
+            'lesson': lesson_num,
+            'kana': row.get('假名', ''),
+            'meaning': row.get('释义', '')
+        })
     
     print(f"  总共找到 {len(greetings)} 个寒暄语")
     for greeting in greetings:
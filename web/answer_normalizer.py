@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+答案规范化与模糊匹配
+每个单词预先算好一组（frozenset）可接受的规范化答案，判题时只需规范化输入再查一次集合：
+- 假名列中用 | 或括号分隔的多个读音都算对（clean_vocabulary.py 写入的 ふん|ぷん）
+- 片假名折叠为平假名，全角/半角统一，忽略大小写和空白
+- 长音 ー 展开为对应的元音假名（コーヒー 也可写作 こおひい）
+- 罗马音：标准写法（元音前的 ん 写作 n'，也可不写 '）、ん 写作 nn；
+  ー 以及延长前一段元音的 う（o、u 之后）、お（o 之后）也可写作长音符号（gakkou / gakkō，koohii / kōhī），
+  其他元音不合并（おもう 只能写 omou），汉字写法以送假名 う 结尾的动词（吸う）词尾的 う 不是长音
+答错时用有上限的编辑距离找出最接近的答案，用于“差一点就对了”的提示
+
+用法: python answer_normalizer.py 假名 输入 [--kanji 汉字] [--max-distance 2]
+"""
+
+import argparse
+import re
+import sys
+import unicodedata
+
+from kana_romaji import load_converter
+
+MAX_EDIT_DISTANCE = 2
+CHOUON = 'ー'
+VOWEL_KANA = dict(zip('aiueo', 'あいうえお'))
+MACRON_VOWELS = dict(zip('aiueo', 'āīūēō'))
+# 可以延长前一段元音的假名：う 延长 o、u，お 延长 o
+LONG_VOWEL_KANA = {'う': 'ou', 'お': 'o'}
+
+# 片假名 ァ(U+30A1)～ヶ(U+30F6) 与平假名相差 0x60；ヵヶ 没有对应的平假名，保持不变
+_KATAKANA_FOLD = {code: code - 0x60 for code in range(0x30A1, 0x30F5)}
+_VARIANT_SPLIT_RE = re.compile(r'[|｜（）()]')
+_STRIP_CHARS = '…～~・ 　'
+_SPACE_RE = re.compile(r'\s+')
+# 汉字写法以送假名 う 结尾（吸う、使う）：五段动词，词尾的 う 不是长音
+_VERB_U_RE = re.compile(r'[\u3400-\u9fff々][ぁ-ゖ]*う$')
+
+def normalize_answer(text):
+    """规范化输入：NFKC（全角/半角统一）、去空白、小写、片假名折叠为平假名"""
+    text = unicodedata.normalize('NFKC', text or '')
+    return _SPACE_RE.sub('', text).lower().translate(_KATAKANA_FOLD)
+
+def split_readings(kana):
+    """假名列中的各个读音（ふん|ぷん、だれ（どなた）都拆成两个）"""
+    readings = []
+    for part in _VARIANT_SPLIT_RE.split(kana or ''):
+        part = part.strip(_STRIP_CHARS)
+        if part and part not in readings:
+            readings.append(part)
+    return readings
+
+def is_u_verb(kanji):
+    """汉字写法是否为以 う 结尾的动词（吸う、手伝う）；假名列本身看不出词性，词性列也不可靠"""
+    return bool(_VERB_U_RE.search(unicodedata.normalize('NFKC', kanji or '').strip()))
+
+def bounded_edit_distance(a, b, limit=MAX_EDIT_DISTANCE):
+    """
+    编辑距离（插入、删除、替换各算 1），只计算对角线两侧 limit 宽的带状区域；
+    超过 limit 时提前返回 limit + 1
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if len(a) > len(b):
+        a, b = b, a
+    over = limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        low = max(1, i - limit)
+        high = min(len(b), i + limit)
+        current = [over] * (len(b) + 1)
+        current[0] = i if i <= limit else over
+        row_min = current[0]
+        for j in range(low, high + 1):
+            cost = 0 if char_a == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return over
+        previous = current
+    return min(previous[len(b)], over)
+
+class AnswerCheck:
+    """判题结果：status 为 correct / almost / wrong，closest 为最接近的可接受答案"""
+
+    __slots__ = ('status', 'closest', 'distance')
+
+    def __init__(self, status, closest=None, distance=0):
+        self.status = status
+        self.closest = closest
+        self.distance = distance
+
+    @property
+    def correct(self):
+        return self.status == 'correct'
+
+    def to_dict(self):
+        return {'status': self.status, 'closest': self.closest, 'distance': self.distance}
+
+class AnswerNormalizer:
+    """按假名列预先生成可接受答案集合（同一个假名只生成一次）"""
+
+    def __init__(self, converter=None):
+        self.converter = converter or load_converter()
+        self._variants = {}
+
+    def expand_chouon(self, hiragana):
+        """把 ー 换成前一个假名的元音（こーひー -> こおひい）"""
+        if CHOUON not in hiragana:
+            return hiragana
+        chars = []
+        for char in hiragana:
+            if char == CHOUON and chars:
+                vowel = self.converter.convert(chars[-1])[-1:]
+                char = VOWEL_KANA.get(vowel, char)
+            chars.append(char)
+        return ''.join(chars)
+
+    def macron_form(self, chunks, verb=False):
+        """
+        长音写作长音符号的罗马音：只合并 ー，以及延长前一段元音的 う/お（がっこう -> gakkō），
+        verb 为真时词尾的 う 保持原样（すう -> suu）
+        """
+        result = []
+        last = len(chunks) - 1
+        for index, (kana, romaji) in enumerate(chunks):
+            previous = result[-1][-1:] if result else ''
+            if kana == CHOUON and romaji == previous:
+                result[-1] = result[-1][:-1] + MACRON_VOWELS[previous]
+            elif kana.endswith(CHOUON) and len(romaji) > 1 and romaji[-1] == romaji[-2] in MACRON_VOWELS:
+                result.append(romaji[:-2] + MACRON_VOWELS[romaji[-1]])
+            elif (previous and previous in LONG_VOWEL_KANA.get(kana, '')
+                    and not (verb and kana == 'う' and index == last)):
+                result[-1] = result[-1][:-1] + MACRON_VOWELS[previous]
+            else:
+                result.append(romaji)
+        return ''.join(result)
+
+    def romaji_variants(self, reading, verb=False):
+        """一个读音的罗马音写法：标准、ん 写作 nn、长音加长音符号；含汉字等无法转换的读音没有罗马音写法"""
+        chunks = self.converter.split(reading)
+        romaji = ''.join(segment for _, segment in chunks)
+        if not romaji.isascii():
+            return set()
+        macron = self.macron_form(chunks, verb)
+        # 元音前的 ん 标准写法为 n'（kin'en），不写 ' 也算对
+        forms = {
+            romaji,
+            romaji.replace("'", ''),
+            ''.join('nn' if kana == 'ん' else segment for kana, segment in chunks),
+            macron,
+            macron.replace("'", '')
+        }
+        return {normalize_answer(form) for form in forms}
+
+    def variants(self, kana, verb=False):
+        """单词假名列对应的全部可接受答案（已规范化）；verb 见 is_u_verb"""
+        key = (kana, verb)
+        variants = self._variants.get(key)
+        if variants is None:
+            forms = set()
+            for reading in split_readings(kana):
+                folded = normalize_answer(reading)
+                forms.update((folded, self.expand_chouon(folded)))
+                forms.update(self.romaji_variants(folded, verb))
+            forms.discard('')
+            variants = self._variants[key] = frozenset(forms)
+        return variants
+
+    def is_correct(self, answer, kana, verb=False):
+        return normalize_answer(answer) in self.variants(kana, verb)
+
+    def closest(self, answer, kana, max_distance=MAX_EDIT_DISTANCE, verb=False):
+        """编辑距离不超过 max_distance 的最接近答案，返回 (答案, 距离)，没有则返回 None"""
+        answer = normalize_answer(answer)
+        best = None
+        limit = max_distance
+        # 先比较与输入长度接近的候选，距离越小后面的上限越紧
+        for variant in sorted(self.variants(kana, verb), key=lambda form: (abs(len(form) - len(answer)), form)):
+            distance = bounded_edit_distance(answer, variant, limit)
+            if distance <= limit:
+                best = (variant, distance)
+                if distance == 0:
+                    break
+                limit = distance - 1
+        return best
+
+    def check(self, answer, kana, max_distance=MAX_EDIT_DISTANCE, verb=False):
+        """判题：完全匹配为 correct，编辑距离在上限内为 almost，否则为 wrong"""
+        if self.is_correct(answer, kana, verb):
+            return AnswerCheck('correct', normalize_answer(answer))
+        if normalize_answer(answer):
+            match = self.closest(answer, kana, max_distance, verb)
+            if match:
+                return AnswerCheck('almost', *match)
+        return AnswerCheck('wrong')
+
+    def export(self, words):
+        """供词汇数据包使用：words 为 (假名, 汉字) 序列，返回每个单词的可接受答案列表（排好序，便于比较和压缩）"""
+        return [sorted(self.variants(kana, is_u_verb(kanji))) for kana, kanji in words]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="检查一个答案是否可以接受")
+    parser.add_argument('kana', help="单词的假名（可含 | 分隔的多个读音）")
+    parser.add_argument('answer', help="输入的答案（假名或罗马音）")
+    parser.add_argument('--kanji', default='', help="单词的汉字写法（以 う 结尾的动词词尾不按长音处理）")
+    parser.add_argument('--max-distance', type=int, default=MAX_EDIT_DISTANCE, help="“差一点”的最大编辑距离")
+    args = parser.parse_args(argv)
+
+    normalizer = AnswerNormalizer()
+    verb = is_u_verb(args.kanji)
+    result = normalizer.check(args.answer, args.kana, args.max_distance, verb)
+    print(f"可接受的答案: {', '.join(sorted(normalizer.variants(args.kana, verb)))}")
+    if result.status == 'correct':
+        print("✅ 正确")
+    elif result.status == 'almost':
+        print(f"🟡 差一点：最接近 {result.closest}（相差 {result.distance}）")
+    else:
+        print("❌ 错误")
+    return 0 if result.correct else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
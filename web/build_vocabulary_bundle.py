@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+词汇数据包生成器
+把全部课程 CSV 编译成一个紧凑的 JSON 数据包，网页端一次请求即可拿到所有课程：
+- 栏目、词性、课程名字符串只存一份，单词里用整数编号引用
+- 单词按课程顺序排成一个数组，每课记录起始位置和单词数
+- 附带搜索索引（n-gram 倒排表和按罗马音排序的单词编号），网页端搜索不必逐个扫描
+- 附带每个单词预先规范化好的可接受答案（answer_normalizer.py），网页端判题只需查一次集合；
+  “差一点就对了”的编辑距离上限 maxEditDistance 同时写入数据包和指向文件，网页端与 Python 判题一致
+- 文件名带内容哈希（vocabulary_bundle.<哈希>.json），内容不变文件名就不变，可长期缓存；
+  固定名称的 vocabulary_bundle.json 指向当前数据包，sw.js 中的预缓存地址同步更新
+
+用法: python build_vocabulary_bundle.py [--data-dir data/vocabulary] [--output-dir data]
+"""
+
+import argparse
+import csv
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+
+from answer_normalizer import MAX_EDIT_DISTANCE, AnswerNormalizer
+from lesson_writer import atomic_write
+from search_index import SearchIndex
+from vocabulary_corpus import DEFAULT_DATA_DIR, load_corpus
+
+BUNDLE_FORMAT = 1
+BUNDLE_PREFIX = 'vocabulary_bundle'
+OUTPUT_DIR = 'data'
+SERVICE_WORKER_FILE = 'sw.js'
+INDEX_FILE_NAME = 'vocabulary_index.csv'
+WORD_FIELDS = ['kana', 'kanji', 'meaning', 'category', 'wordType', 'lesson']
+
+_SW_BUNDLE_RE = re.compile(r"^const VOCABULARY_BUNDLE = '[^']*';$", re.MULTILINE)
+
+class StringTable:
+    """字符串驻留表：相同字符串只保存一次，返回其整数编号"""
+
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+
+    def code(self, value):
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+def _lesson_names(data_dir):
+    """vocabulary_index.csv 中 文件名 -> 课程名"""
+    index_file = os.path.join(data_dir, INDEX_FILE_NAME)
+    if not os.path.exists(index_file):
+        return {}
+    with open(index_file, 'r', encoding='utf-8') as f:
+        return {row.get('文件名'): row.get('课程') for row in csv.DictReader(f)}
+
+def build_bundle(data_dir=DEFAULT_DATA_DIR):
+    """
+    编译数据包
+    lessons: [[课程名, 文件名, 起始位置, 单词数, [栏目编号...]], ...]
+    words:   [[假名, 汉字, 释义, 栏目编号, 词性编号, 课程名编号], ...]
+    answers: [[可接受的答案...], ...]（与 words 一一对应），maxEditDistance: 判题时“差一点”的编辑距离上限
+    单词自带的课程名（CSV 的“课程”列）单独保留，同一课里可能有“第一课”“第01课”两种写法
+    """
+    corpus = load_corpus(data_dir)
+    names = _lesson_names(data_dir)
+    categories = StringTable()
+    word_types = StringTable()
+    lesson_names = StringTable()
+    lessons = []
+    words = []
+
+    for lesson_num in corpus.lessons():
+        filename = os.path.basename(corpus.path(lesson_num))
+        rows = corpus.lesson_rows(lesson_num)
+        lesson_name = names.get(filename) or (rows[0].get('课程') if rows else '') or f'第{lesson_num}课'
+        offset = len(words)
+        lesson_categories = []
+
+        for row in rows:
+            category_code = categories.code(row.get('栏目') or '')
+            if category_code not in lesson_categories:
+                lesson_categories.append(category_code)
+            words.append([
+                row.get('假名') or '',
+                row.get('汉字') or '',
+                row.get('释义') or '',
+                category_code,
+                word_types.code(row.get('词性') or ''),
+                lesson_names.code(row.get('课程') or lesson_name)
+            ])
+
+        lessons.append([lesson_name, filename, offset, len(words) - offset, lesson_categories])
+
+    return {
+        'format': BUNDLE_FORMAT,
+        'fields': WORD_FIELDS,
+        'categories': categories.values,
+        'wordTypes': word_types.values,
+        'lessonNames': lesson_names.values,
+        'lessons': lessons,
+        'words': words,
+        'answers': AnswerNormalizer().export((word[0], word[1]) for word in words),
+        'maxEditDistance': MAX_EDIT_DISTANCE,
+        'search': SearchIndex(corpus.find()).export()
+    }
+
+def encode_bundle(bundle):
+    """压缩格式的 JSON（无多余空白）"""
+    return json.dumps(bundle, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def update_service_worker(sw_file, bundle_url):
+    """把 sw.js 里 VOCABULARY_BUNDLE 常量改成新的数据包地址，返回是否有改动"""
+    if not os.path.exists(sw_file):
+        return False
+    with open(sw_file, 'r', encoding='utf-8') as f:
+        content = f.read()
+    updated = _SW_BUNDLE_RE.sub(f"const VOCABULARY_BUNDLE = '{bundle_url}';", content)
+    if updated == content:
+        return False
+    with atomic_write(sw_file) as f:
+        f.write(updated)
+    return True
+
+def write_bundle(data_dir=DEFAULT_DATA_DIR, output_dir=OUTPUT_DIR, sw_file=SERVICE_WORKER_FILE):
+    """
+    生成数据包并清理旧版本，返回数据包路径
+    三个文件都原子写入，按数据包、指向文件、sw.js 的顺序写，旧数据包最后删除：
+    中途失败时指向文件和 sw.js 引用的数据包仍然存在
+    """
+    body = encode_bundle(build_bundle(data_dir))
+    digest = hashlib.sha1(body).hexdigest()[:10]
+    bundle_name = f'{BUNDLE_PREFIX}.{digest}.json'
+    bundle_path = os.path.join(output_dir, bundle_name)
+
+    if not os.path.exists(bundle_path):
+        with atomic_write(bundle_path, mode='wb') as f:
+            f.write(body)
+
+    with atomic_write(os.path.join(output_dir, f'{BUNDLE_PREFIX}.json')) as f:
+        json.dump({'format': BUNDLE_FORMAT, 'file': bundle_name, 'size': len(body),
+                   'maxEditDistance': MAX_EDIT_DISTANCE}, f, ensure_ascii=False)
+
+    bundle_url = './' + os.path.relpath(bundle_path, os.path.dirname(os.path.abspath(sw_file))).replace(os.sep, '/')
+    if update_service_worker(sw_file, bundle_url):
+        print(f"已更新 {sw_file} 的预缓存地址: {bundle_url}")
+
+    for old_path in glob.glob(os.path.join(output_dir, f'{BUNDLE_PREFIX}.*.json')):
+        if old_path != bundle_path:
+            os.remove(old_path)
+    return bundle_path
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="把全部课程 CSV 编译成一个带内容哈希的词汇数据包")
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help="课程词汇目录")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help="数据包输出目录")
+    parser.add_argument('--sw', default=SERVICE_WORKER_FILE, help="需要更新预缓存列表的 Service Worker 文件")
+    args = parser.parse_args(argv)
+
+    bundle_path = write_bundle(args.data_dir, args.output_dir, args.sw)
+    with open(bundle_path, 'rb') as f:
+        bundle = json.loads(f.read())
+    print(f"已生成 {bundle_path}: {len(bundle['lessons'])} 课，{len(bundle['words'])} 个单词，"
+          f"{len(bundle['categories'])} 个栏目，{len(bundle['wordTypes'])} 种词性，{os.path.getsize(bundle_path)} 字节")
+
+if __name__ == "__main__":
+    sys.exit(main())
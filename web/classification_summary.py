@@ -1,8 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import csv
-import os
+from vocabulary_corpus import load_corpus
 
 def generate_classification_summary():
     """生成分类总结报告"""
@@ -15,34 +14,28 @@ def generate_classification_summary():
     greeting_distribution = {}
     lesson_stats = {}
     
-    for lesson_num in range(1, 26):
-        filename = f"data/vocabulary/lesson_{lesson_num:02d}_vocabulary.csv"
-        
-        if not os.path.exists(filename):
-            continue
-        
+    corpus = load_corpus()
+    
+    for lesson_num in corpus.lessons():
         lesson_categories = {}
         
-        with open(filename, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
+        for row in corpus.lesson_rows(lesson_num):
+            category = row.get('栏目', '未分类')
+            
+            # 全局统计
+            category_stats[category] = category_stats.get(category, 0) + 1
+            
+            # 课程统计
+            lesson_categories[category] = lesson_categories.get(category, 0) + 1
             
-            for row in reader:
-                category = row.get('栏目', '未分类')
-                
-                # 全局统计
-                category_stats[category] = category_stats.get(category, 0) + 1
-                
-                # 课程统计
-                lesson_categories[category] = lesson_categories.get(category, 0) + 1
-                
-                # 寒暄语分布
-                if category == "寒暄语":
-                    if lesson_num not in greeting_distribution:
-                        greeting_distribution[lesson_num] = []
-                    greeting_distribution[lesson_num].append({
-                        'kana': row['假名'],
-                        'meaning': row['释义']
-                    })
+            # 寒暄语分布
+            if category == "寒暄语":
+                if lesson_num not in greeting_distribution:
+                    greeting_distribution[lesson_num] = []
+                greeting_distribution[lesson_num].append({
+                    'kana': row['假名'],
+                    'meaning': row['释义']
+                })
         
         lesson_stats[lesson_num] = lesson_categories
     
@@ -72,13 +65,9 @@ def generate_classification_summary():
         print(f"   时间日期词汇: {lesson_stats[5]['时间日期']} 个")
         
         # 显示第五课的时间日期词汇
-        filename = "data/vocabulary/lesson_05_vocabulary.csv"
-        with open(filename, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            time_words = []
-            for row in reader:
-                if row.get('栏目') == '时间日期':
-                    time_words.append(f"{row['假名']}({row['释义']})")
+        time_words = []
+        for _, row in corpus.find(lesson=5, category='时间日期'):
+            time_words.append(f"{row['假名']}({row['释义']})")
         
         print("   具体词汇:")
         for word in time_words[:10]:  # 显示前10个
@@ -4,9 +4,11 @@
 import pandas as pd
 import json
 
+from workbook_cache import load_workbook
+
 def explore_data():
     """探索数据结构"""
-    df = pd.read_excel('minanonihongo_words.xls')
+    df = load_workbook()
     
     print("前20行原始数据:")
     for i in range(min(20, len(df))):
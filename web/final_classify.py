@@ -1,8 +1,8 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import csv
-import os
+from lesson_writer import LessonWriteBatch
+from vocabulary_corpus import corpus_write_lock, load_corpus
 
 def manual_adjustments():
     """手动调整一些特定的分类错误"""
@@ -28,31 +28,34 @@ def manual_adjustments():
         ]
     }
     
-    for filename, word_adjustments in adjustments.items():
-        filepath = f"data/vocabulary/{filename}"
-        if not os.path.exists(filepath):
-            continue
-            
-        print(f"调整 {filename}...")
-        
-        # 读取数据
-        rows = []
-        with open(filepath, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                # 检查是否需要调整
-                for kana_to_adjust, new_category in word_adjustments:
-                    if row['假名'] == kana_to_adjust:
-                        row['栏目'] = new_category
-                        print(f"  调整 {kana_to_adjust} -> {new_category}")
-                rows.append(row)
+    # 从读取到写回全程持有课程文件的写锁，并行运行的其他写者会等待
+    with corpus_write_lock():
+        corpus = load_corpus()
         
-        # 写回文件
-        with open(filepath, 'w', encoding='utf-8', newline='') as f:
-            fieldnames = ['课程', '栏目', '假名', '汉字', '释义', '词性']
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(rows)
+        # 调整的几个文件一起提交
+        with LessonWriteBatch() as batch:
+            for filename, word_adjustments in adjustments.items():
+                lesson_num = int(filename.split('_')[1])
+                if lesson_num not in corpus.lessons():
+                    continue
+                filepath = corpus.path(lesson_num)
+                
+                print(f"调整 {filename}...")
+            
+                # 读取数据（复制一份，避免改动共享的语料库缓存）
+                rows = []
+                for row in corpus.lesson_rows(lesson_num):
+                    row = dict(row)
+                    # 检查是否需要调整
+                    for kana_to_adjust, new_category in word_adjustments:
+                        if row['假名'] == kana_to_adjust:
+                            row['栏目'] = new_category
+                            print(f"  调整 {kana_to_adjust} -> {new_category}")
+                    rows.append(row)
+            
+                # 写回文件
+                fieldnames = ['课程', '栏目', '假名', '汉字', '释义', '词性']
+                batch.write_csv(filepath, fieldnames, rows)
 
 def generate_final_report():
     """生成最终的分类报告"""
@@ -61,25 +64,19 @@ def generate_final_report():
     all_categories = {}
     lesson_summaries = {}
     
-    for lesson_num in range(1, 26):
-        filename = f"data/vocabulary/lesson_{lesson_num:02d}_vocabulary.csv"
-        
-        if not os.path.exists(filename):
-            continue
-        
+    corpus = load_corpus()
+    
+    for lesson_num in corpus.lessons():
         lesson_categories = {}
         
-        with open(filename, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
+        for row in corpus.lesson_rows(lesson_num):
+            category = row.get('栏目', '未分类')
             
-            for row in reader:
-                category = row.get('栏目', '未分类')
-                
-                # 统计全局
-                all_categories[category] = all_categories.get(category, 0) + 1
-                
-                # 统计该课程
-                lesson_categories[category] = lesson_categories.get(category, 0) + 1
+            # 统计全局
+            all_categories[category] = all_categories.get(category, 0) + 1
+            
+            # 统计该课程
+            lesson_categories[category] = lesson_categories.get(category, 0) + 1
         
         lesson_summaries[lesson_num] = lesson_categories
     
@@ -113,6 +110,8 @@ def show_category_examples():
     """显示各类别的示例"""
     print("\n显示分类示例:")
     
+    corpus = load_corpus()
+    
     # 重点显示的分类
     key_categories = ["寒暄语", "学习用品", "时间日期", "交通工具", "国籍职业"]
     
@@ -120,18 +119,8 @@ def show_category_examples():
         print(f"\n{category}示例:")
         examples = []
         
-        for lesson_num in range(1, 26):
-            filename = f"data/vocabulary/lesson_{lesson_num:02d}_vocabulary.csv"
-            
-            if not os.path.exists(filename):
-                continue
-            
-            with open(filename, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                
-                for row in reader:
-                    if row.get('栏目') == category and len(examples) < 5:
-                        examples.append(f"第{lesson_num}课: {row['假名']}({row['释义']})")
+        for lesson_num, row in corpus.find(category=category)[:5]:
+            examples.append(f"第{lesson_num}课: {row['假名']}({row['释义']})")
         
         for example in examples:
             print(f"  {example}")
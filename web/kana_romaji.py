@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+假名转罗马音
+用 kana_data.csv（含拗音、浊音、长音等全部类型）建一棵前缀树，按最长匹配逐段转换：
+- っ/ッ 让下一段的辅音双写（がっこう -> gakkou）；无法双写时（词尾、元音或 n 之前）写作 xtsu（あっ -> axtsu）
+- ん 在元音或 y 之前写作 n'（きんえん -> kin'en，与 きねん kinen 区分；ほんや -> hon'ya）
+- 单独的 ー 重复前一段的元音（コーヒー -> koohii）
+- 表里没有的字符（汉字、符号等）原样保留
+转换结果都能被 romaji-converter.js 原样转回假名
+批量接口对重复的字符串只转换一次；整列转换也是逐个不同的值查前缀树，不是向量化运算，
+耗时取决于列中不同值的个数
+"""
+
+import csv
+import os
+from functools import lru_cache
+
+KANA_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'kana_data.csv')
+SOKUON = frozenset('っッ')
+SOKUON_ROMAJI = 'xtsu'
+HATSUON = frozenset('んン')
+HATSUON_ROMAJI = "n'"
+CHOUON = 'ー'
+VOWELS = frozenset('aeiou')
+# 以这些字母开头的一段前面的 ん 要加 '，否则会和 な行、にゃ 等混淆
+HATSUON_AMBIGUOUS = VOWELS | {'y'}
+# 促音不能用双写表示的开头：元音，以及 n（nn 会被读成 ん）
+UNDOUBLED = VOWELS | {'n'}
+KANA_CHAR_PATTERN = '[\u3041-\u30ff]'
+
+def load_kana_table(csv_file=KANA_FILE):
+    """kana_data.csv 中 假名 -> 罗马音"""
+    with open(csv_file, 'r', encoding='utf-8') as f:
+        return {row['kana']: row['romaji'] for row in csv.DictReader(f)}
+
+class KanaRomajiConverter:
+    """最长匹配前缀树转换器；树节点为 [罗马音或 None, 子节点字典]"""
+
+    def __init__(self, table):
+        self.table = dict(table)
+        self._root = {}
+        for kana, romaji in self.table.items():
+            children = self._root
+            node = None
+            for char in kana:
+                node = children.get(char)
+                if node is None:
+                    node = children[char] = [None, {}]
+                children = node[1]
+            node[0] = romaji
+
+    def split(self, text):
+        """
+        把假名切成最长匹配的各段，返回 [(假名, 罗马音), ...]
+        促音并入下一段（っこ -> kko），无法双写时单独成段（っ -> xtsu）；元音或 y 之前的 ん 为 n'
+        """
+        root = self._root
+        result = []
+        length = len(text)
+        sokuon = None           # 等待双写下一段的 っ 的位置
+        after_hatsuon = False
+        i = 0
+        while i < length:
+            char = text[i]
+            if char in SOKUON:
+                if sokuon is not None:
+                    # っっ：前一个 っ 没有可以双写的辅音
+                    result.append((text[sokuon], SOKUON_ROMAJI))
+                sokuon = i
+                i += 1
+                continue
+
+            node = root.get(char)
+            romaji = None
+            step = 1
+            if node is not None:
+                romaji = node[0]
+                children = node[1]
+                j = i + 1
+                while children and j < length:
+                    node = children.get(text[j])
+                    if node is None:
+                        break
+                    j += 1
+                    if node[0] is not None:
+                        romaji = node[0]
+                        step = j - i
+                    children = node[1]
+
+            if romaji is None:
+                if char == CHOUON and result and result[-1][1][-1:] in VOWELS:
+                    romaji = result[-1][1][-1]
+                else:
+                    romaji = char
+            start = i
+            if sokuon is not None:
+                first = romaji[:1]
+                if first.isascii() and first.isalpha() and first not in UNDOUBLED:
+                    romaji = first + romaji
+                    start = sokuon
+                else:
+                    result.append((text[sokuon], SOKUON_ROMAJI))
+                sokuon = None
+            if after_hatsuon and romaji[:1] in HATSUON_AMBIGUOUS:
+                result[-1] = (result[-1][0], HATSUON_ROMAJI)
+
+            after_hatsuon = char in HATSUON
+            result.append((text[start:i + step], romaji))
+            i += step
+        if sokuon is not None:
+            result.append((text[sokuon], SOKUON_ROMAJI))
+        return result
+
+    def segments(self, text):
+        """各段的罗马音列表（见 split）"""
+        return [romaji for _, romaji in self.split(text)]
+
+    def convert(self, text, separator=''):
+        """转换一个字符串；separator 为各段之间的分隔符（如 ' ' 得到 wa ta shi，此时 ん 已经分开，不再加 '）"""
+        segments = self.segments(text)
+        if separator:
+            segments = ['n' if segment == HATSUON_ROMAJI else segment for segment in segments]
+        return separator.join(segments)
+
+    def convert_many(self, texts, separator=''):
+        """批量转换，重复的字符串只转换一次"""
+        cache = {}
+        result = []
+        for text in texts:
+            romaji = cache.get(text)
+            if romaji is None:
+                romaji = cache[text] = self.convert(text, separator)
+            result.append(romaji)
+        return result
+
+    def convert_series(self, series, separator=''):
+        """转换一整列（pandas Series），空值转换为空字符串；与 convert_many 一样每个不同的值只转换一次"""
+        # 传入 Series 时 pandas 一定已安装；不在模块顶部导入，服务器和搜索索引不依赖 pandas
+        import pandas as pd
+
+        values = series.fillna('').astype(str).tolist()
+        return pd.Series(self.convert_many(values, separator), index=series.index, name=series.name, dtype=object)
+
+    def fill_missing(self, kana_series, romaji_series, separator=' '):
+        """罗马音列为空、且假名列确实含有假名的行用转换结果补上，其他行保持不变"""
+        missing = romaji_series.isna() | (romaji_series.astype(str).str.strip() == '')
+        missing &= kana_series.astype(str).str.contains(KANA_CHAR_PATTERN, regex=True, na=False)
+        if not missing.any():
+            return romaji_series
+        filled = romaji_series.copy()
+        filled[missing] = self.convert_series(kana_series[missing], separator)
+        return filled
+
+@lru_cache(maxsize=None)
+def load_converter(csv_file=KANA_FILE):
+    """读取假名表并建树（同一进程只建一次）"""
+    return KanaRomajiConverter(load_kana_table(csv_file))
+
+def kana_to_romaji(text, separator=''):
+    return load_converter().convert(text, separator)
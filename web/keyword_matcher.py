@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多关键词匹配器 - 把 {分类: [关键词...]} 规则表编译成 Aho-Corasick 自动机
+一次扫描即可得到文本命中的全部分类，并保持规则表原有的优先顺序
+"""
+
+from collections import deque
+
+class KeywordMatcher:
+    """按优先级匹配分类关键词的 Aho-Corasick 自动机"""
+
+    def __init__(self, rules=None):
+        self._categories = []
+        self._category_ids = {}
+        # 每个状态: 转移表、失败指针、命中的分类位图（第 i 位 = 第 i 个分类）
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [0]
+        self._built = False
+
+        if rules:
+            for category, keywords in rules.items():
+                self.add(category, keywords)
+
+    def add(self, category, keywords):
+        """追加一个分类的关键词；分类的优先级按首次添加的顺序排列"""
+        if category not in self._category_ids:
+            self._category_ids[category] = len(self._categories)
+            self._categories.append(category)
+        bit = 1 << self._category_ids[category]
+
+        for keyword in keywords:
+            if not keyword:
+                continue
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(0)
+                    self._goto[state][char] = next_state
+                state = next_state
+            self._output[state] |= bit
+
+        self._built = False
+        return self
+
+    def _build(self):
+        """广度优先计算失败指针，并沿失败链合并命中位图"""
+        queue = deque()
+        for next_state in self._goto[0].values():
+            self._fail[next_state] = 0
+            queue.append(next_state)
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                fail_state = self._fail[state]
+                while fail_state and char not in self._goto[fail_state]:
+                    fail_state = self._fail[fail_state]
+                self._fail[next_state] = self._goto[fail_state].get(char, 0)
+                self._output[next_state] |= self._output[self._fail[next_state]]
+                queue.append(next_state)
+
+        self._built = True
+
+    def match_mask(self, *texts):
+        """扫描所有文本，返回命中分类的位图"""
+        if not self._built:
+            self._build()
+
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        mask = 0
+        for text in texts:
+            if not text:
+                continue
+            state = 0
+            for char in text:
+                while state and char not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(char, 0)
+                mask |= output[state]
+        return mask
+
+    def matches(self, *texts):
+        """返回命中的全部分类（按优先级排序）"""
+        mask = self.match_mask(*texts)
+        return [category for i, category in enumerate(self._categories) if mask >> i & 1]
+
+    def first_match(self, *texts):
+        """返回优先级最高的命中分类，没有命中时返回 None"""
+        mask = self.match_mask(*texts)
+        if not mask:
+            return None
+        return self._categories[(mask & -mask).bit_length() - 1]
+
+    def __contains__(self, text):
+        return bool(self.match_mask(text))
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+课程边界索引 - 根据工作簿中的“大家日语_XX”分割线自动找出每课的行范围
+一次向量化判断即可完成（数百行的工作簿不到 1 毫秒），每次运行直接重新检测，工作簿换新版本后无需额外处理
+"""
+
+LESSON_MARKER_PREFIX = '大家日语_'
+
+def find_lesson_markers(df):
+    """一次向量化判断找出所有课程分割线行（第一列以“大家日语_”开头）"""
+    return df.iloc[:, 0].str.startswith(LESSON_MARKER_PREFIX, na=False)
+
+def detect_lesson_boundaries(df):
+    """
+    返回 [(课程编号, 分割线行号, 结束行号), ...]，行号为位置下标
+    每课的单词位于 (分割线行号, 结束行号) 之间
+    """
+    is_marker = find_lesson_markers(df)
+    positions = [position for position, flag in enumerate(is_marker.tolist()) if flag]
+    names = df.iloc[positions, 0].tolist()
+    ends = positions[1:] + [len(df)]
+    return [
+        (name.replace(LESSON_MARKER_PREFIX, ''), start, end)
+        for name, start, end in zip(names, positions, ends)
+    ]
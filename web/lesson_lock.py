@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+课程文件的读写锁（fcntl 建议锁）
+- 读锁（共享）：load_corpus 等读取课程 CSV 时持有，分析、报告脚本之间可以同时运行
+- 写锁（独占）：merge_vocabulary、precise_reclassify、final_classify 等从读取到写回全程持有，
+  与其他写者、读者互斥，两个写者并行运行时不会覆盖对方的修改
+锁加在同目录下的 .<文件名>.lock 上，而不是 CSV 本身：原子写入用 os.replace 换掉了 CSV，
+加在旧文件上的锁对新文件不起作用。最后一个持有者释放时删除锁文件，只读的报告脚本跑完不会留下锁文件；
+以前的版本留下的锁文件可以用 remove_unused_lock_files 清理
+
+多个文件按绝对路径排序后依次加锁，各进程的加锁顺序一致，不会互相死锁
+同一进程内按线程区分持有者：其他线程持有写锁时读、写都要等待，其他线程持有读锁时写要等待；
+同一线程可以重复加锁（已持有写锁时再加读锁直接通过）。持有读锁时再加写锁会等其他线程的读锁释放后升级，
+升级不是原子的（先放开读锁再等写锁），升级前读到的内容可能已被其他进程改写，读-改-写请一开始就加写锁
+没有 fcntl 的平台（Windows）上只在进程内互斥
+
+用法:
+  with write_lock(paths):
+      rows = read(...)
+      write(...)
+
+  with read_lock(path):
+      rows = read(...)
+"""
+
+import contextlib
+import os
+import sys
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    # Windows 没有 fcntl，退化为不加文件锁
+    fcntl = None
+
+LOCK_SUFFIX = '.lock'
+LOCKING_AVAILABLE = fcntl is not None
+# 指定超时时间时，轮询锁的间隔（秒）
+POLL_INTERVAL = 0.1
+
+class LessonLockTimeout(TimeoutError):
+    """在指定时间内没有等到锁"""
+
+class _HeldLock:
+    """本进程对一个文件持有的锁：锁文件描述符、flock 是否为写锁、各线程的持有次数"""
+
+    __slots__ = ('fd', 'exclusive', 'readers', 'writer', 'writes', 'upgrading')
+
+    def __init__(self, fd, exclusive):
+        self.fd = fd
+        self.exclusive = exclusive
+        self.readers = {}       # 线程 -> 读锁重入次数
+        self.writer = None      # 持有写锁的线程
+        self.writes = 0         # 写锁线程的重入次数（持有写锁期间再加的读锁也算在内）
+        self.upgrading = None   # 正在把读锁升级为写锁的线程，期间新的读者要等待
+
+# 本进程持有的锁：绝对路径 -> _HeldLock；_held_guard 只保护这些表，等待 flock 时不持有
+_held = {}
+# 正在等待 flock 的文件（第一个持有者还没拿到锁），同一文件的其他线程等它出结果
+_pending = set()
+# 在进程内排队等写锁的线程数：有写者排队时新的读者先等待，写者不会被源源不断的读者饿死
+_waiting_writers = {}
+_held_guard = threading.Lock()
+_held_changed = threading.Condition(_held_guard)
+# 已经提示过“等待其他进程”的文件，每个文件只提示一次
+_wait_notified = set()
+
+def lock_path(path):
+    """课程文件对应的锁文件路径"""
+    directory, name = os.path.split(os.path.abspath(path))
+    # 增量清单这类隐藏文件不再重复加点
+    prefix = '' if name.startswith('.') else '.'
+    return os.path.join(directory, f'{prefix}{name}{LOCK_SUFFIX}')
+
+def _open_lock_file(path, exclusive):
+    """打开（必要时创建）锁文件；只读目录下加读锁时打不开锁文件则不加锁，返回 None"""
+    lock_file = lock_path(path)
+    if exclusive:
+        os.makedirs(os.path.dirname(lock_file), exist_ok=True)
+    try:
+        return os.open(lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+    except OSError:
+        if exclusive:
+            raise
+    try:
+        return os.open(lock_file, os.O_RDONLY)
+    except OSError:
+        return None
+
+def _remaining(deadline):
+    return None if deadline is None else max(0, deadline - time.monotonic())
+
+def _flock(fd, path, exclusive, timeout):
+    operation = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+    try:
+        fcntl.flock(fd, operation | fcntl.LOCK_NB)
+        return
+    except BlockingIOError:
+        pass
+
+    kind = '写锁' if exclusive else '读锁'
+    if path not in _wait_notified:
+        _wait_notified.add(path)
+        print(f"等待其他进程释放 {os.path.basename(path)}（加{kind}）...", file=sys.stderr)
+    if timeout is None:
+        fcntl.flock(fd, operation)
+        return
+    deadline = time.monotonic() + timeout
+    while True:
+        time.sleep(POLL_INTERVAL)
+        try:
+            fcntl.flock(fd, operation | fcntl.LOCK_NB)
+            return
+        except BlockingIOError:
+            if time.monotonic() >= deadline:
+                raise LessonLockTimeout(f"等待 {path} 的{kind}超时（{timeout} 秒）")
+
+def _same_file(fd, path):
+    """fd 打开的是否仍是 path 指向的文件（等锁期间锁文件可能被上一个持有者删掉）"""
+    try:
+        current = os.stat(path)
+    except FileNotFoundError:
+        return False
+    opened = os.fstat(fd)
+    return (opened.st_dev, opened.st_ino) == (current.st_dev, current.st_ino)
+
+def _lock_file(key, exclusive, deadline):
+    """打开锁文件并加 flock，返回描述符；不能加锁时返回 None"""
+    lock_file = lock_path(key)
+    while True:
+        fd = _open_lock_file(key, exclusive)
+        if fd is None:
+            return None
+        try:
+            _flock(fd, key, exclusive, _remaining(deadline))
+            if _same_file(fd, lock_file):
+                return fd
+        except BaseException:
+            os.close(fd)
+            raise
+        # 拿到的是已被删除的旧锁文件，重新打开新的
+        os.close(fd)
+
+def _unlock_file(key, fd):
+    """解锁并关闭；没有其他进程持有或等待这个锁时删除锁文件"""
+    try:
+        # 能独占说明只剩自己，此时删除是安全的：等在旧文件上的进程拿到锁后会发现文件已被删除并重新打开
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        with contextlib.suppress(OSError):
+            os.remove(lock_path(key))
+    except BlockingIOError:
+        pass
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+def remove_unused_lock_files(directory):
+    """删除目录中没有任何进程持有的锁文件（旧版本释放锁时不删除锁文件），返回删除的个数"""
+    if not LOCKING_AVAILABLE:
+        return 0
+    removed = 0
+    for name in os.listdir(directory) if os.path.isdir(directory) else ():
+        if not (name.startswith('.') and name.endswith(LOCK_SUFFIX)):
+            continue
+        lock_file = os.path.join(directory, name)
+        try:
+            fd = os.open(lock_file, os.O_RDWR)
+        except OSError:
+            continue
+        try:
+            # 与 _unlock_file 相同：能独占说明没有持有者，等在这个文件上的进程拿到锁后会重新打开
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            if _same_file(fd, lock_file):
+                os.remove(lock_file)
+                removed += 1
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+    return removed
+
+def _wait(key, deadline):
+    """调用时持有 _held_guard：等本进程其他线程释放或拿到锁"""
+    if deadline is None:
+        _held_changed.wait()
+        return
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise LessonLockTimeout(f"等待 {key} 的锁超时（本进程的其他线程正在使用）")
+    _held_changed.wait(remaining)
+
+def _upgrade(key, held, me, deadline):
+    """调用时持有 _held_guard：把本线程的读锁升级为写锁，升级后一直保持写锁，直到本线程全部释放"""
+    if held.upgrading is not None:
+        raise RuntimeError(f"{key} 有两个线程同时把读锁升级为写锁，会互相等待，请在读取之前加写锁")
+    held.upgrading = me
+    try:
+        while len(held.readers) > 1:
+            _wait(key, deadline)
+        if held.fd is not None and not held.exclusive:
+            _held_guard.release()
+            try:
+                try:
+                    _flock(held.fd, key, True, _remaining(deadline))
+                except BaseException:
+                    # 转换失败时读锁可能已经放开，重新加回读锁
+                    fcntl.flock(held.fd, fcntl.LOCK_SH)
+                    raise
+            finally:
+                _held_guard.acquire()
+        held.exclusive = True
+        held.writer = me
+        held.writes = held.readers.pop(me) + 1
+    finally:
+        held.upgrading = None
+        _held_changed.notify_all()
+
+def acquire(path, exclusive=False, timeout=None):
+    """给一个文件加锁；timeout 为 None 时一直等待。请在同一线程中与 release 成对调用"""
+    key = os.path.abspath(path)
+    me = threading.get_ident()
+    deadline = None if timeout is None else time.monotonic() + timeout
+    with _held_guard:
+        held = _held.get(key)
+        if held is not None and held.writer == me:
+            held.writes += 1
+            return
+        if held is not None and me in held.readers:
+            if exclusive:
+                _upgrade(key, held, me, deadline)
+            else:
+                held.readers[me] += 1
+            return
+
+        if exclusive:
+            _waiting_writers[key] = _waiting_writers.get(key, 0) + 1
+        try:
+            while True:
+                held = _held.get(key)
+                if held is None and key not in _pending:
+                    break
+                if (held is not None and not exclusive and held.writer is None
+                        and held.upgrading is None and not _waiting_writers.get(key)):
+                    held.readers[me] = 1
+                    return
+                _wait(key, deadline)
+        finally:
+            if exclusive:
+                _waiting_writers[key] -= 1
+                if not _waiting_writers[key]:
+                    del _waiting_writers[key]
+                    _held_changed.notify_all()
+        _pending.add(key)
+
+    # 阻塞的 flock 不持有 _held_guard，等待一个文件时本进程其他线程仍能加锁、解锁别的文件
+    try:
+        fd = _lock_file(key, exclusive, deadline) if LOCKING_AVAILABLE else None
+    except BaseException:
+        with _held_guard:
+            _pending.discard(key)
+            _held_changed.notify_all()
+        raise
+
+    with _held_guard:
+        _pending.discard(key)
+        held = _held[key] = _HeldLock(fd, exclusive)
+        if exclusive:
+            held.writer = me
+            held.writes = 1
+        else:
+            held.readers[me] = 1
+        _held_changed.notify_all()
+
+def release(path):
+    """释放本线程一次 acquire 加的锁；所有线程都释放后才真正解锁"""
+    key = os.path.abspath(path)
+    me = threading.get_ident()
+    with _held_guard:
+        held = _held.get(key)
+        if held is not None and held.writer == me:
+            held.writes -= 1
+            if not held.writes:
+                held.writer = None
+        elif held is not None and me in held.readers:
+            held.readers[me] -= 1
+            if not held.readers[me]:
+                del held.readers[me]
+        else:
+            raise RuntimeError(f"当前线程没有持有 {path} 的锁")
+        if held.readers or held.writer is not None:
+            _held_changed.notify_all()
+            return
+        del _held[key]
+        if held.fd is not None:
+            _unlock_file(key, held.fd)
+        _held_changed.notify_all()
+
+@contextlib.contextmanager
+def _locked(paths, exclusive, timeout):
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    # 按绝对路径排序加锁，所有进程顺序一致
+    keys = sorted({os.path.abspath(path) for path in paths})
+    acquired = []
+    try:
+        for key in keys:
+            acquire(key, exclusive, timeout)
+            acquired.append(key)
+        yield
+    finally:
+        for key in reversed(acquired):
+            release(key)
+
+def read_lock(paths, timeout=None):
+    """对一个或一组文件加读锁（共享）"""
+    return _locked(paths, False, timeout)
+
+def write_lock(paths, timeout=None):
+    """对一个或一组文件加写锁（独占）"""
+    return _locked(paths, True, timeout)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+课程文件的原子写入
+- 单个文件：先写同目录下的临时文件并 fsync，再用 os.replace 一次性替换，
+  中途崩溃只会留下没用的临时文件，课程 CSV 要么是旧内容要么是新内容，不会被写到一半
+- 多个文件（LessonWriteBatch）：全部临时文件写好并 fsync 后，先写一份日志记录
+  “临时文件 -> 目标文件”，再逐个替换，最后删除日志。
+  替换途中崩溃时，下次打开同一目录的批次（或调用 recover）会按日志把剩下的文件替换完；
+  日志写好之前崩溃则所有目标文件都保持原样。整批文件要么全部更新，要么全部不变
+
+不再需要给每个文件整份复制 .backup
+
+替换目标文件时持有它们的写锁（见 lesson_lock），读取语料库的进程不会读到提交了一半的批次；
+读-改-写的脚本用 batch.lock() 在读取之前加写锁，一直持有到提交完成
+
+用法:
+  with LessonWriteBatch() as batch:
+      batch.lock([path1, path2])
+      rows1, rows2 = read(path1), read(path2)
+      batch.write_csv(path1, fieldnames, rows1)
+      batch.write_csv(path2, fieldnames, rows2)
+  # 离开 with 时提交；出现异常则回滚（删除临时文件）
+
+  write_csv_atomic(path, fieldnames, rows)
+"""
+
+import csv
+import glob
+import json
+import os
+import time
+import uuid
+from contextlib import ExitStack, contextmanager
+
+from lesson_lock import write_lock
+
+TEMP_SUFFIX = '.tmp'
+JOURNAL_PREFIX = '.lesson_write.'
+JOURNAL_SUFFIX = '.journal'
+JOURNAL_FORMAT = 1
+# 不属于任何日志、超过这个时间的临时文件视为崩溃残留，恢复时删除（正在写的批次不会这么久）
+STALE_TEMP_SECONDS = 3600
+
+def _fsync_directory(directory):
+    """让目录项（新文件名）落盘；Windows 不支持打开目录，跳过"""
+    try:
+        fd = os.open(directory or '.', os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def _temp_path(path):
+    directory, name = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, f'.{name}.{uuid.uuid4().hex[:12]}{TEMP_SUFFIX}')
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def _apply(entries):
+    """按日志把临时文件替换到目标位置；已经替换过的（临时文件不存在）跳过，可重复执行"""
+    directories = set()
+    with write_lock([target for _, target in entries]):
+        for temp, target in entries:
+            try:
+                os.replace(temp, target)
+            except FileNotFoundError:
+                continue
+            directories.add(os.path.dirname(target))
+    for directory in directories:
+        _fsync_directory(directory)
+
+def _read_journal(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            journal = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return journal if journal.get('format') == JOURNAL_FORMAT else None
+
+def recover(directory):
+    """
+    处理目录中上次没提交完的批次：按日志把剩下的文件替换完，删除日志；
+    同时清理不属于任何日志的过期临时文件。返回补完的批次数
+    """
+    recovered = 0
+    pending_temps = set()
+    for journal_path in glob.glob(os.path.join(directory, f'{JOURNAL_PREFIX}*{JOURNAL_SUFFIX}')):
+        journal = _read_journal(journal_path)
+        if journal is None:
+            continue
+        entries = [(entry['temp'], entry['target']) for entry in journal['files']]
+        pending_temps.update(os.path.abspath(temp) for temp, _ in entries)
+        _apply(entries)
+        _remove_quietly(journal_path)
+        recovered += 1
+        print(f"已补完上次未提交完的写入: {journal_path}（{len(entries)} 个文件）")
+
+    now = time.time()
+    for temp in glob.glob(os.path.join(directory, f'.*{TEMP_SUFFIX}')):
+        if os.path.abspath(temp) in pending_temps:
+            continue
+        try:
+            if now - os.path.getmtime(temp) > STALE_TEMP_SECONDS:
+                os.remove(temp)
+        except OSError:
+            pass
+    return recovered
+
+class LessonWriteBatch:
+    """一组一起提交或一起回滚的文件写入"""
+
+    def __init__(self, journal_dir=None):
+        """journal_dir: 日志所在目录，默认为第一个写入文件所在的目录"""
+        self.journal_dir = journal_dir
+        self._files = {}  # 目标路径 -> 临时文件路径（按写入顺序）
+        self._locks = ExitStack()
+        self._closed = False
+        if journal_dir:
+            recover(journal_dir)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+    def __len__(self):
+        return len(self._files)
+
+    def lock(self, paths):
+        """
+        在读取之前给要改写的文件加写锁，持有到批次提交或回滚之后
+        多次调用时请按路径升序加锁，与其他进程的加锁顺序保持一致
+        """
+        if self._closed:
+            raise RuntimeError("批次已经提交或回滚")
+        self._locks.enter_context(write_lock(paths))
+
+    @contextmanager
+    def open(self, path, encoding='utf-8', newline='', mode='w'):
+        """打开目标文件对应的临时文件用于写入；同一目标写多次时以最后一次为准。mode='wb' 时以二进制写入"""
+        if self._closed:
+            raise RuntimeError("批次已经提交或回滚")
+        target = os.path.abspath(path)
+        directory = os.path.dirname(target)
+        os.makedirs(directory, exist_ok=True)
+        if self.journal_dir is None:
+            self.journal_dir = directory
+            recover(directory)
+
+        temp = _temp_path(target)
+        try:
+            if 'b' in mode:
+                encoding = newline = None
+            with open(temp, mode, encoding=encoding, newline=newline) as f:
+                yield f
+                f.flush()
+                os.fsync(f.fileno())
+        except BaseException:
+            _remove_quietly(temp)
+            raise
+
+        previous = self._files.pop(target, None)
+        if previous:
+            _remove_quietly(previous)
+        self._files[target] = temp
+
+    def write_csv(self, path, fieldnames, rows):
+        """按表头写一个 CSV 文件（rows 为字典列表）"""
+        with self.open(path) as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+
+    def commit(self):
+        """把全部临时文件替换到目标位置"""
+        if self._closed:
+            return
+        self._closed = True
+        with self._locks:
+            self._commit()
+
+    def _commit(self):
+        entries = [(temp, target) for target, temp in self._files.items()]
+        if not entries:
+            return
+        if len(entries) == 1:
+            # 单个文件的替换本身就是原子的，不需要日志
+            _apply(entries)
+            return
+
+        journal_path = os.path.join(self.journal_dir, f'{JOURNAL_PREFIX}{os.getpid()}.{uuid.uuid4().hex[:8]}{JOURNAL_SUFFIX}')
+        journal = {
+            'format': JOURNAL_FORMAT,
+            'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'files': [{'temp': temp, 'target': target} for temp, target in entries]
+        }
+        # 日志本身也先写临时文件再替换，读到的日志一定是完整的
+        journal_temp = _temp_path(journal_path)
+        with open(journal_temp, 'w', encoding='utf-8') as f:
+            json.dump(journal, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(journal_temp, journal_path)
+        _fsync_directory(self.journal_dir)
+
+        _apply(entries)
+        _remove_quietly(journal_path)
+        _fsync_directory(self.journal_dir)
+
+    def rollback(self):
+        """放弃本批次：删除全部临时文件，目标文件保持原样"""
+        if self._closed:
+            return
+        self._closed = True
+        with self._locks:
+            for temp in self._files.values():
+                _remove_quietly(temp)
+            self._files.clear()
+
+@contextmanager
+def atomic_write(path, encoding='utf-8', newline='', mode='w'):
+    """原子地写一个文件：with atomic_write(path) as f: ...（二进制文件用 mode='wb'）"""
+    with LessonWriteBatch() as batch:
+        with batch.open(path, encoding=encoding, newline=newline, mode=mode) as f:
+            yield f
+
+def write_csv_atomic(path, fieldnames, rows):
+    """原子地写一个 CSV 文件（rows 为字典列表）"""
+    with LessonWriteBatch() as batch:
+        batch.write_csv(path, fieldnames, rows)
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+错题统计库 - 用 SQLite（WAL 模式）保存全班的错题事件
+事件按批追加写入；每批写入后在同一事务中把新增事件累加到汇总表，
+“每课错得最多的单词”“每天的错题数”等查询直接读汇总表，不再扫描全部事件
+
+用法:
+  python mistake_store.py import 学生名 wordMistakes.json   导入网页端导出的 wordMistakes
+  python mistake_store.py top [--lesson 第一课] [-n 10]       错得最多的单词
+  python mistake_store.py daily [--lesson 第一课]             每天的错题数
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime
+
+DB_FILE = os.path.join('data', 'mistakes.db')
+BATCH_SIZE = 5000
+DEFAULT_STUDENT = 'anonymous'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS mistake_events (
+    id INTEGER PRIMARY KEY,
+    student TEXT NOT NULL,
+    word_id TEXT NOT NULL,
+    lesson TEXT NOT NULL,
+    kana TEXT NOT NULL,
+    meaning TEXT NOT NULL,
+    type TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    day TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_events_unique ON mistake_events (student, word_id, ts, type);
+CREATE INDEX IF NOT EXISTS idx_events_lesson ON mistake_events (lesson, word_id);
+CREATE INDEX IF NOT EXISTS idx_events_day ON mistake_events (day);
+
+CREATE TABLE IF NOT EXISTS word_totals (
+    word_id TEXT PRIMARY KEY,
+    lesson TEXT NOT NULL,
+    kana TEXT NOT NULL,
+    meaning TEXT NOT NULL,
+    mistakes INTEGER NOT NULL,
+    students INTEGER NOT NULL,
+    last_ts TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_word_totals_lesson ON word_totals (lesson, mistakes DESC);
+CREATE INDEX IF NOT EXISTS idx_word_totals_mistakes ON word_totals (mistakes DESC);
+
+CREATE TABLE IF NOT EXISTS word_students (
+    word_id TEXT NOT NULL,
+    student TEXT NOT NULL,
+    PRIMARY KEY (word_id, student)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS daily_counts (
+    day TEXT NOT NULL,
+    lesson TEXT NOT NULL,
+    mistakes INTEGER NOT NULL,
+    PRIMARY KEY (day, lesson)
+) WITHOUT ROWID;
+"""
+
+def word_id_of(word):
+    """与 mistake-tracker.js 的 getWordId 相同：课程_假名_释义"""
+    return f"{word.get('lesson') or '未知'}_{word.get('kana') or word.get('meaning')}_{word.get('meaning') or ''}"
+
+def parse_timestamp(value):
+    """
+    错题时间：合法的 ISO 8601 字符串（如 2025-09-09T12:00:00.000Z 或 2025-09-09）原样返回，否则返回 None
+    事件以（学生, 单词, 时间, 类型）去重，时间必须来自记录本身，重复同步同一条记录才不会重复计数
+    """
+    if not isinstance(value, str):
+        return None
+    try:
+        datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return value
+
+def events_from_word_mistakes(student, word_mistakes):
+    """把网页端 localStorage 中的 wordMistakes 展开成错题事件"""
+    for word_id, record in word_mistakes.items():
+        if not isinstance(record, dict):
+            continue
+        word = record.get('word') or {}
+        for entry in record.get('types') or []:
+            if not isinstance(entry, dict):
+                continue
+            yield {
+                'student': student,
+                'word_id': word_id,
+                'lesson': word.get('lesson') or '未知',
+                'kana': word.get('kana') or '',
+                'meaning': word.get('meaning') or '',
+                'type': entry.get('type') or 'wrong',
+                'timestamp': entry.get('timestamp') or entry.get('date')
+            }
+
+class MistakeStore:
+    """错题事件库"""
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _event_row(self, event):
+        """事件对应的一行；没有合法时间的事件返回 None"""
+        timestamp = parse_timestamp(event.get('timestamp'))
+        if timestamp is None:
+            return None
+        word = event.get('word') or {}
+        return (
+            event.get('student') or DEFAULT_STUDENT,
+            event.get('word_id') or word_id_of(word),
+            event.get('lesson') or word.get('lesson') or '未知',
+            event.get('kana') or word.get('kana') or '',
+            event.get('meaning') or word.get('meaning') or '',
+            event.get('type') or 'wrong',
+            timestamp,
+            timestamp[:10]
+        )
+
+    def ingest(self, events, batch_size=BATCH_SIZE):
+        """
+        按批追加错题事件，返回实际新增的事件数（重复上传的事件、没有合法 timestamp 的事件会被忽略）
+        事件: {student, word_id 或 word{lesson, kana, meaning}, lesson, kana, meaning, type, timestamp}
+        """
+        inserted = 0
+        batch = []
+        for event in events:
+            row = self._event_row(event)
+            if row is None:
+                continue
+            batch.append(row)
+            if len(batch) >= batch_size:
+                inserted += self._ingest_batch(batch)
+                batch = []
+        if batch:
+            inserted += self._ingest_batch(batch)
+        return inserted
+
+    def _ingest_batch(self, rows):
+        with self.conn:
+            last_id = self.conn.execute('SELECT COALESCE(MAX(id), 0) FROM mistake_events').fetchone()[0]
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO mistake_events (student, word_id, lesson, kana, meaning, type, ts, day) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                rows
+            )
+            inserted = self.conn.execute('SELECT COUNT(*) FROM mistake_events WHERE id > ?', (last_id,)).fetchone()[0]
+            if inserted:
+                self._accumulate(last_id)
+        return inserted
+
+    def _accumulate(self, last_id):
+        """把 id > last_id 的新事件累加到汇总表"""
+        self.conn.execute("""
+            INSERT OR IGNORE INTO word_students (word_id, student)
+            SELECT DISTINCT word_id, student FROM mistake_events WHERE id > ?
+        """, (last_id,))
+        self.conn.execute("""
+            INSERT INTO word_totals (word_id, lesson, kana, meaning, mistakes, students, last_ts)
+            SELECT word_id, lesson, kana, meaning, COUNT(*), 0, MAX(ts)
+            FROM mistake_events WHERE id > ? GROUP BY word_id
+            ON CONFLICT (word_id) DO UPDATE SET
+                mistakes = mistakes + excluded.mistakes,
+                last_ts = MAX(last_ts, excluded.last_ts)
+        """, (last_id,))
+        self.conn.execute("""
+            UPDATE word_totals SET students = (
+                SELECT COUNT(*) FROM word_students WHERE word_students.word_id = word_totals.word_id
+            )
+            WHERE word_id IN (SELECT DISTINCT word_id FROM mistake_events WHERE id > ?)
+        """, (last_id,))
+        self.conn.execute("""
+            INSERT INTO daily_counts (day, lesson, mistakes)
+            SELECT day, lesson, COUNT(*) FROM mistake_events WHERE id > ? GROUP BY day, lesson
+            ON CONFLICT (day, lesson) DO UPDATE SET mistakes = mistakes + excluded.mistakes
+        """, (last_id,))
+
+    def ingest_word_mistakes(self, student, word_mistakes):
+        """导入某个学生网页端的 wordMistakes"""
+        return self.ingest(events_from_word_mistakes(student, word_mistakes))
+
+    def rebuild_summaries(self):
+        """从全部事件重新生成汇总表"""
+        with self.conn:
+            self.conn.execute('DELETE FROM word_totals')
+            self.conn.execute('DELETE FROM word_students')
+            self.conn.execute('DELETE FROM daily_counts')
+            self._accumulate(0)
+
+    def top_mistakes(self, lesson=None, limit=10):
+        """错得最多的单词: [{word_id, lesson, kana, meaning, mistakes, students, last_ts}]"""
+        query = 'SELECT word_id, lesson, kana, meaning, mistakes, students, last_ts FROM word_totals'
+        params = []
+        if lesson is not None:
+            query += ' WHERE lesson = ?'
+            params.append(lesson)
+        query += ' ORDER BY mistakes DESC, word_id LIMIT ?'
+        params.append(limit)
+        columns = ['word_id', 'lesson', 'kana', 'meaning', 'mistakes', 'students', 'last_ts']
+        return [dict(zip(columns, row)) for row in self.conn.execute(query, params)]
+
+    def daily_counts(self, lesson=None, start=None, end=None):
+        """每天的错题数: [(日期, 错题数)]，start/end 为 YYYY-MM-DD（含）"""
+        conditions = []
+        params = []
+        if lesson is not None:
+            conditions.append('lesson = ?')
+            params.append(lesson)
+        if start is not None:
+            conditions.append('day >= ?')
+            params.append(start)
+        if end is not None:
+            conditions.append('day <= ?')
+            params.append(end)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+        query = f'SELECT day, SUM(mistakes) FROM daily_counts{where} GROUP BY day ORDER BY day'
+        return [tuple(row) for row in self.conn.execute(query, params)]
+
+    def event_count(self):
+        return self.conn.execute('SELECT COUNT(*) FROM mistake_events').fetchone()[0]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="全班错题统计库")
+    parser.add_argument('--db', default=DB_FILE, help="数据库文件")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = subparsers.add_parser('import', help="导入网页端导出的 wordMistakes JSON")
+    import_parser.add_argument('student', help="学生名")
+    import_parser.add_argument('json_file', help="wordMistakes JSON 文件")
+
+    top_parser = subparsers.add_parser('top', help="错得最多的单词")
+    top_parser.add_argument('--lesson', help="只看某一课")
+    top_parser.add_argument('-n', '--limit', type=int, default=10, help="显示数量")
+
+    daily_parser = subparsers.add_parser('daily', help="每天的错题数")
+    daily_parser.add_argument('--lesson', help="只看某一课")
+
+    subparsers.add_parser('rebuild', help="重新生成汇总表")
+    args = parser.parse_args(argv)
+
+    with MistakeStore(args.db) as store:
+        if args.command == 'import':
+            with open(args.json_file, 'r', encoding='utf-8') as f:
+                word_mistakes = json.load(f)
+            inserted = store.ingest_word_mistakes(args.student, word_mistakes)
+            print(f"已导入 {args.student} 的 {inserted} 条错题记录（库中共 {store.event_count()} 条）")
+        elif args.command == 'top':
+            for i, row in enumerate(store.top_mistakes(args.lesson, args.limit), 1):
+                print(f"{i:>3}. {row['lesson']} {row['kana']} ({row['meaning']}): "
+                      f"错 {row['mistakes']} 次，{row['students']} 人")
+        elif args.command == 'daily':
+            for day, mistakes in store.daily_counts(args.lesson):
+                print(f"{day}: {mistakes}")
+        elif args.command == 'rebuild':
+            store.rebuild_summaries()
+            print("汇总表已重新生成")
+
+if __name__ == "__main__":
+    sys.exit(main())
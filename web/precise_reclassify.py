@@ -1,111 +1,141 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import csv
-import os
 import re
 
+from keyword_matcher import KeywordMatcher
+from lesson_writer import LessonWriteBatch
+from reclassify_manifest import MANIFEST_FILE, ReclassifyManifest, row_hash, rules_version
+from vocabulary_corpus import corpus_write_lock, load_corpus
+
+# 定义每课程的详细分类规则
+LESSON_RULES = {
+    1: {
+        "寒暄语": ["しつれいですが", "はじめまして", "よろしく", "失礼", "初次见面", "请多关照"],
+        "人称代词": ["わたし", "あなた", "あの人", "我", "你", "那个人"],
+        "人物称谓": ["がくせい", "せんせい", "学生", "老师", "教师"],
+        "国籍职业": ["ちゅうごくじん", "にほんじん", "かんこくじん", "アメリカじん", "エンジニア", "中国人", "日本人", "韩国人", "美国人", "工程师"],
+        "基本表达": ["です", "ではありません", "は", "も", "～さん", "～ちゃん", "～くん"],
+        "疑问词": ["だれ", "なん", "谁", "什么"]
+    },
+    2: {
+        "寒暄语": ["どうぞ", "ありがとう", "请", "谢谢"],
+        "指示代词": ["これ", "それ", "あれ", "この", "その", "あの", "这", "那"],
+        "学习用品": ["ほん", "じしょ", "ざっし", "しんぶん", "ノート", "てちょう", "めいし", "カード", "えんぴつ", "ボールペン", "シャープペンシル", "かばん", "书", "词典", "杂志", "报纸", "笔记本", "名片", "铅笔", "圆珠笔", "自动铅笔", "书包"],
+        "电子产品": ["テープ", "テープレコーダー", "テレビ", "ラジオ", "カメラ", "コンピューター", "录音带", "录音机", "电视", "收音机", "照相机", "电脑"],
+        "日用品": ["かぎ", "とけい", "かさ", "钥匙", "钟表", "雨伞"],
+        "食物饮品": ["チョコレート", "コーヒー", "巧克力", "咖啡"]
+    },
+    3: {
+        "场所地点": ["ロビー", "トイレ", "エレベーター", "かいだん", "大厅", "厕所", "电梯", "楼梯"],
+        "方位词": ["こちら", "そちら", "あちら", "どちら", "这边", "那边", "哪边"]
+    },
+    5: {
+        "移动动词": ["いきます", "きます", "かえります", "去", "来", "回家"],
+        "交通工具": ["でんしゃ", "バス", "タクシー", "じてんしゃ", "ひこうき", "ふね", "ちかてつ", "电车", "公车", "出租车", "自行车", "飞机", "船", "地下铁"],
+        "场所地点": ["がっこう", "かいしゃ", "うち", "えき", "ひこうじょう", "デパート", "スーパー", "レストラン", "学校", "公司", "家", "车站", "机场", "百货", "超市", "餐厅"],
+        "国家城市": ["にほん", "ちゅうごく", "かんこく", "アメリカ", "とうきょう", "おおさか", "きょうと", "日本", "中国", "韩国", "美国", "东京", "大阪", "京都"],
+        "时间日期": ["らいしゅう", "らいげつ", "らいねん", "きょう", "あした", "きのう", "下周", "下月", "明年", "今天", "明天", "昨天", "月", "日", "年"]
+    }
+}
+
+# 全局分类规则
+GLOBAL_RULES = {
+    "寒暄语": ["失礼", "请", "谢谢", "对不起", "欢迎", "光临", "不好意思", "打扰", "初次见面", "请多关照", "早上好", "您好", "再见", "晚上好", "どうぞ", "ありがとう", "すみません", "いらっしゃい", "はじめまして", "よろしく"],
+    "数量词": ["ひとつ", "ふたつ", "みっつ", "よっつ", "いつつ", "むっつ", "ななつ", "やっつ", "ここのつ", "とお", "ひとり", "ふたり", "一个", "两个", "三个", "四个", "五个", "六个", "七个", "八个", "九个", "十个", "一人", "二人", "岁"],
+    "时间日期": ["時", "分", "年", "月", "日", "今", "昨", "明", "星期", "时间", "现在", "上午", "下午", "晚上", "～時", "～分", "いちがつ", "にがつ", "さんがつ", "しがつ", "ごがつ", "ろくがつ", "しちがつ", "はちがつ", "くがつ", "じゅうがつ", "じゅういちがつ", "じゅうにがつ"]
+}
+
+# 含有这些释义的词一律归为寒暄语
+GREETING_MEANING_KEYWORDS = ["失礼", "请", "谢谢", "欢迎", "光临", "初次见面", "请多关照"]
+
+# 规则表在导入时编译成自动机，每个词只需扫描一遍
+LESSON_MATCHERS = {lesson_num: KeywordMatcher(rules) for lesson_num, rules in LESSON_RULES.items()}
+GLOBAL_MATCHER = KeywordMatcher(GLOBAL_RULES)
+GREETING_MATCHER = KeywordMatcher({"寒暄语": GREETING_MEANING_KEYWORDS})
+
+# 增量清单中的规则集版本：规则表改动后自动全部重新分类；只改分类逻辑时请递增 RULES_REVISION
+RULES_REVISION = 1
+RULES_VERSION = rules_version(RULES_REVISION, LESSON_RULES, GLOBAL_RULES, GREETING_MEANING_KEYWORDS)
+MANIFEST_RULESET = 'precise_reclassify'
+
 def precise_reclassify():
     """精确重新分类所有词汇"""
     print("开始精确重新分类词汇...")
     
-    # 定义每课程的详细分类规则
-    lesson_rules = {
-        1: {
-            "寒暄语": ["しつれいですが", "はじめまして", "よろしく", "失礼", "初次见面", "请多关照"],
-            "人称代词": ["わたし", "あなた", "あの人", "我", "你", "那个人"],
-            "人物称谓": ["がくせい", "せんせい", "学生", "老师", "教师"],
-            "国籍职业": ["ちゅうごくじん", "にほんじん", "かんこくじん", "アメリカじん", "エンジニア", "中国人", "日本人", "韩国人", "美国人", "工程师"],
-            "基本表达": ["です", "ではありません", "は", "も", "～さん", "～ちゃん", "～くん"],
-            "疑问词": ["だれ", "なん", "谁", "什么"]
-        },
-        2: {
-            "寒暄语": ["どうぞ", "ありがとう", "请", "谢谢"],
-            "指示代词": ["これ", "それ", "あれ", "この", "その", "あの", "这", "那"],
-            "学习用品": ["ほん", "じしょ", "ざっし", "しんぶん", "ノート", "てちょう", "めいし", "カード", "えんぴつ", "ボールペン", "シャープペンシル", "かばん", "书", "词典", "杂志", "报纸", "笔记本", "名片", "铅笔", "圆珠笔", "自动铅笔", "书包"],
-            "电子产品": ["テープ", "テープレコーダー", "テレビ", "ラジオ", "カメラ", "コンピューター", "录音带", "录音机", "电视", "收音机", "照相机", "电脑"],
-            "日用品": ["かぎ", "とけい", "かさ", "钥匙", "钟表", "雨伞"],
-            "食物饮品": ["チョコレート", "コーヒー", "巧克力", "咖啡"]
-        },
-        3: {
-            "场所地点": ["ロビー", "トイレ", "エレベーター", "かいだん", "大厅", "厕所", "电梯", "楼梯"],
-            "方位词": ["こちら", "そちら", "あちら", "どちら", "这边", "那边", "哪边"]
-        },
-        5: {
-            "移动动词": ["いきます", "きます", "かえります", "去", "来", "回家"],
-            "交通工具": ["でんしゃ", "バス", "タクシー", "じてんしゃ", "ひこうき", "ふね", "ちかてつ", "电车", "公车", "出租车", "自行车", "飞机", "船", "地下铁"],
-            "场所地点": ["がっこう", "かいしゃ", "うち", "えき", "ひこうじょう", "デパート", "スーパー", "レストラン", "学校", "公司", "家", "车站", "机场", "百货", "超市", "餐厅"],
-            "国家城市": ["にほん", "ちゅうごく", "かんこく", "アメリカ", "とうきょう", "おおさか", "きょうと", "日本", "中国", "韩国", "美国", "东京", "大阪", "京都"],
-            "时间日期": ["らいしゅう", "らいげつ", "らいねん", "きょう", "あした", "きのう", "下周", "下月", "明年", "今天", "明天", "昨天", "月", "日", "年"]
-        }
-    }
-    
-    # 全局分类规则
-    global_rules = {
-        "寒暄语": ["失礼", "请", "谢谢", "对不起", "欢迎", "光临", "不好意思", "打扰", "初次见面", "请多关照", "早上好", "您好", "再见", "晚上好", "どうぞ", "ありがとう", "すみません", "いらっしゃい", "はじめまして", "よろしく"],
-        "数量词": ["ひとつ", "ふたつ", "みっつ", "よっつ", "いつつ", "むっつ", "ななつ", "やっつ", "ここのつ", "とお", "ひとり", "ふたり", "一个", "两个", "三个", "四个", "五个", "六个", "七个", "八个", "九个", "十个", "一人", "二人", "岁"],
-        "时间日期": ["時", "分", "年", "月", "日", "今", "昨", "明", "星期", "时间", "现在", "上午", "下午", "晚上", "～時", "～分", "いちがつ", "にがつ", "さんがつ", "しがつ", "ごがつ", "ろくがつ", "しちがつ", "はちがつ", "くがつ", "じゅうがつ", "じゅういちがつ", "じゅうにがつ"]
-    }
-    
     updated_count = 0
+    fieldnames = ['课程', '栏目', '假名', '汉字', '释义', '词性']
     
-    for lesson_num in range(1, 26):
-        filename = f"data/vocabulary/lesson_{lesson_num:02d}_vocabulary.csv"
+    # 从读取到写回清单全程持有全部课程文件和清单的写锁，并行运行的其他写者会等待
+    with corpus_write_lock(extra_paths=[MANIFEST_FILE]):
+        corpus = load_corpus()
+        manifest = ReclassifyManifest(MANIFEST_RULESET, RULES_VERSION)
         
-        if not os.path.exists(filename):
-            continue
+        # 所有课程文件一起提交，中途出错时全部保持原样
+        classified = []
+        with LessonWriteBatch() as batch:
+            for lesson_num in corpus.lessons():
+                filename = corpus.path(lesson_num)
             
-        print(f"处理第 {lesson_num} 课...")
-        
-        # 读取现有数据
-        updated_words = []
-        with open(filename, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
+                # 文件自上次分类后没有改动，整课跳过
+                if manifest.is_unchanged(filename):
+                    print(f"第 {lesson_num} 课: 未改动，跳过")
+                    continue
+                
+                print(f"处理第 {lesson_num} 课...")
             
-            for row in reader:
-                kana = row.get('假名', '')
-                kanji = row.get('汉字', '')
-                meaning = row.get('释义', '')
-                word_type = row.get('词性', '')
-                current_category = row.get('栏目', '')
+                # 读取现有数据
+                rows = corpus.lesson_rows(lesson_num)
+                known_rows = manifest.known_rows(filename)
+                updated_words = []
+                skipped_count = 0
+                for row in rows:
+                    # 上次分类输出过、之后没被编辑的行不再重新分类
+                    if row_hash(row, fieldnames) in known_rows:
+                        updated_words.append(row.copy())
+                        skipped_count += 1
+                        continue
                 
-                new_category = current_category  # 默认保持原分类
+                    kana = row.get('假名', '')
+                    kanji = row.get('汉字', '')
+                    meaning = row.get('释义', '')
+                    word_type = row.get('词性', '')
+                    current_category = row.get('栏目', '')
                 
-                # 首先检查该课程的特定规则
-                if lesson_num in lesson_rules:
-                    for category, keywords in lesson_rules[lesson_num].items():
-                        if any(keyword in kana or keyword in kanji or keyword in meaning for keyword in keywords):
-                            new_category = category
-                            break
+                    new_category = current_category  # 默认保持原分类
                 
-                # 然后检查全局规则
-                if new_category == current_category:  # 如果没有找到特定分类
-                    for category, keywords in global_rules.items():
-                        if any(keyword in kana or keyword in kanji or keyword in meaning for keyword in keywords):
-                            new_category = category
-                            break
+                    # 首先检查该课程的特定规则
+                    if lesson_num in LESSON_MATCHERS:
+                        new_category = LESSON_MATCHERS[lesson_num].first_match(kana, kanji, meaning) or new_category
                 
-                # 特殊处理：确保寒暄语被正确分类
-                if word_type == "寒暄语" or any(keyword in meaning for keyword in ["失礼", "请", "谢谢", "欢迎", "光临", "初次见面", "请多关照"]):
-                    new_category = "寒暄语"
+                    # 然后检查全局规则
+                    if new_category == current_category:  # 如果没有找到特定分类
+                        new_category = GLOBAL_MATCHER.first_match(kana, kanji, meaning) or new_category
                 
-                # 更新栏目
-                updated_row = row.copy()
-                updated_row['栏目'] = new_category
+                    # 特殊处理：确保寒暄语被正确分类
+                    if word_type == "寒暄语" or meaning in GREETING_MATCHER:
+                        new_category = "寒暄语"
                 
-                if new_category != current_category:
-                    updated_count += 1
+                    # 更新栏目
+                    updated_row = row.copy()
+                    updated_row['栏目'] = new_category
                 
-                updated_words.append(updated_row)
-        
-        # 写回文件
-        with open(filename, 'w', encoding='utf-8', newline='') as f:
-            fieldnames = ['课程', '栏目', '假名', '汉字', '释义', '词性']
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(updated_words)
+                    if new_category != current_category:
+                        updated_count += 1
+                
+                    updated_words.append(updated_row)
+            
+                # 只有分类结果有变化时才写回文件
+                if updated_words != rows:
+                    batch.write_csv(filename, fieldnames, updated_words)
+                classified.append((filename, updated_words))
+            
+                print(f"第 {lesson_num} 课: {len(updated_words)} 个单词 (未改动 {skipped_count} 个)")
         
-        print(f"第 {lesson_num} 课: {len(updated_words)} 个单词")
+        # 文件替换完成后再记录清单（清单保存的是写回后的文件哈希）
+        for filename, updated_words in classified:
+            manifest.record(filename, updated_words, fieldnames)
+        manifest.save()
     
     print(f"\n精确重新分类完成！共更新了 {updated_count} 个词汇的分类")
 
@@ -115,19 +145,17 @@ def show_sample_results():
     
     sample_lessons = [1, 2, 5]
     
+    corpus = load_corpus()
+    
     for lesson_num in sample_lessons:
-        filename = f"data/vocabulary/lesson_{lesson_num:02d}_vocabulary.csv"
         print(f"\n第 {lesson_num} 课分类示例:")
         
         categories = {}
-        with open(filename, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            
-            for row in reader:
-                category = row.get('栏目', '未分类')
-                if category not in categories:
-                    categories[category] = []
-                categories[category].append(f"{row['假名']}({row['释义']})")
+        for row in corpus.lesson_rows(lesson_num):
+            category = row.get('栏目', '未分类')
+            if category not in categories:
+                categories[category] = []
+            categories[category].append(f"{row['假名']}({row['释义']})")
         
         for category, words in categories.items():
             print(f"  {category}: {len(words)} 个 - {', '.join(words[:3])}{'...' if len(words) > 3 else ''}")
@@ -7,21 +7,22 @@ import csv
 import re
 import os
 
+from kana_romaji import load_converter
+from lesson_index import LESSON_MARKER_PREFIX, find_lesson_markers
+from lesson_writer import LessonWriteBatch, atomic_write
+from word_type_rules import load_word_type_classifier
+from workbook_cache import load_workbook
+
 def load_and_clean_excel():
     """加载并清理 Excel 数据"""
-    df = pd.read_excel('minanonihongo_words.xls')
+    df = load_workbook()
     
     # 重命名列
     df.columns = ['kanji', 'kana', 'meaning', 'romaji', 'accent']
     
-    # 清理数据
-    df = df.dropna(subset=['kanji', 'kana'])  # 移除空行
-    
-    # 找到课程分割线
-    lesson_markers = []
-    for i, row in df.iterrows():
-        if pd.notna(row['kanji']) and str(row['kanji']).startswith('大家日语_'):
-            lesson_markers.append((i, row['kanji']))
+    # 找到课程分割线（分割线行没有假名，要在去掉空行之前找）
+    is_marker = find_lesson_markers(df)
+    lesson_markers = list(zip(df.index[is_marker], df['kanji'][is_marker]))
     
     print("找到的课程分割线:")
     for i, marker in lesson_markers:
@@ -29,114 +30,61 @@ def load_and_clean_excel():
     
     return df, lesson_markers
 
+# 词性规则见 word_type_rules.json 的 "process_words" 规则集，导入时编译一次
+WORD_TYPE_CLASSIFIER = load_word_type_classifier('process_words')
+
 def categorize_word_type(kanji, kana, meaning):
     """根据单词内容判断词性"""
-    kanji_str = str(kanji) if pd.notna(kanji) else ""
-    kana_str = str(kana) if pd.notna(kana) else ""
-    meaning_str = str(meaning) if pd.notna(meaning) else ""
-    
-    # 动词类型判断
-    if (kana_str.endswith('う') or kana_str.endswith('く') or 
-        kana_str.endswith('ぐ') or kana_str.endswith('す') or 
-        kana_str.endswith('つ') or kana_str.endswith('ぬ') or 
-        kana_str.endswith('ぶ') or kana_str.endswith('む') or 
-        kana_str.endswith('る')):
-        
-        # 一型动词（五段动词）
-        if (kana_str.endswith('う') or kana_str.endswith('く') or 
-            kana_str.endswith('ぐ') or kana_str.endswith('す') or 
-            kana_str.endswith('つ') or kana_str.endswith('ぬ') or 
-            kana_str.endswith('ぶ') or kana_str.endswith('む')):
-            return "动词(1型)"
-        
-        # 二型动词（一段动词）
-        elif kana_str.endswith('る'):
-            # 检查る前面是否是い或え
-            if len(kana_str) >= 2:
-                pre_char = kana_str[-2]
-                if pre_char in 'いえきけしせちてにねひへみめりれ':
-                    return "动词(2型)"
-            return "动词(1型)"
-    
-    # 三型动词（不规则动词）
-    if kana_str in ['する', 'くる', 'こくる'] or kana_str.endswith('する'):
-        return "动词(3型)"
-    
-    # 形容词判断
-    if kana_str.endswith('い') and not kana_str.endswith('る'):
-        return "い形容词"
-    
-    if meaning_str and ('的' in meaning_str or '...的' in meaning_str):
-        return "な形容词"
-    
-    # 片假名外来词
-    katakana_chars = 'アイウエオカキクケコサシスセソタチツテトナニヌネノハヒフヘホマミムメモヤユヨラリルレロワヲンガギグゲゴザジズゼゾダヂヅデドバビブベボパピプペポャュョッ'
-    if any(char in katakana_chars for char in kana_str):
-        return "外来词"
-    
-    # 寒暄语
-    if any(greet in meaning_str.lower() for greet in ['早上好', '您好', '再见', '谢谢', '对不起', '请', '欢迎', '打扰', '失礼']):
-        return "寒暄语"
-    
-    # 数词
-    if any(num in kana_str for num in ['いち', 'に', 'さん', 'よん', 'ご', 'ろく', 'なな', 'はち', 'きゅう', 'じゅう']):
-        return "数词"
-    
-    # 时间词
-    if any(time in meaning_str for time in ['时', '分', '点', '年', '月', '日', '星期', '今天', '明天', '昨天']):
-        return "时间词"
-    
-    # 方位词
-    if any(dir in meaning_str for dir in ['上', '下', '左', '右', '前', '后', '里', '外', '东', '西', '南', '北']):
-        return "方位词"
-    
-    # 专有名词（国家、地名等）
-    if any(place in meaning_str for place in ['国', '市', '县', '省', '京', '州']):
-        return "专有名词"
-    
-    return "名词"
+    return WORD_TYPE_CLASSIFIER.classify(kanji, kana, meaning)
 
-def extract_lessons_data(df, lesson_markers):
-    """提取各课程的单词数据"""
-    lessons_data = {}
-    
-    for i, (start_idx, lesson_name) in enumerate(lesson_markers):
+def _clean_text(value):
+    """去掉首尾空白，空值返回空字符串"""
+    return str(value).strip() if pd.notna(value) else ''
+
+def iter_lessons_data(df):
+    """
+    按课程逐个产出 (课程编号, 单词列表)
+    用分割线的累计计数作为课程编号分组，一次只在内存中保留一课的单词
+    """
+    is_marker = find_lesson_markers(df)
+    lesson_ids = is_marker.cumsum()
+    lesson_names = df['kanji'][is_marker].tolist()
+    
+    # 去掉分割线本身、第一条分割线之前的说明行和空行
+    words_df = df[~is_marker & (lesson_ids > 0)].dropna(subset=['kanji', 'kana'])
+    
+    # 工作簿里缺罗马音的行按假名整列补上（与工作簿一样按音节空格分隔）
+    words_df = words_df.assign(romaji=load_converter().fill_missing(words_df['kana'], words_df['romaji']))
+    
+    for lesson_id, group in words_df.groupby(lesson_ids[words_df.index], sort=False):
         # 获取课程编号
-        lesson_num = lesson_name.replace('大家日语_', '')
+        lesson_num = lesson_names[lesson_id - 1].replace(LESSON_MARKER_PREFIX, '')
         
-        # 确定结束位置
-        if i < len(lesson_markers) - 1:
-            end_idx = lesson_markers[i + 1][0]
-        else:
-            end_idx = len(df)
+        rows = list(group.itertuples(index=False))
+        word_types = WORD_TYPE_CLASSIFIER.classify_many(
+            (row.kanji, row.kana, row.meaning) for row in rows
+        )
         
-        # 提取该课程的单词
         lesson_words = []
-        for j in range(start_idx + 1, end_idx):
-            if j < len(df):
-                row = df.iloc[j]
-                if pd.notna(row['kanji']) and pd.notna(row['kana']):
-                    # 跳过课程标题行
-                    if str(row['kanji']).startswith('大家日语_'):
-                        continue
-                    
-                    word_type = categorize_word_type(row['kanji'], row['kana'], row['meaning'])
-                    
-                    word_data = {
-                        'kanji': str(row['kanji']).strip(),
-                        'kana': str(row['kana']).strip(),
-                        'meaning': str(row['meaning']).strip() if pd.notna(row['meaning']) else '',
-                        'romaji': str(row['romaji']).strip() if pd.notna(row['romaji']) else '',
-                        'accent': str(row['accent']).strip() if pd.notna(row['accent']) else '',
-                        'type': word_type
-                    }
-                    lesson_words.append(word_data)
+        for row, word_type in zip(rows, word_types):
+            lesson_words.append({
+                'kanji': str(row.kanji).strip(),
+                'kana': str(row.kana).strip(),
+                'meaning': _clean_text(row.meaning),
+                'romaji': _clean_text(row.romaji),
+                'accent': _clean_text(row.accent),
+                'type': word_type
+            })
         
-        if lesson_words:
-            lessons_data[lesson_num] = lesson_words
-            print(f"课程 {lesson_num}: {len(lesson_words)} 个单词")
-    
-    return lessons_data
+        print(f"课程 {lesson_num}: {len(lesson_words)} 个单词")
+        yield lesson_num, lesson_words
+
+def extract_lessons_data(df, lesson_markers=None):
+    """
+    提取各课程的单词数据
+    课程分割线由 iter_lessons_data 直接从数据中找出，lesson_markers 仅为兼容旧调用保留
+    """
+    return dict(iter_lessons_data(df))
 
 def read_existing_csv(filename):
     """读取现有的 CSV 文件"""
@@ -147,15 +95,24 @@ def read_existing_csv(filename):
     except FileNotFoundError:
         return []
 
-def save_to_csv(lesson_num, words_data):
-    """保存单词数据到 CSV 文件"""
+def save_to_csv(lesson_num, words_data, batch=None):
+    """
+    保存单词数据到 CSV 文件
+    传入 batch（LessonWriteBatch）时随批次一起提交，否则立即原子写入
+    """
     filename = f"data/vocabulary/lesson_{lesson_num.zfill(2)}_vocabulary.csv"
     
     # 确保目录存在
     os.makedirs(os.path.dirname(filename), exist_ok=True)
     
-    # 读取现有数据
+    # 读取现有数据（随批次提交时先加写锁，持有到提交；课程按编号升序处理，加锁顺序与其他写者一致）
+    if batch is not None:
+        batch.lock(filename)
     existing_words = read_existing_csv(filename)
+    if existing_words and 'kana' not in existing_words[0]:
+        # 已是网页端使用的中文表头词汇文件，不能用本脚本的格式覆盖
+        print(f"跳过课程 {lesson_num}: {filename} 已存在且格式不同，不覆盖")
+        return None
     existing_kana = {word['kana'] for word in existing_words}
     
     # 合并新单词
@@ -169,7 +126,7 @@ def save_to_csv(lesson_num, words_data):
     
     # 保存到文件
     fieldnames = ['kana', 'kanji', 'meaning', 'type', 'romaji', 'accent']
-    with open(filename, 'w', encoding='utf-8', newline='') as f:
+    with (batch.open(filename) if batch is not None else atomic_write(filename)) as f:
         writer = csv.DictWriter(f, fieldnames=fieldnames)
         writer.writeheader()
         
@@ -192,24 +149,25 @@ def main():
     # 加载和清理数据
     df, lesson_markers = load_and_clean_excel()
     
-    # 提取各课程数据
-    lessons_data = extract_lessons_data(df, lesson_markers)
+    # 逐课提取并直接保存到 CSV 文件，同时累计统计信息
+    lesson_count = 0
+    total_words = 0
+    type_count = {}
     
-    # 保存到 CSV 文件
-    for lesson_num, words in lessons_data.items():
-        save_to_csv(lesson_num, words)
+    # 所有课程文件一起提交，中途出错时全部保持原样
+    with LessonWriteBatch() as batch:
+        for lesson_num, words in iter_lessons_data(df):
+            save_to_csv(lesson_num, words, batch)
+            
+            lesson_count += 1
+            total_words += len(words)
+            for word in words:
+                word_type = word['type']
+                type_count[word_type] = type_count.get(word_type, 0) + 1
     
     # 生成统计信息
     print("\n统计信息:")
-    total_words = sum(len(words) for words in lessons_data.values())
-    print(f"总共处理了 {len(lessons_data)} 个课程，{total_words} 个单词")
-    
-    # 按词性统计
-    type_count = {}
-    for words in lessons_data.values():
-        for word in words:
-            word_type = word['type']
-            type_count[word_type] = type_count.get(word_type, 0) + 1
+    print(f"总共处理了 {lesson_count} 个课程，{total_words} 个单词")
     
     print("\n词性分布:")
     for word_type, count in sorted(type_count.items()):
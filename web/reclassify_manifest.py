@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+重新分类的增量清单
+记录每个课程文件上次分类后的内容哈希、每一行的哈希以及规则集版本；
+再次运行时只对新增或修改过的行重新分类，内容没有变化的文件不再改写
+"""
+
+import hashlib
+import json
+import os
+
+from lesson_writer import atomic_write
+from vocabulary_corpus import DEFAULT_DATA_DIR
+
+MANIFEST_FILE = os.path.join(DEFAULT_DATA_DIR, '.reclassify_manifest.json')
+MANIFEST_FORMAT = 1
+
+def rules_version(*tables):
+    """根据规则表内容计算规则集版本，规则有任何改动都会得到新的版本号"""
+    payload = json.dumps(tables, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]
+
+def row_hash(row, fieldnames):
+    """按表头顺序计算一行的哈希"""
+    payload = '\x1f'.join(row.get(field) or '' for field in fieldnames)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+def file_hash(path):
+    """计算文件内容的哈希"""
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+class ReclassifyManifest:
+    """某一个分类脚本（规则集）的增量清单"""
+
+    def __init__(self, ruleset, version, path=MANIFEST_FILE):
+        self.ruleset = ruleset
+        self.version = version
+        self.path = path
+        self._data = {'format': MANIFEST_FORMAT, 'rulesets': {}}
+
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('format') == MANIFEST_FORMAT:
+                    self._data = data
+            except (OSError, ValueError) as e:
+                print(f"读取增量清单 {path} 时出错: {e}，将全部重新分类")
+
+        section = self._data['rulesets'].get(ruleset)
+        if not section or section.get('rules_version') != version:
+            # 规则集变化后，之前的记录全部作废
+            section = {'rules_version': version, 'files': {}}
+            self._data['rulesets'][ruleset] = section
+        self._files = section['files']
+
+    def _key(self, filename):
+        return os.path.basename(filename)
+
+    def is_unchanged(self, filename):
+        """文件自上次分类后没有被改动过"""
+        entry = self._files.get(self._key(filename))
+        return bool(entry) and os.path.exists(filename) and entry['sha1'] == file_hash(filename)
+
+    def known_rows(self, filename):
+        """上次分类输出的行哈希集合，命中的行不需要重新分类"""
+        entry = self._files.get(self._key(filename))
+        return set(entry['rows']) if entry else set()
+
+    def record(self, filename, rows, fieldnames):
+        """记录文件分类后的内容"""
+        self._files[self._key(filename)] = {
+            'sha1': file_hash(filename),
+            'rows': [row_hash(row, fieldnames) for row in rows]
+        }
+
+    def save(self):
+        """写回清单文件"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with atomic_write(self.path, newline=None) as f:
+            json.dump(self._data, f, ensure_ascii=False, indent=1)
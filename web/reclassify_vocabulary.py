@@ -1,10 +1,88 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import csv
-import os
 import re
 
+from keyword_matcher import KeywordMatcher
+from lesson_writer import LessonWriteBatch
+from reclassify_manifest import MANIFEST_FILE, ReclassifyManifest, row_hash, rules_version
+from stage_profiler import profiled, stage
+from vocabulary_corpus import corpus_write_lock, load_corpus
+
+# 寒暄语关键词（匹配释义或假名）
+GREETING_KEYWORDS = [
+    '失礼', '请', '谢谢', '对不起', '欢迎', '光临', '不好意思', '打扰',
+    '初次见面', '请多关照', '早上好', '您好', '再见', '晚上好',
+    'どうぞ', 'ありがとう', 'すみません', 'いらっしゃい', 'はじめまして',
+    'よろしく', 'おはよう', 'こんにちは', 'こんばんは', 'さようなら'
+]
+
+# 第五课的月份和日期（只匹配释义）
+MONTH_DAY_KEYWORDS = ['月', '日', '年', '今天', '明天', '昨天', '星期']
+
+# 名词/外来词的物品分类，按顺序取第一个命中的分类
+NOUN_CATEGORY_RULES = {
+    # 学习用品
+    "学习用品": ['本', '辞書', '雑誌', '新聞', 'ノート', '手帳', '名刺', 'カード', 
+              '鉛筆', 'ボールペン', '书', '词典', '杂志', '报纸', '笔记本', 
+              '手册', '名片', '卡片', '铅笔', '圆珠笔', '自动铅笔'],
+    # 电子产品
+    "电子产品": ['テレビ', 'ラジオ', 'カメラ', 'コンピューター', 'ビデオ', 
+              'テープレコーダー', 'テープ', '电视', '收音机', '照相机', 
+              '电脑', '录影机', '录音机', '录音带'],
+    # 食物饮品
+    "食物饮品": ['チョコレート', 'コーヒー', '巧克力', '咖啡', '茶', '水', 
+              '牛奶', '果汁', '啤酒', '酒', '面包', '米饭'],
+    # 服装
+    "服装用品": ['コート', 'スーツ', 'セーター', '大衣', '外套', '西装', 
+              '毛衣', '衣服', '裤子', '鞋子', '帽子'],
+    # 交通工具
+    "交通工具": ['電車', 'バス', 'タクシー', '自転車', '电车', '公车', '巴士', 
+              '出租车', '自行车', '脚踏车', '飞机', '船'],
+    # 场所地点
+    "场所地点": ['学校', '会社', '家', '駅', '飛行場', 'デパート', 'スーパー', 
+              '喫茶店', 'レストラン', '公司', '车站', '机场', '百货', '超市', 
+              '咖啡店', '餐厅', '医院', '银行', '邮局'],
+    # 国家城市
+    "国家城市": ['日本', '中国', '韩国', '美国', '英国', '法国', '德国', 
+              '东京', '大阪', '北京', '上海'],
+    # 人物称谓
+    "人物称谓": ['先生', '教師', '学生', '会社員', '銀行員', '医者', 'エンジニア',
+              '老师', '教师', '学生', '职员', '银行员', '医生', '工程师', '朋友']
+}
+
+# 动词分类
+VERB_CATEGORY_RULES = {
+    # 移动动词
+    "移动动词": ['いきます', 'きます', 'かえります', '行きます', '来ます', '帰ります',
+              '去', '来', '回家', '回去', '出发', '到达'],
+    # 基本动作
+    "基本动作": ['たべます', 'のみます', 'みます', 'ききます', 'よみます',
+              '食べます', '飲みます', '見ます', '聞きます', '読みます',
+              '吃', '喝', '看', '听', '读']
+}
+
+# 时间相关
+TIME_KEYWORDS = ['時', '分', '年', '月', '日', '今', '昨', '明', '星期', 
+                 '时间', '现在', '上午', '下午', '晚上']
+
+# 量词（只匹配释义）
+COUNTER_KEYWORDS = ['个', '只', '本', '张', '岁']
+
+# 关键词表在导入时编译成自动机，分类时每个字段只扫描一遍
+GREETING_MATCHER = KeywordMatcher({"寒暄语": GREETING_KEYWORDS})
+MONTH_DAY_MATCHER = KeywordMatcher({"时间日期": MONTH_DAY_KEYWORDS})
+NOUN_CATEGORY_MATCHER = KeywordMatcher(NOUN_CATEGORY_RULES)
+VERB_CATEGORY_MATCHER = KeywordMatcher(VERB_CATEGORY_RULES)
+TIME_MATCHER = KeywordMatcher({"时间日期": TIME_KEYWORDS})
+COUNTER_MATCHER = KeywordMatcher({"数量词": COUNTER_KEYWORDS})
+
+# 增量清单中的规则集版本：关键词表改动后自动全部重新分类；只改分类逻辑时请递增 RULES_REVISION
+RULES_REVISION = 1
+RULES_VERSION = rules_version(RULES_REVISION, GREETING_KEYWORDS, MONTH_DAY_KEYWORDS, NOUN_CATEGORY_RULES,
+                              VERB_CATEGORY_RULES, TIME_KEYWORDS, COUNTER_KEYWORDS)
+MANIFEST_RULESET = 'reclassify_vocabulary'
+
 def get_detailed_category(lesson_num, kana, kanji, meaning, word_type):
     """根据课程和单词内容确定详细分类"""
     
@@ -13,98 +91,31 @@ def get_detailed_category(lesson_num, kana, kanji, meaning, word_type):
         return "寒暄语"
     
     # 判断是否为寒暄语（更全面的判断）
-    greeting_keywords = [
-        '失礼', '请', '谢谢', '对不起', '欢迎', '光临', '不好意思', '打扰',
-        '初次见面', '请多关照', '早上好', '您好', '再见', '晚上好',
-        'どうぞ', 'ありがとう', 'すみません', 'いらっしゃい', 'はじめまして',
-        'よろしく', 'おはよう', 'こんにちは', 'こんばんは', 'さようなら'
-    ]
-    
-    if any(keyword in meaning or keyword in kana for keyword in greeting_keywords):
+    if GREETING_MATCHER.match_mask(meaning, kana):
         return "寒暄语"
     
     # 第五课特殊处理：月份和日期
-    if lesson_num == 5:
-        month_day_keywords = ['月', '日', '年', '今天', '明天', '昨天', '星期']
-        if any(keyword in meaning for keyword in month_day_keywords):
-            return "时间日期"
+    if lesson_num == 5 and meaning in MONTH_DAY_MATCHER:
+        return "时间日期"
     
     # 物品分类（更详细）
     if word_type == "名词" or word_type == "外来词":
-        # 学习用品
-        study_items = ['本', '辞書', '雑誌', '新聞', 'ノート', '手帳', '名刺', 'カード', 
-                      '鉛筆', 'ボールペン', '书', '词典', '杂志', '报纸', '笔记本', 
-                      '手册', '名片', '卡片', '铅笔', '圆珠笔', '自动铅笔']
-        if any(item in kana or item in kanji or item in meaning for item in study_items):
-            return "学习用品"
-        
-        # 电子产品
-        electronics = ['テレビ', 'ラジオ', 'カメラ', 'コンピューター', 'ビデオ', 
-                      'テープレコーダー', 'テープ', '电视', '收音机', '照相机', 
-                      '电脑', '录影机', '录音机', '录音带']
-        if any(item in kana or item in kanji or item in meaning for item in electronics):
-            return "电子产品"
-        
-        # 食物饮品
-        food_drinks = ['チョコレート', 'コーヒー', '巧克力', '咖啡', '茶', '水', 
-                      '牛奶', '果汁', '啤酒', '酒', '面包', '米饭']
-        if any(item in kana or item in kanji or item in meaning for item in food_drinks):
-            return "食物饮品"
-        
-        # 服装
-        clothing = ['コート', 'スーツ', 'セーター', '大衣', '外套', '西装', 
-                   '毛衣', '衣服', '裤子', '鞋子', '帽子']
-        if any(item in kana or item in kanji or item in meaning for item in clothing):
-            return "服装用品"
-        
-        # 交通工具
-        transport = ['電車', 'バス', 'タクシー', '自転車', '电车', '公车', '巴士', 
-                    '出租车', '自行车', '脚踏车', '飞机', '船']
-        if any(item in kana or item in kanji or item in meaning for item in transport):
-            return "交通工具"
-        
-        # 场所地点
-        places = ['学校', '会社', '家', '駅', '飛行場', 'デパート', 'スーパー', 
-                 '喫茶店', 'レストラン', '公司', '车站', '机场', '百货', '超市', 
-                 '咖啡店', '餐厅', '医院', '银行', '邮局']
-        if any(place in kana or place in kanji or place in meaning for place in places):
-            return "场所地点"
-        
-        # 国家城市
-        countries = ['日本', '中国', '韩国', '美国', '英国', '法国', '德国', 
-                    '东京', '大阪', '北京', '上海']
-        if any(country in kana or country in kanji or country in meaning for country in countries):
-            return "国家城市"
-        
-        # 人物称谓
-        people = ['先生', '教師', '学生', '会社員', '銀行員', '医者', 'エンジニア',
-                 '老师', '教师', '学生', '职员', '银行员', '医生', '工程师', '朋友']
-        if any(person in kana or person in kanji or person in meaning for person in people):
-            return "人物称谓"
+        category = NOUN_CATEGORY_MATCHER.first_match(kana, kanji, meaning)
+        if category:
+            return category
     
     # 动词分类
     if "动词" in word_type:
-        # 移动动词
-        movement_verbs = ['いきます', 'きます', 'かえります', '行きます', '来ます', '帰ります',
-                         '去', '来', '回家', '回去', '出发', '到达']
-        if any(verb in kana or verb in kanji or verb in meaning for verb in movement_verbs):
-            return "移动动词"
-        
-        # 基本动作
-        basic_actions = ['たべます', 'のみます', 'みます', 'ききます', 'よみます',
-                        '食べます', '飲みます', '見ます', '聞きます', '読みます',
-                        '吃', '喝', '看', '听', '读']
-        if any(action in kana or action in kanji or action in meaning for action in basic_actions):
-            return "基本动作"
+        category = VERB_CATEGORY_MATCHER.first_match(kana, kanji, meaning)
+        if category:
+            return category
     
     # 时间相关
-    time_words = ['時', '分', '年', '月', '日', '今', '昨', '明', '星期', 
-                 '时间', '现在', '上午', '下午', '晚上']
-    if any(time_word in kana or time_word in kanji or time_word in meaning for time_word in time_words):
+    if TIME_MATCHER.match_mask(kana, kanji, meaning):
         return "时间日期"
     
     # 数量词
-    if word_type == "数词" or any(num in meaning for num in ['个', '只', '本', '张', '岁']):
+    if word_type == "数词" or meaning in COUNTER_MATCHER:
         return "数量词"
     
     # 形容词
@@ -118,51 +129,77 @@ def get_detailed_category(lesson_num, kana, kanji, meaning, word_type):
     # 其他保持原有分类或使用词性
     return word_type
 
+@profiled('reclassify_vocabulary')
 def reclassify_vocabulary():
     """重新分类所有词汇"""
     print("开始重新分类词汇...")
     
     updated_count = 0
-    
-    for lesson_num in range(1, 26):
-        filename = f"data/vocabulary/lesson_{lesson_num:02d}_vocabulary.csv"
-        
-        if not os.path.exists(filename):
-            continue
-            
-        print(f"处理第 {lesson_num} 课...")
-        
-        # 读取现有数据
-        updated_words = []
-        with open(filename, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
+    fieldnames = ['课程', '栏目', '假名', '汉字', '释义', '词性']
+    
+    # 从读取到写回清单全程持有全部课程文件和清单的写锁，并行运行的其他写者会等待
+    with corpus_write_lock(extra_paths=[MANIFEST_FILE]):
+        with stage('load'):
+            corpus = load_corpus()
+            manifest = ReclassifyManifest(MANIFEST_RULESET, RULES_VERSION)
+        
+        # 所有课程文件一起提交，中途出错时全部保持原样
+        classified = []
+        with LessonWriteBatch() as batch:
+            for lesson_num in corpus.lessons():
+                filename = corpus.path(lesson_num)
             
-            for row in reader:
-                kana = row.get('假名', '')
-                kanji = row.get('汉字', '')
-                meaning = row.get('释义', '')
-                word_type = row.get('词性', '')
-                current_category = row.get('栏目', '')
+                # 文件自上次分类后没有改动，整课跳过
+                if manifest.is_unchanged(filename):
+                    print(f"第 {lesson_num} 课: 未改动，跳过")
+                    continue
                 
-                # 获取新的详细分类
-                new_category = get_detailed_category(lesson_num, kana, kanji, meaning, word_type)
-                
-                # 更新栏目
-                updated_row = row.copy()
-                if new_category != word_type and new_category != current_category:
-                    updated_row['栏目'] = new_category
-                    updated_count += 1
+                print(f"处理第 {lesson_num} 课...")
+            
+                with stage(f'lesson_{lesson_num:02d}'):
+                    # 读取现有数据
+                    rows = corpus.lesson_rows(lesson_num)
+                    known_rows = manifest.known_rows(filename)
+                    updated_words = []
+                    skipped_count = 0
+                    with stage('classify'):
+                        for row in rows:
+                            # 上次分类输出过、之后没被编辑的行不再重新分类
+                            if row_hash(row, fieldnames) in known_rows:
+                                updated_words.append(row.copy())
+                                skipped_count += 1
+                                continue
+                        
+                            kana = row.get('假名', '')
+                            kanji = row.get('汉字', '')
+                            meaning = row.get('释义', '')
+                            word_type = row.get('词性', '')
+                            current_category = row.get('栏目', '')
+                        
+                            # 获取新的详细分类
+                            new_category = get_detailed_category(lesson_num, kana, kanji, meaning, word_type)
+                        
+                            # 更新栏目
+                            updated_row = row.copy()
+                            if new_category != word_type and new_category != current_category:
+                                updated_row['栏目'] = new_category
+                                updated_count += 1
+                        
+                            updated_words.append(updated_row)
                 
-                updated_words.append(updated_row)
-        
-        # 写回文件
-        with open(filename, 'w', encoding='utf-8', newline='') as f:
-            fieldnames = ['课程', '栏目', '假名', '汉字', '释义', '词性']
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(updated_words)
+                    # 只有分类结果有变化时才写回文件
+                    with stage('write'):
+                        if updated_words != rows:
+                            batch.write_csv(filename, fieldnames, updated_words)
+                    classified.append((filename, updated_words))
+            
+                print(f"第 {lesson_num} 课: {len(updated_words)} 个单词 (未改动 {skipped_count} 个)")
         
-        print(f"第 {lesson_num} 课: {len(updated_words)} 个单词")
+        # 文件替换完成后再记录清单（清单保存的是写回后的文件哈希）
+        for filename, updated_words in classified:
+            manifest.record(filename, updated_words, fieldnames)
+        with stage('save_manifest'):
+            manifest.save()
     
     print(f"\n重新分类完成！共更新了 {updated_count} 个词汇的分类")
 
@@ -173,22 +210,16 @@ def generate_category_report():
     category_stats = {}
     lesson_categories = {}
     
-    for lesson_num in range(1, 26):
-        filename = f"data/vocabulary/lesson_{lesson_num:02d}_vocabulary.csv"
-        
-        if not os.path.exists(filename):
-            continue
-        
+    corpus = load_corpus()
+    
+    for lesson_num in corpus.lessons():
         lesson_categories[lesson_num] = {}
         
-        with open(filename, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
+        for row in corpus.lesson_rows(lesson_num):
+            category = row.get('栏目', '未分类')
             
-            for row in reader:
-                category = row.get('栏目', '未分类')
-                
-                category_stats[category] = category_stats.get(category, 0) + 1
-                lesson_categories[lesson_num][category] = lesson_categories[lesson_num].get(category, 0) + 1
+            category_stats[category] = category_stats.get(category, 0) + 1
+            lesson_categories[lesson_num][category] = lesson_categories[lesson_num].get(category, 0) + 1
     
     # 写入报告
     with open('分类统计报告.txt', 'w', encoding='utf-8') as f:
@@ -39,7 +39,10 @@ class RomajiConverter {
             
             // 特殊组合
             'tya': 'ちゃ', 'tyu': 'ちゅ', 'tyo': 'ちょ',
-            'dya': 'ぢゃ', 'dyu': 'ぢゅ', 'dyo': 'ぢょ'
+            'dya': 'ぢゃ', 'dyu': 'ぢゅ', 'dyo': 'ぢょ',
+            
+            // 单独的促音（词尾或元音之前无法用双写表示）
+            'xtsu': 'っ', 'xtu': 'っ', 'ltu': 'っ'
         };
         
         this.katakanaMap = {
@@ -79,11 +82,15 @@ class RomajiConverter {
             
             // 特殊组合
             'tya': 'チャ', 'tyu': 'チュ', 'tyo': 'チョ',
-            'dya': 'ヂャ', 'dyu': 'ヂュ', 'dyo': 'ヂョ'
+            'dya': 'ヂャ', 'dyu': 'ヂュ', 'dyo': 'ヂョ',
+            
+            // 单独的促音（词尾或元音之前无法用双写表示）
+            'xtsu': 'ッ', 'xtu': 'ッ', 'ltu': 'ッ'
         };
         
         // 促音处理规则 - 可以双写形成促音的辅音
-        this.sokuonRules = ['k', 't', 's', 'p', 'c', 'g', 'z', 'd', 'b', 'j', 'f', 'h', 'm', 'n', 'r', 'w', 'y'];
+        // 不含 n：nn 是 ん 加 な行（sannin -> さんにん），不是促音
+        this.sokuonRules = ['k', 't', 's', 'p', 'c', 'g', 'z', 'd', 'b', 'j', 'f', 'h', 'm', 'r', 'w', 'y'];
         
         this.currentInput = '';
         this.currentKanaType = 'hiragana'; // hiragana 或 katakana
@@ -107,8 +114,18 @@ class RomajiConverter {
                 continue;
             }
             
+            // 尝试匹配最长的组合（4字符，xtsu）
+            if (i <= romaji.length - 4) {
+                const four = romaji.substr(i, 4);
+                if (map[four]) {
+                    result += map[four];
+                    i += 4;
+                    found = true;
+                }
+            }
+            
             // 尝试匹配长的组合（3字符）
-            if (i <= romaji.length - 3) {
+            if (!found && i <= romaji.length - 3) {
                 const three = romaji.substr(i, 3);
                 if (map[three]) {
                     result += map[three];
@@ -137,7 +154,7 @@ class RomajiConverter {
                 }
             }
             
-            // 如果都没匹配到，跳过这个字符
+            // 如果都没匹配到，跳过这个字符（包括 n' 中用来分隔 ん 和元音的 '）
             if (!found) {
                 i++;
             }
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+词汇搜索索引
+- 假名、汉字、释义三列按单字和双字 n-gram 建倒排索引，子串查询只需核对最少的候选
+- 假名和罗马音各建一棵前缀树，每个节点直接保存经过它的单词编号，前缀查询只走一遍查询串
+单词编号就是语料库中单词的顺序（与词汇数据包 words 数组的下标一致）
+
+用法: python search_index.py 查询词 [-n 20]
+"""
+
+import argparse
+import sys
+
+from kana_romaji import load_converter
+from vocabulary_corpus import DEFAULT_DATA_DIR, load_corpus
+
+SEARCH_FIELDS = {'kana': '假名', 'kanji': '汉字', 'meaning': '释义'}
+
+def ngrams(text):
+    """单字和双字 n-gram（去重）"""
+    grams = set(text)
+    grams.update(text[i:i + 2] for i in range(len(text) - 1))
+    return grams
+
+class PrefixTrie:
+    """前缀树：每个节点保存所有以该前缀开头的单词编号（按加入顺序）"""
+
+    __slots__ = ('children', 'ids')
+
+    def __init__(self):
+        self.children = {}
+        self.ids = []
+
+    def insert(self, key, doc_id):
+        node = self
+        node.ids.append(doc_id)
+        for char in key:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = PrefixTrie()
+            child.ids.append(doc_id)
+            node = child
+
+    def lookup(self, prefix):
+        node = self
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return node.ids
+
+class SearchIndex:
+    """词汇搜索索引"""
+
+    def __init__(self, entries, romanize=None):
+        """entries: [(课程编号, 行), ...]"""
+        self.entries = list(entries)
+        self.romanize = romanize or load_converter().convert
+        self.texts = {field: [] for field in SEARCH_FIELDS}
+        self.grams = {field: {} for field in SEARCH_FIELDS}
+        self.romaji = []
+        self.kana_trie = PrefixTrie()
+        self.romaji_trie = PrefixTrie()
+
+        for doc_id, (_, row) in enumerate(self.entries):
+            for field, column in SEARCH_FIELDS.items():
+                text = (row.get(column) or '').lower()
+                self.texts[field].append(text)
+                postings = self.grams[field]
+                for gram in ngrams(text):
+                    postings.setdefault(gram, []).append(doc_id)
+
+            kana = row.get('假名') or ''
+            # n' 中的 ' 只用于区分 ん 和 な行，不进索引：kinen 和 kin'en 都能找到 きんえん
+            romaji = self.romanize(kana).lower().replace("'", '')
+            self.romaji.append(romaji)
+            self.kana_trie.insert(kana, doc_id)
+            self.romaji_trie.insert(romaji, doc_id)
+
+    @classmethod
+    def from_corpus(cls, data_dir=DEFAULT_DATA_DIR, romanize=None):
+        return cls(load_corpus(data_dir).find(), romanize)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def substring(self, query, fields=None, limit=None):
+        """在指定列（默认三列）中做子串查询，返回单词编号（升序）"""
+        query = query.lower()
+        if not query:
+            return []
+        found = set()
+        for field in fields or SEARCH_FIELDS:
+            postings = self.grams[field]
+            keys = ngrams(query) if len(query) <= 2 else [query[i:i + 2] for i in range(len(query) - 1)]
+            candidates = min((postings.get(gram, ()) for gram in keys), key=len)
+            if len(query) <= 2:
+                found.update(candidates)
+                continue
+            texts = self.texts[field]
+            found.update(doc_id for doc_id in candidates if query in texts[doc_id])
+        result = sorted(found)
+        return result[:limit] if limit else result
+
+    def prefix(self, query, limit=None):
+        """假名或罗马音前缀查询，返回单词编号（按加入顺序）"""
+        query = query.strip()
+        if query.isascii():
+            ids = self.romaji_trie.lookup(query.lower().replace("'", ''))
+        else:
+            ids = self.kana_trie.lookup(query)
+        return ids[:limit] if limit else list(ids)
+
+    def search(self, query, limit=50):
+        """
+        综合查询：罗马音输入按前缀匹配读音，并在释义中做子串匹配；
+        其他输入按假名前缀 + 三列子串匹配。前缀命中排在前面
+        """
+        query = query.strip()
+        if not query:
+            return []
+        ranked = list(self.prefix(query, limit))
+        seen = set(ranked)
+        fields = ['meaning'] if query.isascii() else None
+        for doc_id in self.substring(query, fields):
+            if len(ranked) >= limit:
+                break
+            if doc_id not in seen:
+                ranked.append(doc_id)
+                seen.add(doc_id)
+        return ranked[:limit]
+
+    def rows(self, doc_ids):
+        return [self.entries[doc_id] for doc_id in doc_ids]
+
+    def export(self):
+        """
+        供词汇数据包使用的紧凑索引：双字 n-gram 倒排表（三列合并）和按罗马音排序的单词编号
+        单字倒排表体积大且收益小，不导出（网页端单字查询直接扫描）
+        """
+        grams = {}
+        for postings in self.grams.values():
+            for gram, ids in postings.items():
+                if len(gram) == 2:
+                    grams.setdefault(gram, set()).update(ids)
+        return {
+            'grams': {gram: sorted(ids) for gram, ids in sorted(grams.items())},
+            'romaji': self.romaji,
+            'romajiOrder': sorted(range(len(self.romaji)), key=lambda doc_id: (self.romaji[doc_id], doc_id))
+        }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="搜索词汇（假名/汉字/释义子串，假名或罗马音前缀）")
+    parser.add_argument('query', help="查询词")
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help="课程词汇目录")
+    parser.add_argument('-n', '--limit', type=int, default=20, help="最多显示的结果数")
+    args = parser.parse_args(argv)
+
+    index = SearchIndex.from_corpus(args.data_dir)
+    for lesson_num, row in index.rows(index.search(args.query, args.limit)):
+        print(f"第{lesson_num}课 {row.get('假名')} {row.get('汉字')} {row.get('释义')} [{row.get('词性')}]")
+
+if __name__ == "__main__":
+    sys.exit(main())
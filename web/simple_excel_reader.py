@@ -4,9 +4,11 @@
 import pandas as pd
 import os
 
+from workbook_cache import load_workbook
+
 def main():
     # 读取 Excel 文件
-    df = pd.read_excel('minanonihongo_words.xls')
+    df = load_workbook()
     
     # 输出到文本文件以便查看
     with open('excel_content.txt', 'w', encoding='utf-8') as f:
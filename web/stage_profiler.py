@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流程阶段性能分析
+设置环境变量 RECITEKING_PROFILE 后，记录每个阶段（读取 xls、分类、合并、写回……）的
+墙钟时间、CPU 时间和 tracemalloc 内存峰值，进程退出时写出报告：
+- RECITEKING_PROFILE=1            报告写到当前目录的 stage_profile.json
+- RECITEKING_PROFILE=路径.json    报告写到指定文件
+同时生成 <报告>.folded（折叠栈格式，每行“阶段;子阶段 自身微秒数”），
+可直接交给 flamegraph.pl 或 speedscope 画火焰图
+
+没有设置环境变量时 stage() 返回同一个空上下文、profiled() 原样返回函数，不产生任何开销
+注意：进程池中的子进程不会写报告，分析时请用单进程运行（如 clean_vocabulary.py -j 1）
+
+用法:
+  with stage('读取 xls'):
+      df = load_workbook()
+
+  @profiled('merge_vocabulary')
+  def process_excel_data(): ...
+"""
+
+import atexit
+import contextlib
+import functools
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+ENV_VAR = 'RECITEKING_PROFILE'
+DEFAULT_REPORT_FILE = 'stage_profile.json'
+REPORT_FORMAT = 1
+STACK_SEPARATOR = ';'
+
+def report_path_from_env(value=None):
+    """环境变量对应的报告路径；未开启时返回 None"""
+    value = os.environ.get(ENV_VAR, '') if value is None else value
+    value = value.strip()
+    if value.lower() in ('', '0', 'false', 'no', 'off'):
+        return None
+    if value.lower() in ('1', 'true', 'yes', 'on'):
+        return DEFAULT_REPORT_FILE
+    return value
+
+class StageStats:
+    """某个阶段（按完整路径区分）的累计数据"""
+
+    __slots__ = ('calls', 'wall', 'cpu', 'child_wall', 'peak_memory')
+
+    def __init__(self):
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.child_wall = 0.0
+        self.peak_memory = 0
+
+class StageProfiler:
+    """
+    嵌套阶段计时器
+    tracemalloc 的峰值是全局的：进入子阶段前先把当前峰值记到父阶段，
+    子阶段结束后再把子阶段的峰值并入父阶段，这样每一层的峰值都不会被子阶段重置掉
+    """
+
+    def __init__(self, report_path):
+        self.report_path = report_path
+        self.stats = {}
+        self._stack = []
+        self._started = time.strftime('%Y-%m-%d %H:%M:%S')
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        parent = self._stack[-1] if self._stack else None
+        if parent is not None:
+            parent['peak'] = max(parent['peak'], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+
+        path = (parent['path'] if parent else ()) + (str(name),)
+        stats = self.stats.get(path)
+        if stats is None:
+            # 进入时就登记，报告中父阶段排在子阶段前面
+            stats = self.stats[path] = StageStats()
+        frame = {'path': path, 'base': tracemalloc.get_traced_memory()[0], 'peak': 0}
+        self._stack.append(frame)
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+            self._stack.pop()
+
+            stats.calls += 1
+            stats.wall += wall
+            stats.cpu += cpu
+            stats.peak_memory = max(stats.peak_memory, peak - frame['base'])
+
+            if parent is not None:
+                parent['peak'] = max(parent['peak'], peak)
+                self.stats[parent['path']].child_wall += wall
+            tracemalloc.reset_peak()
+
+    def report(self):
+        """报告内容：每个阶段一条记录（按首次进入的顺序）"""
+        stages = []
+        for path, stats in self.stats.items():
+            stages.append({
+                'stage': STACK_SEPARATOR.join(path),
+                'depth': len(path) - 1,
+                'calls': stats.calls,
+                'wall_seconds': round(stats.wall, 6),
+                'cpu_seconds': round(stats.cpu, 6),
+                'self_wall_seconds': round(max(stats.wall - stats.child_wall, 0.0), 6),
+                'peak_memory_kb': round(stats.peak_memory / 1024, 1)
+            })
+        return {
+            'format': REPORT_FORMAT,
+            'command': ' '.join(sys.argv),
+            'started': self._started,
+            'stages': stages
+        }
+
+    def folded_lines(self):
+        """折叠栈格式：自身耗时（微秒），火焰图按路径自动叠加出总耗时"""
+        lines = []
+        for path, stats in self.stats.items():
+            self_wall = max(stats.wall - stats.child_wall, 0.0)
+            micros = int(round(self_wall * 1e6))
+            if micros > 0:
+                # 折叠栈中空格和分号有特殊含义
+                frames = [name.replace(STACK_SEPARATOR, '_').replace(' ', '_') for name in path]
+                lines.append(f"{STACK_SEPARATOR.join(frames)} {micros}")
+        return lines
+
+    def write_report(self, path=None):
+        """写出 JSON 报告和 .folded 文件，返回 JSON 报告路径"""
+        path = path or self.report_path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        with open(os.path.splitext(path)[0] + '.folded', 'w', encoding='utf-8') as f:
+            f.write('\n'.join(self.folded_lines()) + '\n')
+        return path
+
+    def print_summary(self, file=None):
+        file = file or sys.stderr
+        print("\n阶段耗时（墙钟 / CPU / 内存峰值）:", file=file)
+        for item in self.report()['stages']:
+            name = '  ' * item['depth'] + item['stage'].rsplit(STACK_SEPARATOR, 1)[-1]
+            print(f"  {name:<40} {item['wall_seconds'] * 1000:10.1f} ms {item['cpu_seconds'] * 1000:10.1f} ms "
+                  f"{item['peak_memory_kb']:10.1f} KB  x{item['calls']}", file=file)
+
+    def _finish(self):
+        if not self.stats:
+            return
+        path = self.write_report()
+        self.print_summary()
+        print(f"性能分析报告已写入 {path}", file=sys.stderr)
+
+def _is_child_process():
+    """multiprocessing 启动的子进程（spawn 方式下子进程会重新导入本模块，也会读到环境变量）"""
+    import multiprocessing
+    return multiprocessing.parent_process() is not None
+
+_REPORT_PATH = report_path_from_env()
+# 只在主进程中记录和写报告，进程池中的子进程不会覆盖主进程的报告
+PROFILER = StageProfiler(_REPORT_PATH) if _REPORT_PATH and not _is_child_process() else None
+ENABLED = PROFILER is not None
+
+if ENABLED:
+    atexit.register(PROFILER._finish)
+
+_NULL_STAGE = contextlib.nullcontext()
+
+def stage(name):
+    """阶段上下文；未开启性能分析时返回同一个空上下文"""
+    if PROFILER is None:
+        return _NULL_STAGE
+    return PROFILER.stage(name)
+
+def profiled(name=None):
+    """把整个函数记为一个阶段（默认用函数名）；未开启时原样返回函数"""
+    def decorator(func):
+        if PROFILER is None:
+            return func
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with PROFILER.stage(stage_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,4 +1,6 @@
 const CACHE_NAME = 'kana-study-v8-new-features';
+// 词汇数据包（由 build_vocabulary_bundle.py 生成并自动改写，文件名带内容哈希）
+const VOCABULARY_BUNDLE = './data/vocabulary_bundle.8d167300a1.json';
 const urlsToCache = [
   './',
   './index.html',
@@ -14,7 +16,8 @@ const urlsToCache = [
   './word-typing.js',
   './vocabulary-browser.js',
   './romaji-converter.js',
-  './manifest.json'
+  './manifest.json',
+  VOCABULARY_BUNDLE
 ];
 
 self.addEventListener('install', function(event) {
@@ -6,6 +6,8 @@ class VocabularyDataManager {
         this.isLoading = false;
         this.loadedLessons = new Set();
         this.isInitialized = false; // 添加初始化标志
+        this.bundleWords = []; // 数据包中的全部单词（下标即搜索索引中的单词编号）
+        this.searchIndex = null; // 数据包附带的搜索索引
         
         this.initializeManager();
     }
@@ -25,6 +27,11 @@ class VocabularyDataManager {
 
     // 加载词汇索引文件
     async loadVocabularyIndex() {
+        // 优先使用预编译的词汇数据包，一次请求拿到所有课程
+        if (await this.loadVocabularyBundle()) {
+            return;
+        }
+
         try {
             console.log('尝试加载词汇索引文件...');
             // 直接尝试当前目录下的data路径
@@ -46,6 +53,123 @@ class VocabularyDataManager {
         }
     }
 
+    // 加载词汇数据包（由 build_vocabulary_bundle.py 生成），失败时返回 false，改为逐个加载 CSV
+    async loadVocabularyBundle() {
+        try {
+            const pointer = await fetch('data/vocabulary_bundle.json', { cache: 'no-cache' });
+            if (!pointer.ok) {
+                return false;
+            }
+            const { file } = await pointer.json();
+            const response = await fetch(`data/${file}`);
+            if (!response.ok) {
+                return false;
+            }
+            this.applyVocabularyBundle(await response.json());
+            console.log('词汇数据包加载完成:', this.categoryData.size, '个课程');
+            return this.categoryData.size > 0;
+        } catch (error) {
+            console.log('词汇数据包不可用，改为加载 CSV 文件:', error);
+            return false;
+        }
+    }
+
+    // 展开数据包：栏目、词性、课程名按编号还原，单词按每课的起始位置切分
+    applyVocabularyBundle(bundle) {
+        const { categories, wordTypes, lessonNames, lessons, words } = bundle;
+        // 罗马音由 kana_romaji.py 在生成数据包时转换好（处理拗音、促音和长音）
+        const romajiList = bundle.search ? bundle.search.romaji : null;
+        // 可接受的答案由 answer_normalizer.py 预先规范化（多个读音、片假名折叠、长音、罗马音写法）
+        const answerList = bundle.answers || null;
+        this.bundleWords = [];
+
+        for (const [lessonName, filename, offset, count, categoryCodes] of lessons) {
+            const lessonWords = words.slice(offset, offset + count).map(([kana, kanji, meaning, category, wordType, lesson], i) => ({
+                lesson: lessonNames[lesson],
+                category: categories[category],
+                kana: kana,
+                kanji: kanji,
+                meaning: meaning,
+                wordType: wordTypes[wordType],
+                romaji: romajiList ? romajiList[offset + i] : this.kanaToRomaji(kana),
+                answers: answerList ? answerList[offset + i] : null
+            }));
+
+            this.categoryData.set(lessonName, {
+                filename: filename,
+                wordCount: count,
+                categories: categoryCodes.map(code => categories[code])
+            });
+            this.vocabularyData.set(lessonName, lessonWords);
+            this.loadedLessons.add(lessonName);
+            this.bundleWords.push(...lessonWords);
+        }
+
+        this.searchIndex = bundle.search || null;
+    }
+
+    // 搜索单词：罗马音按读音前缀匹配，其他输入在假名/汉字/释义中做子串匹配（需要数据包中的搜索索引）
+    searchWords(query, limit = 50) {
+        const q = query.trim().toLowerCase();
+        if (!q || !this.searchIndex) {
+            return [];
+        }
+
+        const { grams, romaji, romajiOrder } = this.searchIndex;
+        const ids = [];
+        const seen = new Set();
+        const add = (id) => {
+            if (!seen.has(id) && ids.length < limit) {
+                seen.add(id);
+                ids.push(id);
+            }
+        };
+
+        // 罗马音前缀：在按罗马音排序的编号上二分查找起点（索引中的罗马音不含 n' 的 '，查询也去掉）
+        const isRomaji = /^[\x00-\x7f]+$/.test(q);
+        if (isRomaji) {
+            const key = q.replace(/'/g, '');
+            let low = 0;
+            let high = romajiOrder.length;
+            while (low < high) {
+                const mid = (low + high) >> 1;
+                if (romaji[romajiOrder[mid]] < key) {
+                    low = mid + 1;
+                } else {
+                    high = mid;
+                }
+            }
+            for (let i = low; i < romajiOrder.length && romaji[romajiOrder[i]].startsWith(key) && ids.length < limit; i++) {
+                add(romajiOrder[i]);
+            }
+        }
+
+        // 子串：取最短的双字倒排表作为候选，再逐个核对（单字查询直接扫描全部单词）
+        let candidates = null;
+        if (q.length === 1) {
+            candidates = this.bundleWords.keys();
+        } else {
+            for (let i = 0; i < q.length - 1; i++) {
+                const postings = grams[q.slice(i, i + 2)] || [];
+                if (candidates === null || postings.length < candidates.length) {
+                    candidates = postings;
+                }
+            }
+        }
+        for (const id of candidates) {
+            if (ids.length >= limit) {
+                break;
+            }
+            const word = this.bundleWords[id];
+            const texts = isRomaji ? [word.meaning] : [word.kana, word.kanji, word.meaning];
+            if (texts.some(text => text.toLowerCase().includes(q))) {
+                add(id);
+            }
+        }
+
+        return ids.map(id => this.bundleWords[id]);
+    }
+
     // 解析词汇索引
     parseVocabularyIndex(text) {
         const lines = text.trim().split('\n');
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+词汇语料库加载器 - 一次读取全部课程 CSV，供各分析脚本共享
+按课程、栏目、词性、假名建立内存索引，避免每个脚本反复解析同一批文件
+读取时持有全部课程文件的读锁，分析脚本之间可以并行，但不会读到写者提交了一半的结果
+"""
+
+import csv
+import glob
+import os
+import re
+from collections import defaultdict
+
+from lesson_lock import read_lock, write_lock
+
+DEFAULT_DATA_DIR = os.path.join('data', 'vocabulary')
+LESSON_FILE_PATTERN = 'lesson_*_vocabulary.csv'
+VOCABULARY_FIELDNAMES = ['课程', '栏目', '假名', '汉字', '释义', '词性']
+
+_LESSON_FILE_RE = re.compile(r'lesson_(\d+)_vocabulary\.csv$')
+
+# 已加载的语料库缓存: data_dir -> (文件签名, VocabularyCorpus)
+_corpus_cache = {}
+
+def lesson_filename(lesson_num, data_dir=DEFAULT_DATA_DIR):
+    """返回某一课词汇文件的路径"""
+    return os.path.join(data_dir, f"lesson_{lesson_num:02d}_vocabulary.csv")
+
+def discover_lesson_files(data_dir=DEFAULT_DATA_DIR):
+    """按课程编号顺序列出目录下所有 lesson_XX_vocabulary.csv"""
+    lesson_files = []
+    for path in glob.glob(os.path.join(data_dir, LESSON_FILE_PATTERN)):
+        match = _LESSON_FILE_RE.search(os.path.basename(path))
+        if match:
+            lesson_files.append((int(match.group(1)), path))
+    lesson_files.sort()
+    return lesson_files
+
+class VocabularyCorpus:
+    """内存中的词汇语料库，可按课程、栏目、词性、假名查询"""
+
+    def __init__(self, data_dir=DEFAULT_DATA_DIR):
+        self.data_dir = data_dir
+        self._paths = {}
+        self._fieldnames = {}
+        self._by_lesson = {}
+        self._by_category = defaultdict(list)
+        self._by_word_type = defaultdict(list)
+        self._by_kana = defaultdict(list)
+        self._entries = []
+
+    def add_lesson(self, lesson_num, path, fieldnames, rows):
+        """登记一课的全部行，并更新各项索引"""
+        self._paths[lesson_num] = path
+        self._fieldnames[lesson_num] = list(fieldnames or VOCABULARY_FIELDNAMES)
+        entries = [(lesson_num, row) for row in rows]
+        self._by_lesson[lesson_num] = entries
+        self._entries.extend(entries)
+
+        for entry in entries:
+            row = entry[1]
+            self._by_category[row.get('栏目')].append(entry)
+            self._by_word_type[row.get('词性')].append(entry)
+            self._by_kana[row.get('假名')].append(entry)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lessons(self):
+        """已加载的课程编号（升序）"""
+        return sorted(self._by_lesson)
+
+    def path(self, lesson_num):
+        """某一课对应的 CSV 文件路径"""
+        return self._paths.get(lesson_num, lesson_filename(lesson_num, self.data_dir))
+
+    def fieldnames(self, lesson_num):
+        """某一课 CSV 的表头"""
+        return self._fieldnames.get(lesson_num, list(VOCABULARY_FIELDNAMES))
+
+    def lesson_rows(self, lesson_num):
+        """某一课的全部行（按文件顺序）"""
+        return [row for _, row in self._by_lesson.get(lesson_num, [])]
+
+    def find(self, lesson=None, category=None, word_type=None, kana=None):
+        """
+        按条件查询词汇，返回 (课程编号, 行) 列表，保持语料库原有顺序
+        未指定的条件不参与过滤
+        """
+        candidates = []
+        if lesson is not None:
+            candidates.append(self._by_lesson.get(lesson, []))
+        if category is not None:
+            candidates.append(self._by_category.get(category, []))
+        if word_type is not None:
+            candidates.append(self._by_word_type.get(word_type, []))
+        if kana is not None:
+            candidates.append(self._by_kana.get(kana, []))
+
+        if not candidates:
+            return list(self._entries)
+
+        # 从最小的索引开始过滤
+        entries = min(candidates, key=len)
+        return [
+            (lesson_num, row) for lesson_num, row in entries
+            if (lesson is None or lesson_num == lesson)
+            and (category is None or row.get('栏目') == category)
+            and (word_type is None or row.get('词性') == word_type)
+            and (kana is None or row.get('假名') == kana)
+        ]
+
+    def counts(self, field, lesson=None, default=None):
+        """统计某一列各取值的数量，缺失该列的行计入 default"""
+        stats = defaultdict(int)
+        entries = self._by_lesson.get(lesson, []) if lesson is not None else self._entries
+        for _, row in entries:
+            stats[row.get(field, default)] += 1
+        return dict(stats)
+
+def corpus_write_lock(data_dir=DEFAULT_DATA_DIR, extra_paths=()):
+    """
+    对目录下全部课程文件（以及 extra_paths，如增量清单）加写锁
+    读-改-写整套语料库的脚本在 load_corpus 之前加锁，一直持有到写回完成
+    """
+    paths = [path for _, path in discover_lesson_files(data_dir)]
+    return write_lock(paths + list(extra_paths))
+
+def _directory_signature(lesson_files):
+    """用文件大小和修改时间判断缓存是否仍然有效"""
+    signature = []
+    for lesson_num, path in lesson_files:
+        stat = os.stat(path)
+        signature.append((lesson_num, path, stat.st_size, stat.st_mtime_ns))
+    return tuple(signature)
+
+def load_corpus(data_dir=DEFAULT_DATA_DIR, reload=False, lock_timeout=None):
+    """
+    加载词汇语料库
+    同一进程内重复调用会直接返回缓存；任何课程文件被改写后自动重新加载
+    lock_timeout: 等待写者释放课程文件的最长秒数，超时抛出 LessonLockTimeout；None 表示一直等待
+    """
+    lesson_files = discover_lesson_files(data_dir)
+    signature = _directory_signature(lesson_files)
+
+    cached = _corpus_cache.get(data_dir)
+    if cached and cached[0] == signature and not reload:
+        return cached[1]
+
+    corpus = VocabularyCorpus(data_dir)
+    with read_lock([path for _, path in lesson_files], timeout=lock_timeout):
+        # 等锁期间文件可能已被写者替换，加锁后重新取签名
+        signature = _directory_signature(lesson_files)
+        for lesson_num, path in lesson_files:
+            with open(path, 'r', encoding='utf-8') as f:
+                reader = csv.DictReader(f)
+                rows = list(reader)
+                corpus.add_lesson(lesson_num, path, reader.fieldnames, rows)
+
+    _corpus_cache[data_dir] = (signature, corpus)
+    return corpus
@@ -0,0 +1,567 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地词汇服务器 - 代替 python -m http.server
+启动时一次读入全部课程 CSV，以 JSON 接口提供课程列表、按课程/栏目/词性查询单词以及错题同步；
+同时提供网页静态文件。响应缓存在内存中（接口响应按最近使用保留有限条数），支持 ETag/If-None-Match 和 gzip
+读取课程文件、写错题记录、查询错题统计库都在后台线程中进行，事件循环只负责解析请求和发送响应；
+课程文件正被其他脚本改写（持有写锁）时，继续用已加载的数据响应
+
+用法: python vocabulary_server.py [--host 0.0.0.0] [--port 8080]
+
+接口:
+  GET  /api/lessons                                课程列表
+  GET  /api/words?lesson=1&category=..&wordType=..  单词（条件可任意组合）
+  GET  /api/categories?lesson=1                    栏目及单词数
+  GET  /api/search?q=gak&limit=50                  搜索（罗马音/假名前缀，假名/汉字/释义子串）
+  GET  /api/mistakes?student=..                    该学生已同步的错题记录
+  POST /api/mistakes?student=..                    上传 wordMistakes，与该学生的服务器记录合并，并写入全班错题统计库
+错题记录按学生分开保存，不带 student 参数时记在 anonymous 名下
+  GET  /api/mistakes/top?lesson=第一课&limit=10     全班错得最多的单词
+  GET  /api/mistakes/daily?lesson=第一课            全班每天的错题数
+"""
+
+import argparse
+import asyncio
+import csv
+import functools
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from lesson_writer import atomic_write
+from mistake_store import DB_FILE, DEFAULT_STUDENT, MistakeStore, parse_timestamp
+from search_index import SearchIndex
+from vocabulary_corpus import DEFAULT_DATA_DIR, load_corpus
+
+WEB_ROOT = os.path.dirname(os.path.abspath(__file__))
+INDEX_FILE_NAME = 'vocabulary_index.csv'
+MISTAKES_FILE = os.path.join('data', 'mistakes.json')
+# mistakes.json 的格式：{"format": 2, "students": {学生: {单词ID: 记录}}}；旧版直接是 {单词ID: 记录}
+MISTAKES_FORMAT = 2
+MAX_STUDENT_LENGTH = 64
+
+RELOAD_INTERVAL = 2.0           # 检查课程文件是否改动的最短间隔（秒）
+RELOAD_LOCK_TIMEOUT = 5.0       # 重新加载时等待写者释放课程文件的最长时间（秒），超时下次再试
+GZIP_MIN_SIZE = 512
+MAX_BODY_SIZE = 4 * 1024 * 1024
+KEEP_ALIVE_TIMEOUT = 15
+MAX_CACHED_RESPONSES = 512     # 接口响应缓存的条数上限，查询参数各不相同时不会无限增长
+
+# 不作为静态文件提供：错题记录和统计库只能通过接口访问，锁文件、临时文件、批次日志、缓存也不对外
+PRIVATE_NAMES = ('mistakes.json',)
+PRIVATE_SUFFIXES = ('.db', '.db-wal', '.db-shm', '.db-journal', '.lock', '.tmp', '.journal', '.pkl')
+
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'application/manifest+json', 'image/svg+xml')
+STATUS_TEXT = {
+    200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+    405: 'Method Not Allowed', 413: 'Payload Too Large', 500: 'Internal Server Error'
+}
+
+class CachedResponse:
+    """一个响应体及其 ETag 和 gzip 压缩版本"""
+
+    __slots__ = ('body', 'content_type', 'etag', 'gzip_body')
+
+    def __init__(self, body, content_type):
+        self.body = body
+        self.content_type = content_type
+        self.etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        self.gzip_body = None
+        if len(body) >= GZIP_MIN_SIZE and content_type.startswith(COMPRESSIBLE_TYPES):
+            compressed = gzip.compress(body, compresslevel=6, mtime=0)
+            if len(compressed) < len(body):
+                self.gzip_body = compressed
+
+class ResponseCache:
+    """接口响应缓存：按查询保存，超过 max_size 条时丢弃最久没用到的"""
+
+    def __init__(self, max_size=MAX_CACHED_RESPONSES):
+        self.max_size = max_size
+        self._items = OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        response = self._items.get(key)
+        if response is not None:
+            self._items.move_to_end(key)
+        return response
+
+    def put(self, key, response):
+        self._items[key] = response
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+        return response
+
+    def discard(self, key):
+        self._items.pop(key, None)
+
+    def discard_group(self, group):
+        """丢弃 key 为 (group, ...) 的全部响应"""
+        for key in [key for key in self._items if isinstance(key, tuple) and key[0] == group]:
+            del self._items[key]
+
+    def clear(self):
+        self._items.clear()
+
+def json_response(data):
+    body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return CachedResponse(body, 'application/json; charset=utf-8')
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match 是否包含当前 ETag（忽略弱校验前缀 W/）"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in tags or any((tag[2:] if tag.startswith('W/') else tag) == etag for tag in tags)
+
+def word_record(lesson_num, row):
+    """与 vocabulary-manager.js 中的单词对象字段一致"""
+    return {
+        'lessonNum': lesson_num,
+        'lesson': row.get('课程', ''),
+        'category': row.get('栏目', ''),
+        'kana': row.get('假名', ''),
+        'kanji': row.get('汉字', ''),
+        'meaning': row.get('释义', ''),
+        'wordType': row.get('词性', '')
+    }
+
+def mistake_record_error(record):
+    """检查一条上传的错题记录的字段类型（与 mistake-tracker.js 的记录一致），有问题时返回说明，否则返回 None"""
+    if not isinstance(record, dict):
+        return '记录应为对象'
+    count = record.get('count', 0)
+    if not isinstance(count, int) or isinstance(count, bool) or count < 0:
+        return 'count 应为非负整数'
+    dates = record.get('dates', [])
+    if not isinstance(dates, list) or not all(isinstance(date, str) for date in dates):
+        return 'dates 应为字符串列表'
+    word = record.get('word', {})
+    if not isinstance(word, dict) or not all(isinstance(word.get(key, ''), str) for key in ('lesson', 'kana', 'meaning')):
+        return 'word 应为对象，lesson、kana、meaning 为字符串'
+    types = record.get('types', [])
+    if not isinstance(types, list):
+        return 'types 应为列表'
+    for entry in types:
+        if not isinstance(entry, dict) or not isinstance(entry.get('type', ''), str):
+            return 'types 中的每一项应为 {type, date, timestamp} 对象'
+        if parse_timestamp(entry.get('timestamp', entry.get('date'))) is None:
+            return 'types 中的 timestamp 应为 ISO 8601 时间字符串'
+    return None
+
+def merge_mistakes(stored, incoming):
+    """合并错题记录：同一单词取错误次数多的一份，日期取并集"""
+    changed = False
+    for word_id, record in incoming.items():
+        if not isinstance(record, dict):
+            continue
+        current = stored.get(word_id)
+        if current is None or record.get('count', 0) > current.get('count', 0):
+            merged = dict(record)
+            if current:
+                merged['dates'] = sorted(set(current.get('dates', [])) | set(record.get('dates', [])))
+            stored[word_id] = merged
+            changed = True
+        else:
+            dates = set(current.get('dates', []))
+            new_dates = dates | set(record.get('dates', []))
+            if new_dates != dates:
+                current['dates'] = sorted(new_dates)
+                changed = True
+    return changed
+
+class VocabularyApi:
+    """JSON 接口：数据常驻内存，同一查询的响应只生成一次"""
+
+    def __init__(self, data_dir=DEFAULT_DATA_DIR, mistakes_file=MISTAKES_FILE, mistakes_db=None):
+        """mistakes_db: 全班错题统计库路径，None 表示不启用"""
+        self.data_dir = data_dir
+        self.mistakes_file = mistakes_file
+        # 错题记录和统计库的读写按提交顺序在同一个线程中执行，SQLite 连接也在这个线程中创建
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix='vocabulary-io')
+        self.store = self._io.submit(MistakeStore, mistakes_db).result() if mistakes_db else None
+        self._responses = ResponseCache()
+        self._corpus = None
+        self._checked_at = time.monotonic()
+        self._reloading = None
+        self._mistakes = self._load_mistakes()  # 学生 -> {单词ID: 记录}
+        # 同步错题要先写统计库再写 mistakes.json，期间会让出事件循环，同时到达的上传逐个处理
+        self._mistakes_lock = asyncio.Lock()
+        # 启动时还没有开始服务，直接加载
+        self._apply(*self._load())
+
+    def _load(self, lock_timeout=None):
+        """在后台线程中执行：读取课程文件（持有读锁），课程有改动时一并读取课程信息"""
+        corpus = load_corpus(self.data_dir, lock_timeout=lock_timeout)
+        index = self._load_index() if corpus is not self._corpus else None
+        return corpus, index
+
+    def _apply(self, corpus, index):
+        if corpus is not self._corpus:
+            self._corpus = corpus
+            self._index = index
+            self._search = None
+            self._responses.clear()
+            print(f"已加载 {len(corpus.lessons())} 课，共 {len(corpus)} 个单词")
+
+    def refresh(self):
+        """
+        课程文件改动后重新加载（最多每 RELOAD_INTERVAL 秒检查一次）
+        加载在后台线程中进行，完成之前的请求仍用已加载的数据响应
+        """
+        now = time.monotonic()
+        if self._reloading is not None or now - self._checked_at < RELOAD_INTERVAL:
+            return
+        self._checked_at = now
+        self._reloading = asyncio.ensure_future(self._reload())
+
+    async def _reload(self):
+        try:
+            corpus, index = await asyncio.to_thread(self._load, RELOAD_LOCK_TIMEOUT)
+        except Exception as e:
+            print(f"重新加载课程文件时出错: {e}，继续使用已加载的数据")
+            return
+        finally:
+            self._reloading = None
+            self._checked_at = time.monotonic()
+        self._apply(corpus, index)
+
+    async def _run_io(self, func, *args):
+        """在错题读写线程中执行阻塞操作"""
+        return await asyncio.get_running_loop().run_in_executor(self._io, functools.partial(func, *args))
+
+    def close(self):
+        if self.store is not None:
+            self._io.submit(self.store.close).result()
+        self._io.shutdown()
+
+    def _load_index(self):
+        """vocabulary_index.csv 中的课程信息，按文件名索引"""
+        index_file = os.path.join(self.data_dir, INDEX_FILE_NAME)
+        if not os.path.exists(index_file):
+            return {}
+        with open(index_file, 'r', encoding='utf-8') as f:
+            return {row.get('文件名'): row for row in csv.DictReader(f)}
+
+    def _load_mistakes(self):
+        if not os.path.exists(self.mistakes_file):
+            return {}
+        try:
+            with open(self.mistakes_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"读取错题记录 {self.mistakes_file} 时出错: {e}")
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        if data.get('format') == MISTAKES_FORMAT:
+            return data.get('students') or {}
+        # 旧版不分学生的记录归到 anonymous 名下
+        return {DEFAULT_STUDENT: data} if data else {}
+
+    @staticmethod
+    def _dump_mistakes(students):
+        return json.dumps({'format': MISTAKES_FORMAT, 'students': students}, ensure_ascii=False, indent=1)
+
+    def _save_mistakes(self, text):
+        """在错题读写线程中执行：写入事件循环上序列化好的错题记录"""
+        with atomic_write(self.mistakes_file, newline=None) as f:
+            f.write(text)
+
+    async def _sync_mistakes(self, student, incoming):
+        """
+        先写入全班错题统计库，成功后再把合并结果原子地写入 mistakes.json，最后才更新内存中的记录；
+        任何一步出错时内存和 mistakes.json 都保持原样（统计库按事件去重，重新上传不会重复计数）
+        """
+        async with self._mistakes_lock:
+            records = {word_id: dict(record) for word_id, record in self._mistakes.get(student, {}).items()}
+            changed = merge_mistakes(records, incoming)
+            if self.store is not None and await self._run_io(self.store.ingest_word_mistakes, student, incoming):
+                self._responses.discard_group('mistake-stats')
+            if changed:
+                students = dict(self._mistakes, **{student: records})
+                await self._run_io(self._save_mistakes, self._dump_mistakes(students))
+                self._mistakes = students
+                self._responses.discard(('mistakes', student))
+
+    def _cached(self, key, build):
+        response = self._responses.get(key)
+        if response is None:
+            response = self._responses.put(key, json_response(build()))
+        return response
+
+    async def _cached_io(self, key, build):
+        """同 _cached，但 build 需要查询错题统计库，在错题读写线程中执行"""
+        response = self._responses.get(key)
+        if response is None:
+            response = self._responses.put(key, json_response(await self._run_io(build)))
+        return response
+
+    def lessons(self):
+        corpus = self._corpus
+        result = []
+        for lesson_num in corpus.lessons():
+            filename = os.path.basename(corpus.path(lesson_num))
+            info = self._index.get(filename, {})
+            rows = corpus.lesson_rows(lesson_num)
+            result.append({
+                'lessonNum': lesson_num,
+                'lesson': info.get('课程') or (rows[0].get('课程', '') if rows else ''),
+                'filename': filename,
+                'words': len(rows),
+                'categories': len(corpus.counts('栏目', lesson_num)),
+                'mainWordTypes': info.get('主要词性', ''),
+                'difficulty': info.get('难度级别', '')
+            })
+        return result
+
+    def words(self, lesson=None, category=None, word_type=None):
+        entries = self._corpus.find(lesson=lesson, category=category, word_type=word_type)
+        return [word_record(lesson_num, row) for lesson_num, row in entries]
+
+    def categories(self, lesson=None):
+        counts = self._corpus.counts('栏目', lesson)
+        return [{'category': category, 'words': count} for category, count in counts.items()]
+
+    def search(self, query, limit=50):
+        if self._search is None:
+            self._search = SearchIndex(self._corpus.find())
+        entries = self._search.rows(self._search.search(query, limit))
+        return [word_record(lesson_num, row) for lesson_num, row in entries]
+
+    async def handle(self, method, path, query, body):
+        """返回 (状态码, CachedResponse)"""
+        self.refresh()
+        params = {key: values[-1] for key, values in parse_qs(query).items()}
+
+        if path == '/api/mistakes':
+            student = params.get('student') or DEFAULT_STUDENT
+            if len(student) > MAX_STUDENT_LENGTH:
+                return 400, json_response({'error': f'student 参数不能超过 {MAX_STUDENT_LENGTH} 个字符'})
+            if method == 'POST':
+                try:
+                    incoming = json.loads(body.decode('utf-8') or '{}')
+                except ValueError:
+                    return 400, json_response({'error': '错题数据不是合法的 JSON'})
+                if not isinstance(incoming, dict):
+                    return 400, json_response({'error': '错题数据应为 {单词ID: 记录} 对象'})
+                for word_id, record in incoming.items():
+                    error = mistake_record_error(record)
+                    if error:
+                        return 400, json_response({'error': f'错题记录 {word_id}: {error}'})
+                await self._sync_mistakes(student, incoming)
+            elif method not in ('GET', 'HEAD'):
+                return 405, json_response({'error': f'不支持 {method}'})
+            return 200, self._cached(('mistakes', student), lambda: self._mistakes.get(student, {}))
+
+        if method not in ('GET', 'HEAD'):
+            return 405, json_response({'error': f'不支持 {method}'})
+
+        if path in ('/api/mistakes/top', '/api/mistakes/daily'):
+            if self.store is None:
+                return 404, json_response({'error': '未启用错题统计库'})
+            lesson_name = params.get('lesson') or None
+            if path == '/api/mistakes/daily':
+                return 200, await self._cached_io(('mistake-stats', 'daily', lesson_name),
+                                                  lambda: self.store.daily_counts(lesson_name))
+            try:
+                limit = int(params.get('limit') or 10)
+            except ValueError:
+                return 400, json_response({'error': 'limit 参数应为整数'})
+            return 200, await self._cached_io(('mistake-stats', 'top', lesson_name, limit),
+                                              lambda: self.store.top_mistakes(lesson_name, limit))
+
+        try:
+            lesson = int(params['lesson']) if params.get('lesson') else None
+        except ValueError:
+            return 400, json_response({'error': 'lesson 参数应为课程编号'})
+
+        if path == '/api/lessons':
+            return 200, self._cached('lessons', self.lessons)
+        if path == '/api/words':
+            category = params.get('category') or None
+            word_type = params.get('wordType') or None
+            return 200, self._cached(('words', lesson, category, word_type), lambda: self.words(lesson, category, word_type))
+        if path == '/api/categories':
+            return 200, self._cached(('categories', lesson), lambda: self.categories(lesson))
+        if path == '/api/search':
+            text = params.get('q', '')
+            try:
+                limit = int(params.get('limit') or 50)
+            except ValueError:
+                return 400, json_response({'error': 'limit 参数应为整数'})
+            return 200, json_response(self.search(text, limit))
+        return 404, json_response({'error': f'未知接口 {path}'})
+
+class StaticFiles:
+    """网页静态文件，按修改时间和大小缓存在内存中；隐藏文件和服务器数据文件一律 404"""
+
+    def __init__(self, root=WEB_ROOT, private_files=()):
+        """private_files: 另外不对外提供的文件（错题记录、统计库的实际路径）"""
+        self.root = os.path.realpath(root)
+        self.private_files = {os.path.realpath(path) for path in private_files}
+        self._files = {}
+
+    def is_private(self, full_path):
+        parts = os.path.relpath(full_path, self.root).split(os.sep)
+        return (full_path in self.private_files or any(part.startswith('.') for part in parts)
+                or parts[-1] in PRIVATE_NAMES or parts[-1].endswith(PRIVATE_SUFFIXES))
+
+    def get(self, path):
+        relative = unquote(path).lstrip('/') or 'index.html'
+        full_path = os.path.realpath(os.path.join(self.root, relative))
+        if os.path.isdir(full_path):
+            full_path = os.path.join(full_path, 'index.html')
+        if not (full_path == self.root or full_path.startswith(self.root + os.sep)) or not os.path.isfile(full_path):
+            return None
+        if self.is_private(full_path):
+            return None
+
+        stat = os.stat(full_path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+        cached = self._files.get(full_path)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+        with open(full_path, 'rb') as f:
+            body = f.read()
+        content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type in ('application/javascript', 'application/json'):
+            content_type += '; charset=utf-8'
+        response = CachedResponse(body, content_type)
+        self._files[full_path] = (signature, response)
+        return response
+
+class VocabularyServer:
+    """基于 asyncio 的 HTTP/1.1 服务器（支持长连接）"""
+
+    def __init__(self, api, static):
+        self.api = api
+        self.static = static
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), KEEP_ALIVE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line:
+                    break
+
+                parts = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                if len(parts) != 3:
+                    await self._send(writer, 'GET', headers, 400, json_response({'error': '请求格式错误'}), close=True)
+                    break
+                method, target, version = parts
+
+                try:
+                    length = int(headers.get('content-length') or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._send(writer, method, headers, 400, json_response({'error': 'Content-Length 不合法'}), close=True)
+                    break
+                if length > MAX_BODY_SIZE:
+                    await self._send(writer, method, headers, 413, json_response({'error': '请求体过大'}), close=True)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                close = headers.get('connection', '').lower() == 'close' or (
+                    version == 'HTTP/1.0' and headers.get('connection', '').lower() != 'keep-alive')
+                status, response = await self._dispatch(method, target, body)
+                await self._send(writer, method, headers, status, response, close)
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, target, body):
+        url = urlsplit(target)
+        try:
+            if url.path.startswith('/api/'):
+                return await self.api.handle(method, url.path, url.query, body)
+            if method not in ('GET', 'HEAD'):
+                return 405, json_response({'error': f'不支持 {method}'})
+            response = await asyncio.to_thread(self.static.get, url.path)
+            if response is None:
+                return 404, CachedResponse(b'Not Found', 'text/plain; charset=utf-8')
+            return 200, response
+        except Exception as e:
+            print(f"处理 {method} {target} 时出错: {e}")
+            return 500, json_response({'error': str(e)})
+
+    async def _send(self, writer, method, request_headers, status, response, close):
+        headers = {'Content-Type': response.content_type, 'Cache-Control': 'no-cache'}
+        body = response.body
+
+        if status == 200:
+            headers['ETag'] = response.etag
+            if response.gzip_body is not None:
+                headers['Vary'] = 'Accept-Encoding'
+            if etag_matches(request_headers.get('if-none-match'), response.etag):
+                status, body = 304, b''
+            elif response.gzip_body is not None and 'gzip' in request_headers.get('accept-encoding', ''):
+                headers['Content-Encoding'] = 'gzip'
+                body = response.gzip_body
+
+        if status != 304:
+            headers['Content-Length'] = str(len(body))
+        headers['Connection'] = 'close' if close else 'keep-alive'
+
+        head = f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+        head += ''.join(f"{name}: {value}\r\n" for name, value in headers.items()) + '\r\n'
+        writer.write(head.encode('latin-1'))
+        if method != 'HEAD' and status != 304:
+            writer.write(body)
+        await writer.drain()
+
+async def serve(host, port, api, static):
+    server = VocabularyServer(api, static)
+    listener = await asyncio.start_server(server.handle_connection, host, port, backlog=1024)
+    print(f"服务器已启动: http://{'localhost' if host in ('', '0.0.0.0') else host}:{port}")
+    async with listener:
+        await listener.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="本地词汇服务器（JSON 接口 + 静态网页）")
+    parser.add_argument('--host', default='0.0.0.0', help="监听地址")
+    parser.add_argument('--port', type=int, default=8080, help="端口")
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help="课程词汇目录")
+    parser.add_argument('--mistakes-file', default=MISTAKES_FILE, help="错题记录文件")
+    parser.add_argument('--mistakes-db', default=DB_FILE, help="全班错题统计库")
+    parser.add_argument('--root', default=WEB_ROOT, help="静态网页目录")
+    args = parser.parse_args(argv)
+
+    api = VocabularyApi(args.data_dir, args.mistakes_file, args.mistakes_db)
+    try:
+        static = StaticFiles(args.root, private_files=[args.mistakes_file, args.mistakes_db])
+        asyncio.run(serve(args.host, args.port, api, static))
+    except KeyboardInterrupt:
+        print("服务器已停止")
+    finally:
+        api.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+词性判断规则引擎
+规则写在 word_type_rules.json 中，加载时编译成查找表（后缀集合、片假名码位表、关键词正则），
+按顺序返回第一条命中规则的词性
+"""
+
+import json
+import os
+import re
+
+RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'word_type_rules.json')
+
+FIELDS = ('kanji', 'kana', 'meaning')
+
+# 已编译的规则集缓存: (规则文件, 规则集名) -> WordTypeClassifier
+_classifier_cache = {}
+
+def _to_text(value):
+    """空值（None、NaN）视为空字符串，其余转成字符串"""
+    if value is None or (isinstance(value, float) and value != value):
+        return ""
+    return str(value)
+
+def _compile_suffix(values):
+    """按后缀长度分组，用切片 + 集合查找代替逐个 endswith"""
+    by_length = {}
+    for value in values:
+        by_length.setdefault(len(value), set()).add(value)
+    # 文本比后缀短时切片得到的是文本本身，长度不同，不会误中集合
+    groups = [(length, frozenset(suffixes)) for length, suffixes in sorted(by_length.items())]
+    if len(groups) == 1:
+        length, suffixes = groups[0]
+        return lambda text: text[-length:] in suffixes
+    return lambda text: any(text[-length:] in suffixes for length, suffixes in groups)
+
+def _compile_contains(values):
+    """全是单字关键词时用字符集合判断，否则编译成一个正则多选分支（一次扫描）"""
+    if all(len(value) == 1 for value in values):
+        chars = frozenset(values)
+        return lambda text: not chars.isdisjoint(text)
+    pattern = re.compile('|'.join(re.escape(value) for value in sorted(values, key=len, reverse=True)))
+    return lambda text: pattern.search(text) is not None
+
+def _compile_katakana(ranges):
+    """把码位区间展开成字符集合"""
+    chars = frozenset(
+        chr(code)
+        for start, end in ranges
+        for code in range(ord(start), ord(end) + 1)
+    )
+    return lambda text: not chars.isdisjoint(text)
+
+def _compile_condition(condition):
+    """编译单个条件，返回 (字段下标, 判断函数)"""
+    field_index = FIELDS.index(condition['field'])
+    op = condition['op']
+
+    if op == 'suffix':
+        check = _compile_suffix(condition['values'])
+    elif op == 'equals':
+        values = frozenset(condition['values'])
+        check = values.__contains__
+    elif op == 'contains':
+        check = _compile_contains(condition['values'])
+    elif op == 'katakana':
+        check = _compile_katakana(condition['ranges'])
+    elif op == 'has_digit':
+        check = lambda text: any(char.isdigit() for char in text)
+    else:
+        raise ValueError(f"未知的条件类型: {op}")
+
+    if condition.get('lower'):
+        return field_index, lambda text: check(text.lower())
+    return field_index, check
+
+def _compile_verb_ending(rule):
+    """动词词尾规则：う段结尾为一型，る结尾看前一个假名判断一型/二型"""
+    godan_endings = frozenset(rule['godan_endings'])
+    ichidan_stems = frozenset(rule['ichidan_stems'])
+    godan_type = rule['godan_type']
+    ichidan_type = rule['ichidan_type']
+
+    def classify(fields):
+        kana = fields[1]
+        if not kana:
+            return None
+        last = kana[-1]
+        if last == 'る':
+            if len(kana) >= 2 and kana[-2] in ichidan_stems:
+                return ichidan_type
+            return godan_type
+        if last in godan_endings:
+            return godan_type
+        return None
+
+    return classify
+
+def _compile_rule(rule):
+    """
+    编译一条规则，返回 (词性, 命中条件, 排除条件)
+    动词词尾规则的词性由函数本身给出，词性一项为 None
+    """
+    if rule.get('kind') == 'verb_ending':
+        return None, _compile_verb_ending(rule), ()
+
+    when = tuple(_compile_condition(condition) for condition in rule['when'])
+    unless = tuple(_compile_condition(condition) for condition in rule.get('unless', ()))
+    return rule['type'], when, unless
+
+class WordTypeClassifier:
+    """编译后的词性规则集"""
+
+    def __init__(self, ruleset):
+        self.default = ruleset.get('default', '名词')
+        self._rules = [_compile_rule(rule) for rule in ruleset['rules']]
+
+    def classify(self, kanji, kana, meaning):
+        """判断单个词的词性"""
+        return self._classify_fields((_to_text(kanji), _to_text(kana), _to_text(meaning)))
+
+    def _classify_fields(self, fields):
+        for word_type, when, unless in self._rules:
+            if word_type is None:
+                # 动词词尾规则
+                word_type = when(fields)
+                if word_type is not None:
+                    return word_type
+                continue
+
+            for index, check in when:
+                if check(fields[index]):
+                    break
+            else:
+                continue
+
+            for index, check in unless:
+                if check(fields[index]):
+                    break
+            else:
+                return word_type
+        return self.default
+
+    def classify_many(self, words):
+        """
+        批量判断词性
+        words: (汉字, 假名, 释义) 序列；重复出现的词只计算一次
+        """
+        classify_fields = self._classify_fields
+        seen = {}
+        results = []
+        for kanji, kana, meaning in words:
+            key = (_to_text(kanji), _to_text(kana), _to_text(meaning))
+            word_type = seen.get(key)
+            if word_type is None:
+                word_type = seen[key] = classify_fields(key)
+            results.append(word_type)
+        return results
+
+def load_word_type_classifier(ruleset_name, rules_file=RULES_FILE):
+    """读取并编译指定的规则集，同一规则集只编译一次"""
+    cache_key = (rules_file, ruleset_name)
+    if cache_key not in _classifier_cache:
+        with open(rules_file, 'r', encoding='utf-8') as f:
+            rules = json.load(f)
+        _classifier_cache[cache_key] = WordTypeClassifier(rules['rulesets'][ruleset_name])
+    return _classifier_cache[cache_key]
+
+def classify_many(words, ruleset_name='merge_vocabulary'):
+    """按指定规则集批量判断词性"""
+    return load_word_type_classifier(ruleset_name).classify_many(words)
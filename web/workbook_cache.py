@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+单词工作簿缓存 - minanonihongo_words.xls 只解析一次
+解析结果按文件哈希保存为 pickle，之后直接读取缓存；JSON 导出也只在工作簿变化时重新生成
+缓存、JSON 和哈希记录都原子写入，哈希记录最后写，中途中断时下次会重新导出
+"""
+
+import glob
+import hashlib
+import os
+
+import pandas as pd
+
+from lesson_lock import remove_unused_lock_files
+from lesson_writer import atomic_write
+
+WORKBOOK_FILE = 'minanonihongo_words.xls'
+JSON_EXPORT_FILE = 'minanonihongo_words.json'
+CACHE_DIR_NAME = '.workbook_cache'
+
+def file_sha1(path):
+    """计算文件内容的哈希"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _cache_dir(workbook):
+    return os.path.join(os.path.dirname(os.path.abspath(workbook)), CACHE_DIR_NAME)
+
+def _cache_prefix(workbook):
+    return os.path.join(_cache_dir(workbook), os.path.basename(workbook))
+
+def load_workbook(workbook=WORKBOOK_FILE, use_cache=True):
+    """
+    读取工作簿，返回与 pd.read_excel(workbook) 相同的 DataFrame
+    工作簿内容没变时从缓存读取，跳过旧版 xls 的解析
+    """
+    if not use_cache:
+        return pd.read_excel(workbook)
+
+    sha1 = file_sha1(workbook)
+    cache_file = f"{_cache_prefix(workbook)}.{sha1[:16]}.pkl"
+
+    if os.path.exists(cache_file):
+        try:
+            return pd.read_pickle(cache_file)
+        except Exception as e:
+            print(f"读取工作簿缓存 {cache_file} 时出错: {e}，重新解析")
+
+    df = pd.read_excel(workbook)
+
+    # 保存新缓存并清掉旧版本工作簿留下的缓存，以及以前释放锁时没有删除的锁文件
+    os.makedirs(_cache_dir(workbook), exist_ok=True)
+    for stale_file in glob.glob(f"{_cache_prefix(workbook)}.*.pkl"):
+        if stale_file != cache_file:
+            os.remove(stale_file)
+    remove_unused_lock_files(_cache_dir(workbook))
+    # 先写临时文件再替换，中途中断不会留下下次会被读取的残缺缓存
+    with atomic_write(cache_file, mode='wb') as f:
+        df.to_pickle(f)
+
+    return df
+
+def export_workbook_json(df=None, workbook=WORKBOOK_FILE, json_file=JSON_EXPORT_FILE):
+    """
+    把工作簿导出为 JSON；只有工作簿内容变化（或 JSON 不存在）时才重新写入
+    返回是否重新导出
+    """
+    sha1 = file_sha1(workbook)
+    stamp_file = f"{_cache_prefix(workbook)}.{os.path.basename(json_file)}.sha1"
+
+    if os.path.exists(json_file) and os.path.exists(stamp_file):
+        with open(stamp_file, 'r', encoding='utf-8') as f:
+            if f.read().strip() == sha1:
+                return False
+
+    if df is None:
+        df = load_workbook(workbook)
+    with atomic_write(json_file) as f:
+        df.to_json(f, force_ascii=False, indent=2, orient='records')
+
+    # JSON 写完后才记录哈希：JSON 没写成功时哈希记录仍是旧的，下次会重新导出
+    with atomic_write(stamp_file) as f:
+        f.write(sha1)
+    return True